@@ -14,6 +14,90 @@ GROQ_API_KEY = os.getenv('GROQ_API_KEY')
 JDOODLE_CLIENT_SECRET = os.getenv('JDOODLE_CLIENT_SECRET')
 JDOODLE_CLIENT_ID = os.getenv('JDOODLE_CLIENT_ID')
 
+# Batch repository questions
+BATCH_QUERY_MAX_QUESTIONS = int(os.getenv('BATCH_QUERY_MAX_QUESTIONS', '50'))
+BATCH_QUERY_MAX_CONCURRENCY = int(os.getenv('BATCH_QUERY_MAX_CONCURRENCY', '4'))
+
+# LLM model routing; anything not set here falls back to the defaults in github_app/model_router.py
+LLM_ROUTING = {
+    'models': {
+        'small': os.getenv('GROQ_SMALL_MODEL', 'llama-3.1-8b-instant'),
+        'medium': os.getenv('GROQ_MEDIUM_MODEL', 'openai/gpt-oss-20b'),
+        'large': os.getenv('GROQ_LARGE_MODEL', 'openai/gpt-oss-120b'),
+        'vision': os.getenv('GROQ_VISION_MODEL', 'meta-llama/llama-4-scout-17b-16e-instruct'),
+    },
+    'fallback_on': os.getenv('LLM_FALLBACK_ON', 'timeout,rate_limit').split(','),
+    'latency_half_life': float(os.getenv('LLM_LATENCY_HALF_LIFE', '600')),
+    'probe_rate': float(os.getenv('LLM_PROBE_RATE', '0.05')),
+}
+
+# Timeouts, retries and circuit breakers for GitHub, Google, JDoodle and Groq; per-upstream
+# entries override 'default', and anything not set falls back to github_app/resilience.py
+UPSTREAM_RESILIENCE = {
+    'default': {
+        'retries': int(os.getenv('UPSTREAM_RETRIES', '2')),
+        'backoff_max': float(os.getenv('UPSTREAM_BACKOFF_MAX', '8')),
+        'failure_threshold': int(os.getenv('UPSTREAM_FAILURE_THRESHOLD', '5')),
+        'reset_timeout': float(os.getenv('UPSTREAM_RESET_TIMEOUT', '30')),
+    },
+    # Bulkheads: concurrent calls per upstream, so a slow LLM cannot starve the GitHub-only endpoints
+    'github': {'max_concurrent': int(os.getenv('GITHUB_MAX_CONCURRENCY', '16'))},
+    'groq': {'max_concurrent': int(os.getenv('GROQ_MAX_CONCURRENCY', '8'))},
+    'google_search': {'max_concurrent': int(os.getenv('GOOGLE_SEARCH_MAX_CONCURRENCY', '8'))},
+    'jdoodle': {'max_concurrent': int(os.getenv('JDOODLE_MAX_CONCURRENCY', '8'))},
+}
+
+# Image preprocessing for multimodal queries
+IMAGE_MAX_UPLOAD_BYTES = int(os.getenv('IMAGE_MAX_UPLOAD_BYTES', str(10 * 1024 * 1024)))
+IMAGE_MAX_PIXELS = int(os.getenv('IMAGE_MAX_PIXELS', '40000000'))
+IMAGE_MAX_DIMENSION = int(os.getenv('IMAGE_MAX_DIMENSION', '1024'))
+IMAGE_JPEG_QUALITY = int(os.getenv('IMAGE_JPEG_QUALITY', '80'))
+IMAGE_CACHE_TIMEOUT = int(os.getenv('IMAGE_CACHE_TIMEOUT', str(60 * 60 * 24)))
+
+# Documentation job queue (stored in the default database, processed by in-process worker threads)
+DOCUMENTATION_WORKERS = int(os.getenv('DOCUMENTATION_WORKERS', '2'))
+DOCUMENTATION_JOB_MAX_ATTEMPTS = int(os.getenv('DOCUMENTATION_JOB_MAX_ATTEMPTS', '3'))
+DOCUMENTATION_JOB_RETRY_BACKOFF = int(os.getenv('DOCUMENTATION_JOB_RETRY_BACKOFF', '5'))
+DOCUMENTATION_JOB_POLL_INTERVAL = int(os.getenv('DOCUMENTATION_JOB_POLL_INTERVAL', '2'))
+DOCUMENTATION_JOB_STALE_AFTER = int(os.getenv('DOCUMENTATION_JOB_STALE_AFTER', str(15 * 60)))
+DOCUMENTATION_JOB_STREAM_TIMEOUT = int(os.getenv('DOCUMENTATION_JOB_STREAM_TIMEOUT', str(10 * 60)))
+DOCUMENTATION_JOB_RETENTION = int(os.getenv('DOCUMENTATION_JOB_RETENTION', str(7 * 24 * 60 * 60)))
+
+# Cache lifetimes (seconds) for GitHub data and generated documentation
+GITHUB_METADATA_CACHE_TIMEOUT = int(os.getenv('GITHUB_METADATA_CACHE_TIMEOUT', str(60 * 60)))
+GITHUB_TREE_CACHE_TIMEOUT = int(os.getenv('GITHUB_TREE_CACHE_TIMEOUT', str(60 * 60)))
+# Largest page of directory entries the repo-structure endpoint returns at once
+REPO_STRUCTURE_MAX_PAGE_SIZE = int(os.getenv('REPO_STRUCTURE_MAX_PAGE_SIZE', '500'))
+DOCUMENTATION_CACHE_TIMEOUT = int(os.getenv('DOCUMENTATION_CACHE_TIMEOUT', str(60 * 60 * 24)))
+SEARCH_CACHE_TIMEOUT = int(os.getenv('SEARCH_CACHE_TIMEOUT', str(60 * 60 * 6)))
+
+# Results fetched across Custom Search pages (10 per page, fetched concurrently) before reranking
+SEARCH_NUM_RESULTS = int(os.getenv('SEARCH_NUM_RESULTS', '30'))
+
+# Code execution: "jdoodle" (remote API) or "local" (sandboxed subprocesses on this server).
+# Requests may choose an engine with the "engine" field. The local engine runs user code
+# on this machine, so it is only accepted when LOCAL_EXECUTION_ENABLED is set, which
+# should only be done where the server itself runs in a disposable container.
+CODE_EXECUTION_ENGINE = os.getenv('CODE_EXECUTION_ENGINE', 'jdoodle')
+LOCAL_EXECUTION = {
+    'enabled': os.getenv('LOCAL_EXECUTION_ENABLED', 'False').lower() in ('1', 'true', 'yes'),
+    'time_limit': float(os.getenv('LOCAL_EXECUTION_TIME_LIMIT', '5')),
+    'cpu_seconds': int(os.getenv('LOCAL_EXECUTION_CPU_SECONDS', '5')),
+    'memory_mb': int(os.getenv('LOCAL_EXECUTION_MEMORY_MB', '256')),
+    'max_output_bytes': int(os.getenv('LOCAL_EXECUTION_MAX_OUTPUT_BYTES', str(64 * 1024))),
+    'pool_size': int(os.getenv('LOCAL_EXECUTION_POOL_SIZE', '2')),
+}
+
+# Result cache for deterministic programs (same script, stdin, language and version)
+EXECUTION_CACHE_ENABLED = os.getenv('EXECUTION_CACHE_ENABLED', 'True').lower() in ('1', 'true', 'yes')
+EXECUTION_CACHE_TIMEOUT = int(os.getenv('EXECUTION_CACHE_TIMEOUT', str(60 * 60 * 24)))
+EXECUTION_CACHE_MAX_SCRIPT_BYTES = int(os.getenv('EXECUTION_CACHE_MAX_SCRIPT_BYTES', str(64 * 1024)))
+EXECUTION_CACHE_MAX_OUTPUT_BYTES = int(os.getenv('EXECUTION_CACHE_MAX_OUTPUT_BYTES', str(64 * 1024)))
+
+# Multi-testcase runs of execute-code ("cases")
+EXECUTION_BATCH_MAX_CASES = int(os.getenv('EXECUTION_BATCH_MAX_CASES', '50'))
+EXECUTION_BATCH_MAX_CONCURRENCY = int(os.getenv('EXECUTION_BATCH_MAX_CONCURRENCY', '4'))
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -61,9 +145,37 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Cache writes come from many threads and processes; wait for the lock instead of failing
+        'OPTIONS': {'timeout': 20},
     }
 }
 
+# Shared between server processes and management commands (e.g. warm_documentation)
+# and kept across restarts. The database cache culls a third of its entries only once
+# MAX_ENTRIES is exceeded, unlike the file-based cache, which lists its whole directory
+# on every write. Its table is created by `migrate`. With REDIS_URL set (and the redis
+# package installed), Redis is used instead and evicts by its own maxmemory policy.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+            'TIMEOUT': 60 * 60,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'github_cache',
+            'TIMEOUT': 60 * 60,
+            'OPTIONS': {
+                'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '20000')),
+                'CULL_FREQUENCY': 3,
+            },
+        }
+    }
+
 
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
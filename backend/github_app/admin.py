@@ -1 +1,10 @@
 from django.contrib import admin
+
+from .models import DocumentationJob
+
+
+@admin.register(DocumentationJob)
+class DocumentationJobAdmin(admin.ModelAdmin):
+    list_display = ('username', 'repo_name', 'status', 'progress', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('username', 'repo_name')
@@ -0,0 +1,150 @@
+from django.conf import settings
+from django.core.cache import cache
+from langchain.prompts import PromptTemplate
+
+from .utils import get_repo_metadata, get_repo_contents, get_repo_readme, github_cache_key, run_routed_chain
+
+
+class RepositoryNotFound(Exception):
+    """Raised when GitHub does not return the requested repository"""
+
+
+def documentation_cache_key(username, repo_name):
+    return github_cache_key('documentation', username, repo_name)
+
+def get_cached_documentation(username, repo_name):
+    """Previously generated documentation for a repository, or None"""
+    return cache.get(documentation_cache_key(username, repo_name))
+
+def build_documentation(username, repo_name, progress=None, refresh=False):
+    """
+    Fetch a repository from GitHub and generate its documentation
+    
+    Generated documentation is cached for DOCUMENTATION_CACHE_TIMEOUT, and the
+    GitHub data it is built from goes through the shared GitHub cache.
+    
+    Args:
+        username (str): GitHub username
+        repo_name (str): Repository name
+        progress (callable): Optional callback taking (stage, percent), called as work advances
+        refresh (bool): Regenerate even if cached documentation exists (GitHub data still comes from its cache)
+        
+    Returns:
+        str: Comprehensive documentation in markdown format
+    """
+    def report(stage, percent):
+        if progress:
+            progress(stage, percent)
+    
+    if not refresh:
+        documentation = get_cached_documentation(username, repo_name)
+        if documentation is not None:
+            report("Done", 100)
+            return documentation
+    
+    report("Fetching repository details", 10)
+    status_code, repo_data = get_repo_metadata(username, repo_name)
+    
+    if status_code == 404:
+        raise RepositoryNotFound(f"Repository {username}/{repo_name} not found")
+    if status_code != 200:
+        raise Exception(f"Error fetching repository details: {status_code}")
+    
+    report("Fetching README", 25)
+    readme_status, readme_content = get_repo_readme(username, repo_name)
+    
+    if readme_status != 200:
+        readme_content = ""
+    
+    report("Fetching repository structure", 40)
+    structure_status, structure_data = get_repo_contents(username, repo_name)
+    structure_info = ""
+    
+    if structure_status == 200:
+        structure_info = "\nRepository Structure:\n"
+        for item in structure_data:
+            structure_info += f"- {item['name']} ({item['type']})\n"
+    
+    report("Generating documentation", 55)
+    documentation = generate_repo_documentation(
+        repo_data, 
+        readme_content, 
+        structure_info
+    )
+    
+    cache.set(
+        documentation_cache_key(username, repo_name),
+        documentation,
+        getattr(settings, 'DOCUMENTATION_CACHE_TIMEOUT', 60 * 60 * 24)
+    )
+    
+    report("Done", 100)
+    return documentation
+
+def generate_repo_documentation(repo_data, readme_content, structure_info):
+    """
+    Generate comprehensive documentation for a repository using Groq
+    
+    Args:
+        repo_data (dict): Repository information from GitHub API
+        readme_content (str): Content of README file
+        structure_info (str): Information about repository structure
+        
+    Returns:
+        str: Comprehensive documentation in markdown format
+    """
+    # prompt template
+    template = """
+    You are an AI documentation specialist for GitHub repositories.
+    
+    Repository Information:
+    Name: {repo_name}
+    Owner: {repo_owner}
+    Description: {repo_description}
+    Primary Language: {repo_language}
+    Stars: {stars}
+    Forks: {forks}
+    Open Issues: {issues}
+    Created: {created_date}
+    Last Updated: {updated_date}
+    
+    {structure_info}
+    
+    README Content:
+    {readme_content}
+    
+    Your task is to create comprehensive documentation for this repository that includes:
+    1. A clear and detailed overview of what the repository does within 900 characters
+    2. The main purpose and use cases
+    3. Key features or components
+    4. Technology stack (based on the language and files/structure)
+    5. Any installation or usage instructions that can be inferred
+    6. Project structure explanation
+    
+    Format the documentation in clean markdown with appropriate headings, lists, and emphasis.
+    Be concise but informative. Focus on providing valuable information for developers who want to understand and use this repository.
+    Do not generate fictional information - if certain details are not available, mention that they are not provided.
+    """
+    
+    prompt = PromptTemplate(
+        input_variables=["repo_name", "repo_owner", "repo_description", "repo_language", 
+                         "stars", "forks", "issues", "created_date", "updated_date", 
+                         "structure_info", "readme_content"],
+        template=template
+    )
+    
+    values = dict(
+        repo_name=repo_data.get('name', 'Unknown'),
+        repo_owner=repo_data.get('owner', {}).get('login', 'Unknown'),
+        repo_description=repo_data.get('description', 'No description available'),
+        repo_language=repo_data.get('language', 'Unknown'),
+        stars=repo_data.get('stargazers_count', 0),
+        forks=repo_data.get('forks_count', 0),
+        issues=repo_data.get('open_issues_count', 0),
+        created_date=repo_data.get('created_at', '').split('T')[0],
+        updated_date=repo_data.get('updated_at', '').split('T')[0],
+        structure_info=structure_info,
+        readme_content=readme_content if readme_content else "No README available"
+    )
+    
+    return run_routed_chain('generate_documentation', prompt, values)
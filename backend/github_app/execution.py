@@ -0,0 +1,613 @@
+import atexit
+import os
+import select
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from . import resilience
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; local execution is then disabled
+    resource = None
+
+DEFAULT_LIMITS = {
+    'enabled': False,
+    'time_limit': 5.0,
+    'cpu_seconds': 5,
+    'memory_mb': 256,
+    'max_output_bytes': 64 * 1024,
+    'compile_time_limit': 30.0,
+    'pool_size': 2,
+}
+
+# Reads "<script bytes> <stdin bytes>\n<script><stdin>" from the parent, then runs the
+# script as __main__ with the given stdin. The interpreter is started ahead of time,
+# so a run only pays for compiling and executing the user's code.
+PYTHON_BOOTSTRAP = r'''
+import io, sys, traceback
+_header = sys.stdin.buffer.readline().split()
+_script = sys.stdin.buffer.read(int(_header[0])).decode('utf-8', 'replace')
+_stdin = sys.stdin.buffer.read(int(_header[1]))
+sys.stdin = io.TextIOWrapper(io.BytesIO(_stdin), encoding='utf-8')
+sys.argv = ['main.py']
+try:
+    _code = compile(_script, 'main.py', 'exec')
+    del _header, _script, _stdin
+    exec(_code, {'__name__': '__main__', '__builtins__': __builtins__})
+except SystemExit:
+    raise
+except BaseException as _error:
+    traceback.print_exception(type(_error), _error, _error.__traceback__.tb_next)
+    sys.exit(1)
+'''
+
+# Applies the sandbox rlimits in the child and then execs the program, so that no
+# Python code runs between fork and exec in the (threaded) server process.
+# argv: CPU seconds, output file size cap, address space cap ("-" for none), the
+# descriptor to close on exec, then the program's command line.
+LIMITS_WRAPPER = r'''
+import os, resource, sys
+_cpu, _file_size, _memory, _ready = sys.argv[1:5]
+resource.setrlimit(resource.RLIMIT_CPU, (int(_cpu), int(_cpu) + 1))
+if _file_size != '-':
+    resource.setrlimit(resource.RLIMIT_FSIZE, (int(_file_size), int(_file_size)))
+resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+if _memory != '-':
+    resource.setrlimit(resource.RLIMIT_AS, (int(_memory), int(_memory)))
+os.set_inheritable(int(_ready), False)
+os.execvp(sys.argv[5], sys.argv[5:])
+'''
+
+# JDoodle language names mapped to local runtimes. `compile` commands run in the
+# sandbox directory before `run`; `check` is the syntax check used for compile-only
+# requests in interpreted languages. "{source}" and "{binary}" are substituted.
+LANGUAGES = {
+    'python3': {'source': 'main.py', 'warm': [sys.executable, '-I', '-c', PYTHON_BOOTSTRAP],
+                'check': [sys.executable, '-I', '-m', 'py_compile', '{source}'], 'requires': sys.executable},
+    'nodejs': {'source': 'main.js', 'run': ['node', '--max-old-space-size={memory_mb}', '{source}'],
+               'check': ['node', '--check', '{source}'], 'requires': 'node', 'limit_address_space': False},
+    'bash': {'source': 'main.sh', 'run': ['bash', '{source}'], 'check': ['bash', '-n', '{source}'], 'requires': 'bash'},
+    'ruby': {'source': 'main.rb', 'run': ['ruby', '{source}'], 'check': ['ruby', '-c', '{source}'], 'requires': 'ruby'},
+    'php': {'source': 'main.php', 'run': ['php', '{source}'], 'check': ['php', '-l', '{source}'], 'requires': 'php'},
+    'perl': {'source': 'main.pl', 'run': ['perl', '{source}'], 'check': ['perl', '-c', '{source}'], 'requires': 'perl'},
+    'c': {'source': 'main.c', 'compile': ['gcc', '-O2', '-o', '{binary}', '{source}', '-lm'],
+          'run': ['{binary}'], 'requires': 'gcc'},
+    'cpp': {'source': 'main.cpp', 'compile': ['g++', '-O2', '-o', '{binary}', '{source}'],
+            'run': ['{binary}'], 'requires': 'g++'},
+    'go': {'source': 'main.go', 'compile': ['go', 'build', '-o', '{binary}', '{source}'],
+           'run': ['{binary}'], 'requires': 'go', 'limit_address_space': False},
+    'rust': {'source': 'main.rs', 'compile': ['rustc', '-O', '-o', '{binary}', '{source}'],
+             'run': ['{binary}'], 'requires': 'rustc'},
+}
+
+
+JDOODLE_EXECUTE_URL = 'https://api.jdoodle.com/v1/execute'
+
+ENGINES = ['jdoodle', 'local']
+
+
+class ExecutionUnavailable(Exception):
+    """Raised when a language cannot be run by the local engine"""
+
+
+class RemoteExecutionError(Exception):
+    """Raised when the JDoodle API answers with an error status"""
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def get_limits():
+    """Sandbox limits, with settings.LOCAL_EXECUTION overriding the defaults"""
+    return {**DEFAULT_LIMITS, **(getattr(settings, 'LOCAL_EXECUTION', {}) or {})}
+
+
+def local_execution_enabled():
+    """Whether this server accepts the local engine (off unless LOCAL_EXECUTION['enabled'] is set)"""
+    return bool(get_limits().get('enabled')) and resource is not None
+
+
+def jdoodle_configured():
+    """Whether server-side JDoodle credentials are available"""
+    return bool(os.getenv('JDOODLE_CLIENT_ID') and os.getenv('JDOODLE_CLIENT_SECRET'))
+
+
+def supported_languages():
+    """JDoodle language names whose runtime is installed on this server"""
+    if not local_execution_enabled():
+        return []
+    return sorted(name for name, spec in LANGUAGES.items() if shutil.which(spec['requires']))
+
+
+def _sandbox_env(workdir):
+    # Only what runtimes need to start; no server secrets leak into user code
+    env = {
+        'PATH': os.environ.get('PATH', '/usr/local/bin:/usr/bin:/bin'),
+        'HOME': workdir,
+        'TMPDIR': workdir,
+        'LANG': 'C.UTF-8',
+        'PYTHONIOENCODING': 'utf-8',
+        'GOCACHE': os.path.join(tempfile.gettempdir(), 'viksit-go-cache'),
+        'GOPATH': os.path.join(tempfile.gettempdir(), 'viksit-go-path'),
+    }
+    for name in ('RUSTUP_HOME', 'CARGO_HOME', 'RBENV_ROOT', 'RBENV_VERSION'):
+        if name in os.environ:
+            env[name] = os.environ[name]
+    return env
+
+
+def _limited_command(command, cpu_seconds, memory_mb, max_file_bytes, ready_fd, limit_address_space=True):
+    """Command line running `command` under the sandbox rlimits, applied by LIMITS_WRAPPER"""
+    memory = memory_mb * 1024 * 1024 if limit_address_space and memory_mb else '-'
+    file_size = max_file_bytes if max_file_bytes is not None else '-'
+    return [sys.executable, '-I', '-S', '-c', LIMITS_WRAPPER,
+            str(cpu_seconds), str(file_size), str(memory), str(ready_fd), *command]
+
+
+def _read_peak_memory(pid):
+    """Peak resident memory (KB) of a running process's current program"""
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _wait_with_peak_memory(pid, sample_interval=0.01):
+    """
+    Wait for a child to exit, sampling its peak memory while it runs
+
+    Only call this once the child has exec'd its program: VmHWM is reset by exec,
+    so every sample then belongs to the program itself. ru_maxrss from wait4 is
+    not used, as the kernel folds the forking server's memory into it at exec.
+    Programs that exit within one sampling interval may report a low peak, or none.
+
+    Returns:
+        tuple: (wait status, resource usage, peak resident memory in KB or None)
+    """
+    peak = None
+    try:
+        pidfd = os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        pidfd = None
+
+    if pidfd is not None:
+        try:
+            while True:
+                sample = _read_peak_memory(pid)
+                if sample is not None:
+                    peak = max(peak or 0, sample)
+                readable, _, _ = select.select([pidfd], [], [], sample_interval)
+                if readable:
+                    break
+        finally:
+            os.close(pidfd)
+
+    _, status, usage = os.wait4(pid, 0)
+    return status, usage, peak
+
+
+class SandboxProcess:
+    """A child process confined to its own temporary directory and output file"""
+
+    def __init__(self, command, limits, limit_address_space=True, workdir=None, limit_file_size=True,
+                 output_name='.output'):
+        self.workdir = workdir or tempfile.mkdtemp(prefix='viksit-exec-')
+        self.output_path = os.path.join(self.workdir, output_name)
+        self.limits = limits
+
+        # The wrapper closes the write end when it execs the program, so EOF on the
+        # read end means the program is running (or the wrapper failed)
+        ready_read, ready_write = os.pipe()
+        try:
+            with open(self.output_path, 'wb') as output:
+                self.process = subprocess.Popen(
+                    _limited_command(
+                        command,
+                        limits['cpu_seconds'],
+                        limits['memory_mb'],
+                        # One byte over the cap, so an over-long output is detectable as truncated
+                        limits['max_output_bytes'] + 1 if limit_file_size else None,
+                        ready_write,
+                        limit_address_space
+                    ),
+                    cwd=self.workdir,
+                    env=_sandbox_env(self.workdir),
+                    stdin=subprocess.PIPE,
+                    stdout=output,
+                    stderr=subprocess.STDOUT,
+                    start_new_session=True,
+                    pass_fds=(ready_write,)
+                )
+        finally:
+            os.close(ready_write)
+        try:
+            while os.read(ready_read, 4096):
+                pass
+        finally:
+            os.close(ready_read)
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def kill(self):
+        try:
+            os.killpg(self.process.pid, 9)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def run(self, payload, time_limit):
+        """
+        Feed input to the process and wait for it to exit
+
+        Returns:
+            dict: output, exit code, timeout flag, CPU seconds and peak memory in KB
+        """
+        timed_out = threading.Event()
+
+        def on_timeout():
+            timed_out.set()
+            self.kill()
+
+        timer = threading.Timer(time_limit, on_timeout)
+        timer.start()
+        started = time.monotonic()
+        try:
+            try:
+                self.process.stdin.write(payload)
+                self.process.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+            status, usage, peak_memory = _wait_with_peak_memory(self.process.pid)
+        finally:
+            timer.cancel()
+            self.kill()
+
+        self.process.returncode = os.waitstatus_to_exitcode(status)
+        wall_time = time.monotonic() - started
+
+        max_output = self.limits['max_output_bytes']
+        with open(self.output_path, 'rb') as output:
+            data = output.read(max_output + 1)
+
+        return {
+            'output': data[:max_output].decode('utf-8', 'replace'),
+            'truncated': len(data) > max_output,
+            'exit_code': self.process.returncode,
+            'timed_out': timed_out.is_set(),
+            'cpu_time': usage.ru_utime + usage.ru_stime,
+            'memory': peak_memory,
+            'wall_time': wall_time,
+        }
+
+    def cleanup(self):
+        self.kill()
+        if self.process.returncode is None:
+            try:
+                self.process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                pass
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+class WarmPool:
+    """
+    Pool of interpreter processes started ahead of time for one language
+
+    Each process runs a single program and is then discarded. One background
+    worker per pool tops the pool back up after processes are taken.
+    """
+
+    def __init__(self, command, size):
+        self.command = command
+        self.size = size
+        self.idle = []
+        self.condition = threading.Condition()
+        self.limits = None
+        self.worker = None
+        self.closed = False
+
+    def acquire(self, limits):
+        process = None
+        stale = []
+        with self.condition:
+            while self.idle:
+                candidate = self.idle.pop()
+                if candidate.alive() and candidate.limits == limits:
+                    process = candidate
+                    break
+                stale.append(candidate)
+
+            self.limits = limits
+            if self.worker is None and not self.closed:
+                self.worker = threading.Thread(target=self._refill, name='warm-pool-refill', daemon=True)
+                self.worker.start()
+            self.condition.notify()
+
+        for candidate in stale:
+            candidate.cleanup()
+        return process or SandboxProcess(self.command, limits)
+
+    def _refill(self):
+        while True:
+            with self.condition:
+                while not self.closed and len(self.idle) >= self.size:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                limits = self.limits
+            try:
+                self.fill(limits)
+            except OSError:
+                # Could not start a process (e.g. out of PIDs); retry later rather than spin
+                with self.condition:
+                    self.condition.wait(timeout=1)
+
+    def fill(self, limits):
+        """Start processes until the pool is full"""
+        while True:
+            with self.condition:
+                if self.closed or len(self.idle) >= self.size:
+                    return
+            process = SandboxProcess(self.command, limits)
+            with self.condition:
+                if self.closed or len(self.idle) >= self.size:
+                    surplus = process
+                else:
+                    self.idle.append(process)
+                    surplus = None
+            if surplus is not None:
+                surplus.cleanup()
+                return
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.condition.notify_all()
+        for process in idle:
+            process.cleanup()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(language):
+    with _pools_lock:
+        if language not in _pools:
+            _pools[language] = WarmPool(LANGUAGES[language]['warm'], get_limits()['pool_size'])
+        return _pools[language]
+
+
+def warm_up(languages=None):
+    """Start the warm pools ahead of the first request"""
+    limits = get_limits()
+    for language in languages or [name for name in supported_languages() if 'warm' in LANGUAGES[name]]:
+        get_pool(language).fill(limits)
+
+
+@atexit.register
+def _close_pools():
+    for pool in list(_pools.values()):
+        pool.close()
+
+
+def _format_command(command, values):
+    return [part.format(**values) for part in command]
+
+
+def _result(run, compile_output=''):
+    """Shape a local run like a JDoodle /execute response"""
+    output = compile_output + run['output']
+    if run['truncated']:
+        output += "\n[Output truncated]"
+    if run['timed_out']:
+        output += "\n[Execution timed out]"
+
+    return {
+        'output': output,
+        'statusCode': 200,
+        'memory': str(run['memory']) if run['memory'] is not None else None,
+        'cpuTime': f"{run['cpu_time']:.2f}",
+        'isExecutionSuccess': run['exit_code'] == 0 and not run['timed_out'],
+        'isCompiled': True,
+        'exitCode': run['exit_code'],
+        'timedOut': run['timed_out'],
+        'engine': 'local',
+    }
+
+
+def _check_local_language(language):
+    if not local_execution_enabled():
+        raise ExecutionUnavailable("Local execution is disabled on this server")
+
+    if language not in supported_languages():
+        raise ExecutionUnavailable(f"Language '{language}' is not available for local execution")
+
+
+def _prepare_sandbox(spec, script_bytes, limits):
+    """Create a sandbox directory holding the source file; returns (workdir, command values)"""
+    workdir = tempfile.mkdtemp(prefix='viksit-exec-')
+    # Paths are relative to the sandbox directory so that compiler messages don't expose it
+    values = {
+        'source': spec['source'],
+        'binary': './main',
+        'memory_mb': limits['memory_mb'],
+    }
+    with open(os.path.join(workdir, spec['source']), 'wb') as f:
+        f.write(script_bytes)
+    return workdir, values
+
+
+def _compile(command, workdir, values, limits):
+    """
+    Run a compile or syntax-check command in the sandbox directory
+
+    Returns:
+        tuple: (whether it succeeded, raw run result)
+    """
+    # Compilers need more time, memory and file size than the programs they build
+    compile_limits = {**limits, 'cpu_seconds': int(limits['compile_time_limit']), 'memory_mb': None}
+    compiler = SandboxProcess(_format_command(command, values), compile_limits,
+                              limit_address_space=False, workdir=workdir, limit_file_size=False,
+                              output_name='.compile-output')
+    compiled = compiler.run(b'', limits['compile_time_limit'])
+    return compiled['exit_code'] == 0 and not compiled['timed_out'], compiled
+
+
+def execute_locally(script, language, stdin='', compile_only=False):
+    """
+    Run a program in a local sandboxed subprocess
+
+    Programs run in a fresh temporary directory with a scrubbed environment, in
+    their own session, under CPU time, address space, output size and wall-clock
+    limits. This contains runaway programs; it is not an isolation boundary
+    against hostile code, which needs a container or VM around the server;
+    the engine is therefore refused unless LOCAL_EXECUTION['enabled'] is set.
+
+    Args:
+        script (str): Program source
+        language (str): JDoodle language name, e.g. "python3" or "cpp"
+        stdin (str): Standard input for the program
+        compile_only (bool): Only compile; for interpreted languages, only check the syntax
+
+    Returns:
+        dict: JDoodle-compatible result (output, statusCode, memory, cpuTime)
+    """
+    if not compile_only:
+        return execute_locally_cases(script, language, [stdin])[0]
+
+    _check_local_language(language)
+    spec = LANGUAGES[language]
+    limits = get_limits()
+
+    workdir, values = _prepare_sandbox(spec, (script or '').encode('utf-8'), limits)
+    try:
+        succeeded, compiled = _compile(spec.get('compile') or spec['check'], workdir, values, limits)
+        result = _result(compiled)
+        result['isCompiled'] = succeeded
+        return result
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def execute_locally_cases(script, language, stdins, max_workers=1):
+    """
+    Run one program against several inputs in local sandboxed subprocesses
+
+    The program is compiled once and the cases run in parallel, each in its own
+    process under the same limits as execute_locally.
+
+    Args:
+        script (str): Program source
+        language (str): JDoodle language name
+        stdins (list): Standard input of each case
+        max_workers (int): Maximum number of cases running at once
+
+    Returns:
+        list: JDoodle-compatible result of each case, in input order
+    """
+    _check_local_language(language)
+    spec = LANGUAGES[language]
+    limits = get_limits()
+    script_bytes = (script or '').encode('utf-8')
+    workers = max(1, min(max_workers, len(stdins)))
+
+    def run_all(run_case):
+        if workers == 1:
+            return [run_case(index, stdin) for index, stdin in enumerate(stdins)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(run_case, range(len(stdins)), stdins))
+
+    if 'warm' in spec:
+        def run_warm(index, stdin):
+            stdin_bytes = (stdin or '').encode('utf-8')
+            process = get_pool(language).acquire(limits)
+            try:
+                payload = f"{len(script_bytes)} {len(stdin_bytes)}\n".encode('ascii') + script_bytes + stdin_bytes
+                return _result(process.run(payload, limits['time_limit']))
+            finally:
+                process.cleanup()
+
+        return run_all(run_warm)
+
+    workdir, values = _prepare_sandbox(spec, script_bytes, limits)
+    try:
+        compile_output = ''
+        if 'compile' in spec:
+            succeeded, compiled = _compile(spec['compile'], workdir, values, limits)
+            if not succeeded:
+                result = _result(compiled)
+                result['isCompiled'] = False
+                return [dict(result) for _ in stdins]
+            compile_output = compiled['output']
+
+        def run_compiled(index, stdin):
+            process = SandboxProcess(_format_command(spec['run'], values), limits,
+                                     limit_address_space=spec.get('limit_address_space', True), workdir=workdir,
+                                     output_name=f'.output-{index}')
+            return _result(process.run((stdin or '').encode('utf-8'), limits['time_limit']), compile_output)
+
+        return run_all(run_compiled)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def outputs_match(actual, expected):
+    """Compare program output with the expected output, ignoring trailing whitespace on lines and at the end"""
+    def normalize(text):
+        return [line.rstrip() for line in (text or '').replace('\r\n', '\n').rstrip().split('\n')]
+    return normalize(actual) == normalize(expected)
+
+
+def execute_with_jdoodle(script, language, stdin='', version_index='0', compile_only=False,
+                         client_id=None, client_secret=None):
+    """
+    Run a program through the JDoodle API
+
+    Args:
+        script (str): Program source
+        language (str): JDoodle language name
+        stdin (str): Standard input for the program
+        version_index (str): JDoodle version index of the language
+        compile_only (bool): Only compile
+        client_id (str): JDoodle client ID (defaults to JDOODLE_CLIENT_ID)
+        client_secret (str): JDoodle client secret (defaults to JDOODLE_CLIENT_SECRET)
+
+    Returns:
+        requests.Response: The JDoodle response
+    """
+    client_id = client_id or os.getenv('JDOODLE_CLIENT_ID')
+    client_secret = client_secret or os.getenv('JDOODLE_CLIENT_SECRET')
+
+    if not client_id or not client_secret:
+        raise ExecutionUnavailable("JDoodle credentials not configured")
+
+    payload = {
+        'clientId': client_id,
+        'clientSecret': client_secret,
+        'script': script,
+        'stdin': stdin,
+        'language': language,
+        'versionIndex': version_index,
+        'compileOnly': compile_only
+    }
+
+    return resilience.request(
+        'jdoodle', 'POST', JDOODLE_EXECUTE_URL,
+        json=payload,
+        headers={'Content-Type': 'application/json'}
+    )
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import re
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+
+DEFAULT_CACHE_TIMEOUT = 60 * 60 * 24
+DEFAULT_MAX_SCRIPT_BYTES = 64 * 1024
+DEFAULT_MAX_OUTPUT_BYTES = 64 * 1024
+
+# Calls whose result differs between runs (randomness, clocks, the network, the
+# environment). A program mentioning any of them is never served from the cache.
+NONDETERMINISTIC_PATTERNS = {
+    'common': [
+        r'\brandom\b', r'\brand\s*\(', r'\bsrand\b', r'\buuid', r'\btime\s*\(', r'\bclock\s*\(',
+        r'\bdate\b', r'\bnow\s*\(', r'\bgetpid\b', r'\bsocket\b', r'https?://', r'\bthread', r'\bfork\s*\(',
+    ],
+    'python3': [r'\btime\b', r'\bdatetime\b', r'\bsecrets\b', r'\burandom\b', r'\bos\.environ\b',
+                r'\brequests\b', r'\burllib\b', r'\bsubprocess\b', r'\bopen\s*\(', r'\bhash\s*\(', r'\bid\s*\('],
+    'nodejs': [r'Math\.random', r'\bDate\b', r'\bperformance\b', r'\bprocess\.hrtime', r'\bfetch\s*\(',
+               r'\bcrypto\b', r'\brequire\s*\(\s*[\'"](?:http|https|net|fs|child_process)[\'"]'],
+    'bash': [r'\$RANDOM', r'\$SRANDOM', r'\$\$', r'\bcurl\b', r'\bwget\b', r'/dev/u?random'],
+    'c': [r'/dev/u?random', r'\bgetenv\b', r'\bfopen\b'],
+    'cpp': [r'/dev/u?random', r'\bchrono\b', r'\brandom_device\b', r'\bmt19937', r'\bgetenv\b', r'\bfstream\b'],
+    'java': [r'\bRandom\b', r'\bcurrentTimeMillis\b', r'\bnanoTime\b', r'\bLocalDate', r'\bInstant\b', r'\bSystem\.getenv\b'],
+}
+
+_lock = threading.Lock()
+_stats = {
+    'hits': 0,
+    'misses': 0,
+    'stores': 0,
+    'not_stored': 0,
+    'skipped_nondeterministic': 0,
+    'skipped_opt_out': 0,
+    'skipped_size': 0,
+}
+
+
+def _count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+def execution_cache_key(script, stdin, language, version_index, compile_only, engine):
+    """Cache key for a program run: a hash of everything that determines its output"""
+    key_source = json.dumps({
+        'script': script,
+        'stdin': stdin or '',
+        'language': language,
+        'versionIndex': str(version_index),
+        'compileOnly': bool(compile_only),
+        # The engines differ in runtime versions, limits and output shape
+        'engine': engine,
+    }, sort_keys=True)
+    return f"execution:{hashlib.sha256(key_source.encode('utf-8')).hexdigest()}"
+
+
+def is_deterministic(script, language):
+    """
+    Whether a program can be assumed to print the same output for the same input
+
+    This is a conservative text check: any mention of randomness, clocks, the
+    network, files or the environment makes the program uncacheable.
+    """
+    patterns = NONDETERMINISTIC_PATTERNS['common'] + NONDETERMINISTIC_PATTERNS.get(language, [])
+    return not any(re.search(pattern, script or '') for pattern in patterns)
+
+
+def lookup_execution(script, stdin, language, version_index, compile_only, engine, use_cache=True):
+    """
+    Look a program run up in the execution result cache
+
+    Returns:
+        tuple: (cache key to store the result under, or None if the run must not be
+        cached; the cached result, or None on a miss)
+    """
+    enabled = getattr(settings, 'EXECUTION_CACHE_ENABLED', True)
+    if not enabled or not use_cache:
+        _count('skipped_opt_out')
+        return None, None
+
+    if len((script or '').encode('utf-8')) > getattr(settings, 'EXECUTION_CACHE_MAX_SCRIPT_BYTES', DEFAULT_MAX_SCRIPT_BYTES):
+        _count('skipped_size')
+        return None, None
+
+    if not is_deterministic(script, language):
+        _count('skipped_nondeterministic')
+        return None, None
+
+    cache_key = execution_cache_key(script, stdin, language, version_index, compile_only, engine)
+    result = cache.get(cache_key)
+    _count('hits' if result is not None else 'misses')
+    return cache_key, result
+
+
+def store_execution(cache_key, result):
+    """Store a finished run under a key from lookup_execution; time-outs and large outputs are skipped"""
+    if cache_key is None:
+        return
+
+    max_output = getattr(settings, 'EXECUTION_CACHE_MAX_OUTPUT_BYTES', DEFAULT_MAX_OUTPUT_BYTES)
+    output = str(result.get('output', ''))
+    # JDoodle reports time-outs only in the output text
+    completed = result.get('statusCode') == 200 and not result.get('timedOut') and 'timeout' not in output.lower()
+    if completed and len(output.encode('utf-8')) <= max_output:
+        cache.set(cache_key, result, getattr(settings, 'EXECUTION_CACHE_TIMEOUT', DEFAULT_CACHE_TIMEOUT))
+        _count('stores')
+    else:
+        _count('not_stored')
+
+
+def cached_execution(script, stdin, language, version_index, compile_only, engine, run, use_cache=True):
+    """
+    Run a program through the execution result cache
+
+    Only deterministic programs are cached. A cached result is returned without
+    running anything; timeouts and oversized outputs are never stored.
+
+    Args:
+        script (str): Program source
+        stdin (str): Standard input for the program
+        language (str): JDoodle language name
+        version_index (str): JDoodle version index
+        compile_only (bool): Only compile
+        engine (str): Execution engine, 'jdoodle' or 'local'
+        run (callable): Performs the execution and returns the JDoodle-style result dict
+        use_cache (bool): False to always run and not store the result (client opt-out)
+
+    Returns:
+        tuple: (result dict, whether it came from the cache)
+    """
+    cache_key, result = lookup_execution(script, stdin, language, version_index, compile_only, engine, use_cache)
+    if result is not None:
+        return result, True
+
+    result = run()
+    store_execution(cache_key, result)
+    return result, False
+
+
+def get_execution_cache_metrics():
+    """Snapshot of execution cache hits, misses and skips in this process"""
+    with _lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else None
+    return stats
@@ -0,0 +1,127 @@
+import base64
+import binascii
+import hashlib
+import io
+
+from django.conf import settings
+from django.core.cache import cache
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+ALLOWED_FORMATS = {'JPEG', 'PNG', 'WEBP', 'GIF', 'BMP'}
+
+DEFAULT_MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+DEFAULT_MAX_PIXELS = 40_000_000
+DEFAULT_MAX_DIMENSION = 1024
+DEFAULT_JPEG_QUALITY = 80
+DEFAULT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class ImageValidationError(ValueError):
+    """Raised when an uploaded image is not a usable image"""
+
+
+def decode_image_payload(image_data):
+    """
+    Decode an image payload sent by a client
+
+    Args:
+        image_data (str | bytes): Base64 string (optionally a data URI) or raw bytes
+
+    Returns:
+        bytes: Raw image bytes
+    """
+    if isinstance(image_data, (bytes, bytearray)):
+        return bytes(image_data)
+
+    if not isinstance(image_data, str):
+        raise ImageValidationError("Image must be a base64 encoded string")
+
+    if image_data.startswith('data:'):
+        _, _, image_data = image_data.partition(',')
+
+    try:
+        return base64.b64decode(image_data, validate=True)
+    except (binascii.Error, ValueError):
+        raise ImageValidationError("Image is not valid base64")
+
+
+def compress_image(raw_bytes):
+    """
+    Validate an image and re-encode it as a compact, metadata-free JPEG
+
+    The image is rotated according to its EXIF orientation, flattened to RGB,
+    downsized so its longest side fits IMAGE_MAX_DIMENSION and re-encoded.
+    EXIF, ICC profiles and other metadata are not carried over.
+
+    Args:
+        raw_bytes (bytes): Raw image bytes
+
+    Returns:
+        bytes: JPEG encoded image
+    """
+    max_bytes = getattr(settings, 'IMAGE_MAX_UPLOAD_BYTES', DEFAULT_MAX_UPLOAD_BYTES)
+    if len(raw_bytes) > max_bytes:
+        raise ImageValidationError(f"Image exceeds the {max_bytes // (1024 * 1024)} MB upload limit")
+
+    max_pixels = getattr(settings, 'IMAGE_MAX_PIXELS', DEFAULT_MAX_PIXELS)
+    max_dimension = getattr(settings, 'IMAGE_MAX_DIMENSION', DEFAULT_MAX_DIMENSION)
+    quality = getattr(settings, 'IMAGE_JPEG_QUALITY', DEFAULT_JPEG_QUALITY)
+
+    try:
+        with Image.open(io.BytesIO(raw_bytes)) as probe:
+            if probe.format not in ALLOWED_FORMATS:
+                raise ImageValidationError(f"Unsupported image format: {probe.format}")
+            if probe.width * probe.height > max_pixels:
+                raise ImageValidationError("Image dimensions are too large")
+            probe.verify()
+
+        # verify() leaves the image unusable, so decode it again for processing
+        with Image.open(io.BytesIO(raw_bytes)) as image:
+            image.seek(0)
+            image = ImageOps.exif_transpose(image)
+
+            if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+                image = image.convert('RGBA')
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel('A'))
+                image = background
+            elif image.mode != 'RGB':
+                image = image.convert('RGB')
+
+            image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+            output = io.BytesIO()
+            image.save(output, format='JPEG', quality=quality, optimize=True, progressive=True)
+            return output.getvalue()
+    except ImageValidationError:
+        raise
+    except (UnidentifiedImageError, OSError, SyntaxError, Image.DecompressionBombError) as e:
+        raise ImageValidationError(f"Invalid image: {str(e)}")
+
+
+def prepare_image(image_data):
+    """
+    Turn a client image payload into the base64 JPEG sent to the model
+
+    Processed images are cached by the SHA-256 of the uploaded bytes, so
+    re-sending the same screenshot skips decoding and resizing.
+
+    Args:
+        image_data (str | bytes): Base64 string (optionally a data URI) or raw bytes
+
+    Returns:
+        str: Base64 encoded JPEG
+    """
+    raw_bytes = decode_image_payload(image_data)
+
+    max_dimension = getattr(settings, 'IMAGE_MAX_DIMENSION', DEFAULT_MAX_DIMENSION)
+    quality = getattr(settings, 'IMAGE_JPEG_QUALITY', DEFAULT_JPEG_QUALITY)
+    digest = hashlib.sha256(raw_bytes).hexdigest()
+    cache_key = f"image:{digest}:{max_dimension}:{quality}"
+
+    encoded = cache.get(cache_key)
+    if encoded is None:
+        encoded = base64.b64encode(compress_image(raw_bytes)).decode('utf-8')
+        cache.set(cache_key, encoded, getattr(settings, 'IMAGE_CACHE_TIMEOUT', DEFAULT_CACHE_TIMEOUT))
+
+    return encoded
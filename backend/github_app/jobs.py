@@ -0,0 +1,300 @@
+import json
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .documentation import build_documentation, get_cached_documentation, RepositoryNotFound
+from .models import DocumentationJob
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_BACKOFF_SECONDS = 5
+DEFAULT_POLL_INTERVAL_SECONDS = 2
+DEFAULT_STALE_AFTER_SECONDS = 15 * 60
+DEFAULT_STREAM_TIMEOUT_SECONDS = 10 * 60
+DEFAULT_RETENTION_SECONDS = 7 * 24 * 60 * 60
+PRUNE_INTERVAL_SECONDS = 60 * 60
+
+_workers = []
+_workers_lock = threading.Lock()
+_wake = threading.Event()
+_last_pruned = 0.0
+
+
+def enqueue_documentation_job(username, repo_name):
+    """
+    Queue documentation generation for a repository
+
+    An unfinished job for the same repository is reused rather than queued twice.
+    If the documentation is already cached, the repository's latest succeeded job
+    is returned instead, so page opens of warm repositories do not add rows.
+
+    Args:
+        username (str): GitHub username
+        repo_name (str): Repository name
+
+    Returns:
+        DocumentationJob: The queued or already running job
+    """
+    job = DocumentationJob.objects.filter(
+        username=username,
+        repo_name=repo_name,
+        status__in=[DocumentationJob.STATUS_QUEUED, DocumentationJob.STATUS_RUNNING]
+    ).first()
+
+    if job is None:
+        documentation = get_cached_documentation(username, repo_name)
+        if documentation is not None:
+            # Warm cache: answer with a finished job so the first poll returns the result
+            latest = DocumentationJob.objects.filter(
+                username=username,
+                repo_name=repo_name,
+                status=DocumentationJob.STATUS_SUCCEEDED
+            ).order_by('-finished_at').first()
+            
+            if latest is not None:
+                if latest.result != documentation:
+                    latest.result = documentation
+                    latest.save(update_fields=['result', 'updated_at'])
+                return latest
+            
+            return DocumentationJob.objects.create(
+                username=username,
+                repo_name=repo_name,
+                status=DocumentationJob.STATUS_SUCCEEDED,
+                stage='Done',
+                progress=100,
+                result=documentation,
+                finished_at=timezone.now()
+            )
+
+        job = DocumentationJob.objects.create(
+            username=username,
+            repo_name=repo_name,
+            stage='Queued',
+            max_attempts=getattr(settings, 'DOCUMENTATION_JOB_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+        )
+
+    start_workers()
+    _wake.set()
+    return job
+
+
+def serialize_job(job):
+    """Public representation of a job for the status endpoints"""
+    data = {
+        "job_id": str(job.id),
+        "username": job.username,
+        "repo_name": job.repo_name,
+        "status": job.status,
+        "stage": job.stage,
+        "progress": job.progress,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if job.status == DocumentationJob.STATUS_SUCCEEDED:
+        data["documentation"] = job.result
+    if job.error:
+        data["error"] = job.error
+    return data
+
+
+def stream_job_events(job_id):
+    """Yield server-sent events with the job state whenever it changes, ending once the job finishes"""
+    poll_interval = getattr(settings, 'DOCUMENTATION_JOB_STREAM_INTERVAL', 1)
+    deadline = time.monotonic() + getattr(settings, 'DOCUMENTATION_JOB_STREAM_TIMEOUT', DEFAULT_STREAM_TIMEOUT_SECONDS)
+    last_payload = None
+
+    try:
+        while True:
+            if time.monotonic() > deadline:
+                # The job keeps running; the client can reconnect or poll the status endpoint
+                yield "event: timeout\ndata: {\"error\": \"Stream timed out; the job is still running\"}\n\n"
+                return
+
+            job = DocumentationJob.objects.filter(pk=job_id).first()
+            if job is None:
+                yield "event: error\ndata: {\"error\": \"Job not found\"}\n\n"
+                return
+
+            payload = json.dumps(serialize_job(job))
+            if payload != last_payload:
+                event = 'done' if job.is_finished else 'progress'
+                yield f"event: {event}\ndata: {payload}\n\n"
+                last_payload = payload
+            else:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+
+            if job.is_finished:
+                return
+
+            time.sleep(poll_interval)
+    finally:
+        close_old_connections()
+
+
+def start_workers():
+    """Start the local worker pool in this process if it is not running yet"""
+    with _workers_lock:
+        if _workers:
+            return
+
+        requeue_stale_jobs()
+
+        for index in range(getattr(settings, 'DOCUMENTATION_WORKERS', DEFAULT_WORKERS)):
+            worker = threading.Thread(target=_worker_loop, name=f"documentation-worker-{index}", daemon=True)
+            worker.start()
+            _workers.append(worker)
+
+
+def requeue_stale_jobs():
+    """
+    Put back jobs left running by a process that died mid-generation
+
+    A job that has already used all its attempts is failed instead, so a job that
+    keeps taking its process down is not retried forever.
+    """
+    stale_after = getattr(settings, 'DOCUMENTATION_JOB_STALE_AFTER', DEFAULT_STALE_AFTER_SECONDS)
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    stale = DocumentationJob.objects.filter(status=DocumentationJob.STATUS_RUNNING, updated_at__lt=cutoff)
+
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=DocumentationJob.STATUS_FAILED,
+        stage='Failed',
+        error='Interrupted too many times',
+        finished_at=timezone.now(),
+        updated_at=timezone.now()
+    )
+    stale.filter(attempts__lt=F('max_attempts')).update(
+        status=DocumentationJob.STATUS_QUEUED,
+        stage='Requeued after interruption',
+        run_after=timezone.now(),
+        updated_at=timezone.now()
+    )
+
+
+def prune_finished_jobs():
+    """Delete finished jobs older than DOCUMENTATION_JOB_RETENTION seconds"""
+    retention = getattr(settings, 'DOCUMENTATION_JOB_RETENTION', DEFAULT_RETENTION_SECONDS)
+    cutoff = timezone.now() - timedelta(seconds=retention)
+
+    DocumentationJob.objects.filter(
+        status__in=[DocumentationJob.STATUS_SUCCEEDED, DocumentationJob.STATUS_FAILED],
+        finished_at__lt=cutoff
+    ).delete()
+
+
+def claim_next_job():
+    """
+    Atomically move the oldest runnable job from queued to running
+
+    The conditional update makes claiming safe across threads and processes
+    sharing the same database.
+
+    Returns:
+        DocumentationJob: The claimed job, or None if nothing is runnable
+    """
+    while True:
+        candidate = DocumentationJob.objects.filter(
+            status=DocumentationJob.STATUS_QUEUED,
+            run_after__lte=timezone.now()
+        ).order_by('created_at').values_list('pk', flat=True).first()
+
+        if candidate is None:
+            return None
+
+        claimed = DocumentationJob.objects.filter(pk=candidate, status=DocumentationJob.STATUS_QUEUED).update(
+            status=DocumentationJob.STATUS_RUNNING,
+            attempts=F('attempts') + 1,
+            stage='Starting',
+            started_at=timezone.now(),
+            updated_at=timezone.now()
+        )
+
+        if claimed:
+            return DocumentationJob.objects.get(pk=candidate)
+
+
+def run_job(job):
+    """Generate documentation for a claimed job, scheduling a retry with backoff on failure"""
+    def update_progress(stage, percent):
+        DocumentationJob.objects.filter(pk=job.pk).update(stage=stage, progress=percent, updated_at=timezone.now())
+
+    try:
+        documentation = build_documentation(job.username, job.repo_name, progress=update_progress)
+    except Exception as e:
+        retryable = not isinstance(e, RepositoryNotFound)
+
+        if retryable and job.attempts < job.max_attempts:
+            backoff = getattr(settings, 'DOCUMENTATION_JOB_RETRY_BACKOFF', DEFAULT_RETRY_BACKOFF_SECONDS)
+            delay = backoff * (2 ** (job.attempts - 1))
+            DocumentationJob.objects.filter(pk=job.pk).update(
+                status=DocumentationJob.STATUS_QUEUED,
+                stage=f"Retrying in {delay} seconds",
+                error=str(e),
+                run_after=timezone.now() + timedelta(seconds=delay),
+                updated_at=timezone.now()
+            )
+        else:
+            DocumentationJob.objects.filter(pk=job.pk).update(
+                status=DocumentationJob.STATUS_FAILED,
+                stage='Failed',
+                error=str(e),
+                finished_at=timezone.now(),
+                updated_at=timezone.now()
+            )
+        return
+
+    DocumentationJob.objects.filter(pk=job.pk).update(
+        status=DocumentationJob.STATUS_SUCCEEDED,
+        stage='Done',
+        progress=100,
+        result=documentation,
+        error='',
+        finished_at=timezone.now(),
+        updated_at=timezone.now()
+    )
+
+
+def _prune_if_due():
+    global _last_pruned
+    with _workers_lock:
+        if time.monotonic() - _last_pruned < PRUNE_INTERVAL_SECONDS:
+            return
+        _last_pruned = time.monotonic()
+    prune_finished_jobs()
+
+
+def _worker_loop():
+    poll_interval = getattr(settings, 'DOCUMENTATION_JOB_POLL_INTERVAL', DEFAULT_POLL_INTERVAL_SECONDS)
+
+    while True:
+        close_old_connections()
+        try:
+            _prune_if_due()
+        except Exception:
+            pass
+
+        try:
+            job = claim_next_job()
+        except Exception:
+            job = None
+
+        if job is None:
+            _wake.wait(timeout=poll_interval)
+            _wake.clear()
+            continue
+
+        try:
+            run_job(job)
+        except Exception:
+            # Never let one bad job take a worker thread down
+            pass
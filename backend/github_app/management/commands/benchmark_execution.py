@@ -0,0 +1,89 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from github_app.execution import (
+    execute_locally, execute_with_jdoodle, jdoodle_configured, local_execution_enabled, warm_up, ENGINES
+)
+
+SAMPLE_PROGRAMS = {
+    'python3': ("n = int(input())\nprint(sum(i * i for i in range(n)))\n", "100000"),
+    'nodejs': ("let s = 0; for (let i = 0; i < 100000; i++) s += i * i; console.log(s);\n", ""),
+    'c': ("#include <stdio.h>\nint main(){long s=0;for(long i=0;i<100000;i++)s+=i*i;printf(\"%ld\\n\",s);}\n", ""),
+    'cpp': ("#include <iostream>\nint main(){long s=0;for(long i=0;i<100000;i++)s+=i*i;std::cout<<s<<std::endl;}\n", ""),
+    'bash': ("read n; echo $((n * 2))\n", "21"),
+}
+
+JDOODLE_VERSION_INDEX = {'python3': '4', 'nodejs': '4', 'c': '5', 'cpp': '5', 'bash': '4'}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = "Measure end-to-end latency of the local execution engine against the JDoodle API."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--language', default='python3', choices=sorted(SAMPLE_PROGRAMS),
+                            help="Language of the sample program")
+        parser.add_argument('--runs', type=int, default=10, help="Runs per engine")
+        parser.add_argument('--engines', default=','.join(ENGINES), help="Comma-separated engines to compare")
+
+    def handle(self, *args, **options):
+        language = options['language']
+        script, stdin = SAMPLE_PROGRAMS[language]
+        runs = max(1, options['runs'])
+        engines = [engine.strip() for engine in options['engines'].split(',') if engine.strip()]
+
+        unknown = set(engines) - set(ENGINES)
+        if unknown:
+            raise CommandError(f"Unknown engines: {', '.join(sorted(unknown))}")
+
+        def run_local():
+            result = execute_locally(script, language, stdin)
+            return result['isExecutionSuccess'], result
+
+        def run_jdoodle():
+            response = execute_with_jdoodle(script, language, stdin, JDOODLE_VERSION_INDEX[language])
+            result = response.json() if response.status_code == 200 else {}
+            return response.status_code == 200, result
+
+        runners = {'local': run_local, 'jdoodle': run_jdoodle}
+        available = {'local': local_execution_enabled(), 'jdoodle': jdoodle_configured()}
+
+        for engine in engines:
+            if not available[engine]:
+                reason = "LOCAL_EXECUTION_ENABLED is not set" if engine == 'local' else "JDoodle credentials not configured"
+                self.stderr.write(f"{engine}: skipped ({reason})")
+                continue
+
+            if engine == 'local':
+                # Measure steady state, not the first pool fill
+                warm_up([language])
+
+            latencies = []
+            failures = 0
+            cpu_times = []
+            for _ in range(runs):
+                start = time.monotonic()
+                try:
+                    ok, result = runners[engine]()
+                except Exception as e:
+                    ok, result = False, {}
+                    self.stderr.write(f"{engine}: {e}")
+                latencies.append(time.monotonic() - start)
+                if not ok:
+                    failures += 1
+                if result.get('cpuTime') not in (None, ''):
+                    cpu_times.append(float(result['cpuTime']))
+
+            self.stdout.write(
+                f"{engine:8} runs={runs} failures={failures} "
+                f"mean={statistics.mean(latencies) * 1000:.0f}ms "
+                f"p50={percentile(latencies, 0.5) * 1000:.0f}ms "
+                f"p95={percentile(latencies, 0.95) * 1000:.0f}ms "
+                f"cpu={statistics.mean(cpu_times) if cpu_times else 0:.2f}s"
+            )
@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from github_app.documentation import build_documentation, RepositoryNotFound
+from github_app.utils import get_repo_metadata, get_repo_contents, get_repo_tree, get_repo_readme
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls to at most `rate` per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-generate and cache documentation, metadata, top-level listings, recursive trees for a list of repositories. "
+        "Progress is saved to a state file so an interrupted run resumes where it stopped; "
+        "the file is removed once every repository has been attempted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('repos', nargs='*', help="Repositories as owner/repo")
+        parser.add_argument('--file', help="File with one owner/repo per line ('#' starts a comment)")
+        parser.add_argument('--workers', type=int, default=4, help="Number of repositories processed in parallel")
+        parser.add_argument('--github-rate', type=float, default=1.0, help="Maximum GitHub API requests per second")
+        parser.add_argument('--groq-rate', type=float, default=0.5, help="Maximum documentation generations per second")
+        parser.add_argument('--state-file', default=os.path.join(settings.BASE_DIR, '.warmup_state.json'),
+                            help="Where completed repositories are recorded for resuming")
+        parser.add_argument('--restart', action='store_true', help="Ignore the state file and warm every repository")
+        parser.add_argument('--skip-documentation', action='store_true', help="Only warm metadata and trees")
+
+    def handle(self, *args, **options):
+        repos = self.load_repos(options['repos'], options['file'])
+        if not repos:
+            raise CommandError("No repositories given. Pass owner/repo arguments or --file.")
+
+        state_file = options['state_file']
+        state = {'completed': [], 'missing': [], 'failed': {}}
+        if not options['restart'] and os.path.exists(state_file):
+            with open(state_file) as f:
+                state = json.load(f)
+            state.setdefault('completed', [])
+            state.setdefault('missing', [])
+            state.setdefault('failed', {})
+
+        # Missing repositories will not come back on a retry, so a resumed run skips them too
+        completed = set(state['completed']) | set(state['missing'])
+        pending = [repo for repo in repos if repo not in completed]
+        skipped = len(repos) - len(pending)
+        if skipped:
+            self.stdout.write(f"Resuming: {skipped} of {len(repos)} repositories already warmed")
+
+        github_limiter = RateLimiter(options['github_rate'])
+        groq_limiter = RateLimiter(options['groq_rate'])
+        state_lock = threading.Lock()
+        warm_documentation = not options['skip_documentation']
+
+        def save_state():
+            temp_file = f"{state_file}.tmp"
+            with open(temp_file, 'w') as f:
+                json.dump(state, f, indent=2)
+            os.replace(temp_file, state_file)
+
+        def warm(repo):
+            username, repo_name = repo.split('/', 1)
+
+            github_limiter.acquire()
+            status_code, _ = get_repo_metadata(username, repo_name, refresh=True)
+            if status_code == 404:
+                raise RepositoryNotFound(f"Repository {repo} not found")
+            if status_code != 200:
+                raise Exception(f"Error fetching repository details: {status_code}")
+
+            github_limiter.acquire()
+            get_repo_contents(username, repo_name, refresh=True)
+
+            github_limiter.acquire()
+            get_repo_tree(username, repo_name, refresh=True)
+
+            github_limiter.acquire()
+            get_repo_readme(username, repo_name, refresh=True)
+
+            if warm_documentation:
+                # Metadata, tree and README were just refreshed, so this only costs the LLM call
+                groq_limiter.acquire()
+                build_documentation(username, repo_name, refresh=True)
+
+        start = time.monotonic()
+        succeeded = 0
+        failed = 0
+
+        executor = ThreadPoolExecutor(max_workers=max(1, options['workers']))
+        try:
+            futures = {executor.submit(warm, repo): repo for repo in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                repo = futures[future]
+                try:
+                    future.result()
+                except RepositoryNotFound as e:
+                    failed += 1
+                    with state_lock:
+                        state['missing'].append(repo)
+                        state['failed'].pop(repo, None)
+                        save_state()
+                    self.stderr.write(f"[{done}/{len(pending)}] {repo}: not found, skipped ({e})")
+                    continue
+                except Exception as e:
+                    failed += 1
+                    with state_lock:
+                        state['failed'][repo] = str(e)
+                        save_state()
+                    self.stderr.write(f"[{done}/{len(pending)}] {repo}: failed ({e})")
+                    continue
+
+                succeeded += 1
+                with state_lock:
+                    state['completed'].append(repo)
+                    state['failed'].pop(repo, None)
+                    save_state()
+
+                elapsed = time.monotonic() - start
+                self.stdout.write(f"[{done}/{len(pending)}] {repo}: warmed ({done / elapsed * 60:.1f} repos/min)")
+        except KeyboardInterrupt:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.stderr.write(f"Interrupted; progress saved to {state_file}. Re-run the same command to resume.")
+            raise SystemExit(1)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        elapsed = time.monotonic() - start
+        throughput = (succeeded + failed) / elapsed * 60 if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Warmed {succeeded} repositories, {failed} failed, {skipped} skipped "
+            f"in {elapsed:.1f}s ({throughput:.1f} repos/min)"
+        ))
+
+        if os.path.exists(state_file):
+            # Every repository was attempted, so the next run starts from scratch and
+            # refreshes everything again; failures have been reported above
+            os.remove(state_file)
+
+    def load_repos(self, repo_args, repo_file):
+        repos = list(repo_args)
+
+        if repo_file:
+            try:
+                with open(repo_file) as f:
+                    for line in f:
+                        line = line.split('#', 1)[0].strip()
+                        if line:
+                            repos.append(line)
+            except OSError as e:
+                raise CommandError(f"Cannot read {repo_file}: {e}")
+
+        unique = []
+        for repo in repos:
+            repo = repo.strip().strip('/')
+            if repo.count('/') != 1 or not all(repo.split('/')):
+                raise CommandError(f"Invalid repository '{repo}', expected owner/repo")
+            if repo not in unique:
+                unique.append(repo)
+        return unique
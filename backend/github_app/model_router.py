@@ -0,0 +1,255 @@
+import logging
+import random
+import threading
+import time
+
+import groq
+import httpx
+from django.conf import settings
+
+from . import resilience
+
+logger = logging.getLogger(__name__)
+
+# Tiers ordered from fastest to most capable
+MODEL_TIERS = ['small', 'medium', 'large']
+
+DEFAULT_MODELS = {
+    'small': 'llama-3.1-8b-instant',
+    'medium': 'openai/gpt-oss-20b',
+    'large': 'openai/gpt-oss-120b',
+    'vision': 'meta-llama/llama-4-scout-17b-16e-instruct',
+}
+
+# Seed latencies (seconds) used until a model has been observed
+DEFAULT_EXPECTED_LATENCY = {
+    'small': 1.0,
+    'medium': 3.0,
+    'large': 8.0,
+    'vision': 4.0,
+}
+
+DEFAULT_ENDPOINTS = {
+    'google_search': {'tiers': ['small', 'medium'], 'slo_seconds': 5.0, 'timeout': 15.0},
+    'query_repository': {'tiers': ['small', 'medium', 'large'], 'slo_seconds': 15.0, 'timeout': 30.0},
+    'query_code': {'tiers': ['medium', 'large'], 'slo_seconds': 20.0, 'timeout': 45.0},
+    'generate_documentation': {'tiers': ['medium', 'large'], 'slo_seconds': 60.0, 'timeout': 90.0, 'deep': True},
+}
+
+DEFAULT_SHORT_PROMPT_TOKENS = 1500
+DEFAULT_LONG_PROMPT_TOKENS = 6000
+DEFAULT_FALLBACK_ON = ['timeout', 'rate_limit']
+
+# Weight of the newest observation in the per-endpoint, per-model latency average
+LATENCY_SMOOTHING = 0.2
+
+# Observations fade back toward the seed latency with this half-life (seconds), so a
+# model demoted by a slow spell is eventually tried again as the primary choice
+DEFAULT_LATENCY_HALF_LIFE = 600
+
+# Share of requests that keep a tier demoted for missing its SLO, to re-measure it
+DEFAULT_PROBE_RATE = 0.05
+
+_lock = threading.Lock()
+_served = {}
+_observed_latency = {}
+
+
+def get_routing_config():
+    """Return the routing configuration, with settings.LLM_ROUTING overriding the defaults"""
+    overrides = getattr(settings, 'LLM_ROUTING', {}) or {}
+
+    endpoints = {name: dict(config) for name, config in DEFAULT_ENDPOINTS.items()}
+    for name, config in overrides.get('endpoints', {}).items():
+        endpoints.setdefault(name, {}).update(config)
+
+    return {
+        'models': {**DEFAULT_MODELS, **overrides.get('models', {})},
+        'expected_latency': {**DEFAULT_EXPECTED_LATENCY, **overrides.get('expected_latency', {})},
+        'endpoints': endpoints,
+        'short_prompt_tokens': overrides.get('short_prompt_tokens', DEFAULT_SHORT_PROMPT_TOKENS),
+        'long_prompt_tokens': overrides.get('long_prompt_tokens', DEFAULT_LONG_PROMPT_TOKENS),
+        'fallback_on': overrides.get('fallback_on', DEFAULT_FALLBACK_ON),
+        'latency_half_life': overrides.get('latency_half_life', DEFAULT_LATENCY_HALF_LIFE),
+        'probe_rate': overrides.get('probe_rate', DEFAULT_PROBE_RATE),
+    }
+
+
+def estimate_tokens(text):
+    """Rough token estimate (about four characters per token)"""
+    return max(1, len(text or '') // 4)
+
+
+def expected_latency(endpoint, tier, config):
+    """
+    Expected latency of a tier on an endpoint
+    
+    Latency is tracked per endpoint because prompt sizes differ widely between them
+    (a documentation run says little about a short question). The observed moving
+    average decays back toward the configured seed value as it ages.
+    """
+    seed = config['expected_latency'].get(tier, 0.0)
+    model = config['models'][tier]
+    with _lock:
+        observed = _observed_latency.get((endpoint, model))
+    if observed is None:
+        return seed
+
+    latency, observed_at = observed
+    half_life = config['latency_half_life']
+    weight = 0.5 ** ((time.monotonic() - observed_at) / half_life) if half_life else 1.0
+    return seed + (latency - seed) * weight
+
+
+def select_models(endpoint, prompt_text, has_image=False):
+    """
+    Pick the models to try for a request, primary model first
+
+    Args:
+        endpoint (str): Name of the calling endpoint (a key of the endpoint routing config)
+        prompt_text (str): Full prompt that will be sent
+        has_image (bool): Whether the request carries an image
+
+    Returns:
+        list: Model names, the primary choice followed by its fallbacks
+    """
+    config = get_routing_config()
+
+    if has_image:
+        return [config['models']['vision']]
+
+    endpoint_config = config['endpoints'].get(endpoint, {})
+    tiers = [tier for tier in MODEL_TIERS if tier in endpoint_config.get('tiers', MODEL_TIERS)] or MODEL_TIERS
+    slo = endpoint_config.get('slo_seconds')
+
+    if endpoint_config.get('deep'):
+        chosen = len(tiers) - 1
+    else:
+        # Short prompts and formatting work go to the fastest tier, long ones to the largest
+        tokens = estimate_tokens(prompt_text)
+        if tokens < config['short_prompt_tokens']:
+            wanted = 'small'
+        elif tokens < config['long_prompt_tokens']:
+            wanted = 'medium'
+        else:
+            wanted = 'large'
+        chosen = min(range(len(tiers)), key=lambda i: abs(MODEL_TIERS.index(tiers[i]) - MODEL_TIERS.index(wanted)))
+
+    # Step down to faster tiers while the chosen one is expected to miss the latency SLO,
+    # except for an occasional probe that keeps the demoted tier's latency up to date
+    while slo is not None and chosen > 0 and expected_latency(endpoint, tiers[chosen], config) > slo:
+        if random.random() < config['probe_rate']:
+            break
+        chosen -= 1
+
+    # Fall back to the nearest tiers first, preferring the faster one on ties
+    fallbacks = sorted((i for i in range(len(tiers)) if i != chosen), key=lambda i: (abs(i - chosen), i))
+    ordered = [tiers[chosen]] + [tiers[i] for i in fallbacks]
+    return [config['models'][tier] for tier in ordered]
+
+
+def classify_error(error):
+    """Map an LLM client exception to a coarse failure kind"""
+    if isinstance(error, groq.RateLimitError):
+        return 'rate_limit'
+    if isinstance(error, (groq.APITimeoutError, httpx.TimeoutException, TimeoutError)):
+        return 'timeout'
+    if isinstance(error, groq.APIStatusError) and error.status_code >= 500:
+        return 'server_error'
+    return 'error'
+
+
+def record_result(endpoint, model, outcome, elapsed, fallback=False):
+    """Record which model served (or failed) a request"""
+    with _lock:
+        stats = _served.setdefault((endpoint, model), {
+            'requests': 0,
+            'successes': 0,
+            'fallback_successes': 0,
+            'rate_limit': 0,
+            'timeout': 0,
+            'server_error': 0,
+            'error': 0,
+            'total_latency': 0.0,
+        })
+        stats['requests'] += 1
+        stats['total_latency'] += elapsed
+        if outcome == 'success':
+            stats['successes'] += 1
+            if fallback:
+                stats['fallback_successes'] += 1
+            previous = _observed_latency.get((endpoint, model))
+            latency = elapsed if previous is None else (
+                LATENCY_SMOOTHING * elapsed + (1 - LATENCY_SMOOTHING) * previous[0]
+            )
+            _observed_latency[(endpoint, model)] = (latency, time.monotonic())
+        else:
+            stats[outcome] += 1
+
+    logger.info("llm endpoint=%s model=%s outcome=%s latency=%.2fs fallback=%s",
+                endpoint, model, outcome, elapsed, fallback)
+
+
+def call_with_fallback(endpoint, prompt_text, call, has_image=False):
+    """
+    Run an LLM call on the routed model, falling back to the next model on configured failures
+
+    Args:
+        endpoint (str): Name of the calling endpoint
+        prompt_text (str): Full prompt, used for routing
+        call (callable): Function taking (model_name, timeout) and performing the request
+        has_image (bool): Whether the request carries an image
+
+    Returns:
+        tuple: (result of `call`, name of the model that served it)
+
+    Raises:
+        UpstreamUnavailable: If the Groq circuit breaker is open
+        UpstreamSaturated: If too many Groq calls are already in progress
+    """
+    config = get_routing_config()
+    timeout = config['endpoints'].get(endpoint, {}).get('timeout')
+    models = select_models(endpoint, prompt_text, has_image)
+
+    for attempt, model in enumerate(models):
+        # Every model is served by Groq, so a Groq outage fails fast instead of
+        # timing out on each fallback in turn, and a Groq slowdown can only hold
+        # the threads of the Groq bulkhead
+        with resilience.bulkhead('groq'):
+            breaker = resilience.guard('groq')
+            start = time.monotonic()
+            try:
+                result = call(model, timeout)
+            except Exception as e:
+                outcome = classify_error(e)
+                if outcome in ('timeout', 'server_error') or isinstance(e, groq.APIConnectionError):
+                    resilience.record_failure('groq', breaker)
+                else:
+                    breaker.record_success()
+                record_result(endpoint, model, outcome, time.monotonic() - start, fallback=attempt > 0)
+                if outcome in config['fallback_on'] and attempt < len(models) - 1:
+                    continue
+                raise
+            breaker.record_success()
+        record_result(endpoint, model, 'success', time.monotonic() - start, fallback=attempt > 0)
+        return result, model
+
+
+def get_model_metrics():
+    """Snapshot of per-endpoint, per-model serving counts and latencies"""
+    with _lock:
+        endpoints = {}
+        for (endpoint, model), stats in _served.items():
+            entry = dict(stats)
+            entry['average_latency'] = round(stats['total_latency'] / stats['requests'], 3) if stats['requests'] else None
+            del entry['total_latency']
+            endpoints.setdefault(endpoint, {})[model] = entry
+
+        observed = {}
+        for (endpoint, model), (latency, _) in _observed_latency.items():
+            observed.setdefault(endpoint, {})[model] = round(latency, 3)
+
+        return {
+            'endpoints': endpoints,
+            'observed_latency': observed,
+        }
@@ -0,0 +1,146 @@
+import math
+import re
+from collections import Counter
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'for', 'from', 'has', 'have', 'how',
+    'if', 'in', 'into', 'is', 'it', 'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was',
+    'we', 'will', 'with', 'you', 'your', 'our', 'use', 'using', 'used', 'also', 'not', 'all',
+    'http', 'https', 'www', 'com', 'github', 'md', 'png', 'svg', 'img', 'src', 'href',
+}
+
+TRACKING_PARAMS = {'gclid', 'fbclid', 'ref', 'ref_src', 'source', 'mc_cid', 'mc_eid'}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#_.-]*[a-z0-9+#]|[a-z0-9]")
+
+
+def tokenize(text):
+    """Lowercase word tokens, keeping terms like c++, c# and node.js intact"""
+    return TOKEN_PATTERN.findall((text or '').lower())
+
+
+def extract_keywords(text, limit=20):
+    """
+    Most frequent meaningful words of a document, e.g. a README
+
+    Args:
+        text (str): Markdown or plain text
+        limit (int): Maximum number of keywords
+
+    Returns:
+        list: Keywords, most frequent first
+    """
+    text = re.sub(r'```.*?```', ' ', text or '', flags=re.DOTALL)
+    text = re.sub(r'https?://\S+', ' ', text)
+    counts = Counter(
+        token for token in tokenize(text)
+        if token not in STOPWORDS and len(token) > 2 and not token.isdigit()
+    )
+    return [token for token, _ in counts.most_common(limit)]
+
+
+def canonical_url(link):
+    """
+    Canonical form of a result URL for deduplication
+
+    Scheme, letter case of the host, a leading "www.", default ports, fragments,
+    trailing slashes, tracking parameters and query parameter order are ignored.
+    """
+    parts = urlsplit((link or '').strip())
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path.rstrip('/') or '/'
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+
+def dedupe_search_items(items):
+    """Drop search results whose canonical URL was already seen, keeping the first occurrence"""
+    seen = set()
+    unique = []
+    for item in items:
+        key = canonical_url(item.get('link', ''))
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(item)
+    return unique
+
+
+def bm25_scores(query_tokens, documents, k1=1.5, b=0.75):
+    """
+    Okapi BM25 score of each tokenized document against the query tokens
+
+    Args:
+        query_tokens (list): Query terms
+        documents (list): Token lists, one per document
+        k1 (float): Term frequency saturation
+        b (float): Length normalization strength
+
+    Returns:
+        list: One score per document
+    """
+    if not documents:
+        return []
+
+    average_length = sum(len(doc) for doc in documents) / len(documents) or 1.0
+    document_frequency = Counter(term for doc in documents for term in set(doc))
+    total = len(documents)
+
+    scores = []
+    for doc in documents:
+        frequencies = Counter(doc)
+        score = 0.0
+        for term in set(query_tokens):
+            tf = frequencies.get(term)
+            if not tf:
+                continue
+            df = document_frequency[term]
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / average_length))
+        scores.append(score)
+    return scores
+
+
+def rerank_search_items(items, context_text, original_rank_weight=0.3):
+    """
+    Reorder search results by BM25 relevance to the repository context
+
+    The search engine's own order is kept as a small prior so that results
+    with no overlap with the context stay in their original order.
+
+    Args:
+        items (list): Custom Search result items
+        context_text (str): Repository name, language, description and README keywords
+        original_rank_weight (float): Weight of the original position relative to BM25
+
+    Returns:
+        list: The same items, best match first
+    """
+    query_tokens = [token for token in tokenize(context_text) if token not in STOPWORDS]
+    if not items or not query_tokens:
+        return list(items)
+
+    documents = [
+        tokenize(" ".join([item.get('title', ''), item.get('snippet', ''), urlsplit(item.get('link', '')).path]))
+        for item in items
+    ]
+    scores = bm25_scores(query_tokens, documents)
+    best = max(scores) or 1.0
+
+    ranked = []
+    for position, (item, score) in enumerate(zip(items, scores)):
+        prior = 1 - position / len(items)
+        ranked.append((score / best + original_rank_weight * prior, -position, item))
+
+    ranked.sort(key=lambda entry: (entry[0], entry[1]), reverse=True)
+    return [item for _, _, item in ranked]
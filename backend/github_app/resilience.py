@@ -0,0 +1,372 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Keep in sync with frontend/resilience.py. The frontend and the backend are deployed
+# separately and share no package, so the Bulkhead and CircuitBreaker classes,
+# backoff_delay, parse_retry_after and the retry loop of request() exist in both; a fix
+# to one belongs in the other. The backend's policies come from settings, and its
+# exceptions carry the Retry-After sent to API clients.
+
+# Per-upstream defaults; settings.UPSTREAM_RESILIENCE overrides any of them.
+# timeout is a requests (connect, read) timeout in seconds.
+DEFAULT_UPSTREAMS = {
+    # GitHub calls are short and back the metadata endpoints, so they get the most slots
+    'github': {'timeout': (5, 20), 'retries': 3, 'max_concurrent': 16, 'max_queue': 32, 'queue_timeout': 2.0},
+    'google_search': {'timeout': (5, 10), 'retries': 2, 'max_concurrent': 8},
+    'jdoodle': {'timeout': (5, 30), 'retries': 2, 'max_concurrent': 8, 'queue_timeout': 10.0},
+    # The model router already falls back to other models, so Groq calls are only
+    # guarded by the circuit breaker and never retried here
+    'groq': {'retries': 0, 'max_concurrent': 8, 'queue_timeout': 10.0},
+}
+
+DEFAULT_POLICY = {
+    'timeout': (5, 30),
+    'retries': 2,
+    'backoff_base': 0.5,
+    'backoff_max': 8.0,
+    # A Retry-After longer than this is not waited for; the response is returned as is
+    'max_retry_after': 10.0,
+    'failure_threshold': 5,
+    'reset_timeout': 30.0,
+    # Bulkhead: calls in flight at once, calls allowed to wait for a slot, and how long they wait
+    'max_concurrent': 8,
+    'max_queue': 16,
+    'queue_timeout': 5.0,
+    # Retry-After sent to clients when the bulkhead is full
+    'saturated_retry_after': 5,
+}
+
+# Responses worth retrying. A plain 500 can be a bug rather than a transient fault,
+# so it is only retried for idempotent requests.
+RETRY_STATUSES = {429, 502, 503, 504}
+IDEMPOTENT_RETRY_STATUSES = RETRY_STATUSES | {500}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+
+class UpstreamUnavailable(Exception):
+    """Raised when an upstream cannot be reached or its circuit breaker is open"""
+
+    def __init__(self, upstream, message=None, retry_after=None):
+        super().__init__(message or f"{upstream} is temporarily unavailable")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class UpstreamSaturated(UpstreamUnavailable):
+    """Raised when too many calls to an upstream are already in flight or waiting"""
+
+    def __init__(self, upstream, retry_after=None):
+        super().__init__(upstream, f"Too many requests to {upstream} are in progress", retry_after)
+
+
+class Bulkhead:
+    """
+    Bounds the number of concurrent calls to one upstream
+
+    A slow upstream can then only tie up its own share of the server's threads.
+    Calls beyond `max_concurrent` wait up to `queue_timeout` seconds for a slot;
+    once `max_queue` calls are already waiting, further calls are refused at once.
+    """
+
+    def __init__(self, name, max_concurrent, max_queue, queue_timeout):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self.semaphore = threading.BoundedSemaphore(max_concurrent)
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take a slot, waiting for one if allowed; returns False when the bulkhead is full"""
+        acquired = self.semaphore.acquire(blocking=False)
+        if not acquired:
+            with self.lock:
+                if self.waiting >= self.max_queue:
+                    return False
+                self.waiting += 1
+            try:
+                acquired = self.semaphore.acquire(timeout=self.queue_timeout)
+            finally:
+                with self.lock:
+                    self.waiting -= 1
+        if acquired:
+            with self.lock:
+                self.in_flight += 1
+        return acquired
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+        self.semaphore.release()
+
+
+class CircuitBreaker:
+    """
+    Fails fast while an upstream is down
+
+    The breaker opens after `failure_threshold` consecutive failures. While open,
+    calls are refused until `reset_timeout` seconds have passed; then a single trial
+    call is let through (half-open) and its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, name, failure_threshold, reset_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self.lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        """Whether a call may go ahead now"""
+        with self.lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def retry_after(self):
+        """Seconds until the breaker lets a trial call through"""
+        with self.lock:
+            if self.opened_at is None:
+                return 0
+            return max(0, round(self.reset_timeout - (time.monotonic() - self.opened_at)))
+
+    def record_success(self):
+        with self.lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.consecutive_failures += 1
+            if self.trial_in_flight or self.consecutive_failures >= self.failure_threshold:
+                if self.opened_at is None or self._state() == 'half_open':
+                    logger.warning("circuit breaker for %s opened after %d failures",
+                                   self.name, self.consecutive_failures)
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+
+_lock = threading.Lock()
+_breakers = {}
+_bulkheads = {}
+_stats = {}
+
+
+def get_upstream_config(upstream):
+    """Return the resilience policy of an upstream, with settings.UPSTREAM_RESILIENCE overriding the defaults"""
+    overrides = getattr(settings, 'UPSTREAM_RESILIENCE', {}) or {}
+    return {
+        **DEFAULT_POLICY,
+        **overrides.get('default', {}),
+        **DEFAULT_UPSTREAMS.get(upstream, {}),
+        **overrides.get(upstream, {}),
+    }
+
+
+def get_breaker(upstream):
+    """Return the process-wide circuit breaker of an upstream"""
+    with _lock:
+        breaker = _breakers.get(upstream)
+        if breaker is None:
+            config = get_upstream_config(upstream)
+            breaker = CircuitBreaker(upstream, config['failure_threshold'], config['reset_timeout'])
+            _breakers[upstream] = breaker
+        return breaker
+
+
+def get_bulkhead(upstream):
+    """Return the process-wide bulkhead of an upstream"""
+    with _lock:
+        compartment = _bulkheads.get(upstream)
+        if compartment is None:
+            config = get_upstream_config(upstream)
+            compartment = Bulkhead(upstream, config['max_concurrent'], config['max_queue'], config['queue_timeout'])
+            _bulkheads[upstream] = compartment
+        return compartment
+
+
+@contextmanager
+def bulkhead(upstream):
+    """
+    Hold one of the upstream's concurrency slots for the duration of a call
+
+    Raises:
+        UpstreamSaturated: If no slot frees up in time
+    """
+    compartment = get_bulkhead(upstream)
+    if not compartment.acquire():
+        _count(upstream, 'saturated')
+        raise UpstreamSaturated(upstream, get_upstream_config(upstream)['saturated_retry_after'])
+    try:
+        yield
+    finally:
+        compartment.release()
+
+
+def _count(upstream, name):
+    with _lock:
+        stats = _stats.setdefault(upstream, {
+            'attempts': 0,
+            'retries': 0,
+            'failures': 0,
+            'rejected': 0,
+            'saturated': 0,
+        })
+        stats[name] += 1
+
+
+def backoff_delay(attempt, config):
+    """Capped exponential backoff with full jitter for the given retry attempt (0-based)"""
+    return random.uniform(0, min(config['backoff_max'], config['backoff_base'] * (2 ** attempt)))
+
+
+def parse_retry_after(response):
+    """Seconds to wait according to a Retry-After header, or None"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def guard(upstream):
+    """
+    Check the circuit breaker before calling an upstream through its own client
+
+    Returns:
+        CircuitBreaker: The breaker, on which the caller records the outcome
+
+    Raises:
+        UpstreamUnavailable: If the breaker is open
+    """
+    breaker = get_breaker(upstream)
+    _count(upstream, 'attempts')
+    if not breaker.allow():
+        _count(upstream, 'rejected')
+        raise UpstreamUnavailable(upstream, retry_after=breaker.retry_after())
+    return breaker
+
+
+def record_failure(upstream, breaker):
+    """Record a transient failure of a call made after guard()"""
+    _count(upstream, 'failures')
+    breaker.record_failure()
+
+
+def request(upstream, method, url, **kwargs):
+    """
+    Make an HTTP request to an upstream with a timeout, retries, a circuit breaker and a bulkhead
+
+    Connection errors, 429 and 502-504 responses (and 500 and read timeouts for
+    idempotent requests) are retried with capped exponential backoff and jitter,
+    honouring Retry-After. When retries run out the last response is returned, so
+    callers keep handling error statuses as before.
+
+    Args:
+        upstream (str): Upstream name, used for its policy, breaker and metrics
+        method (str): HTTP method
+        url (str): Request URL
+        **kwargs: Passed on to requests.request; `timeout` overrides the upstream's
+
+    Returns:
+        requests.Response: The final response
+
+    Raises:
+        UpstreamUnavailable: If the breaker is open or the upstream could not be reached
+        UpstreamSaturated: If the upstream's bulkhead is full
+    """
+    config = get_upstream_config(upstream)
+    kwargs.setdefault('timeout', config['timeout'])
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+    retry_statuses = IDEMPOTENT_RETRY_STATUSES if idempotent else RETRY_STATUSES
+
+    for attempt in range(config['retries'] + 1):
+        last_attempt = attempt == config['retries']
+
+        # The slot is only held while the request is in flight, not during backoff
+        with bulkhead(upstream):
+            breaker = guard(upstream)
+            try:
+                response = requests.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                record_failure(upstream, breaker)
+                # A read timeout on a POST may mean the request was carried out
+                retryable = isinstance(e, requests.exceptions.ConnectionError) or idempotent
+                if last_attempt or not retryable:
+                    raise UpstreamUnavailable(upstream, f"{upstream} could not be reached: {e}") from e
+                delay = backoff_delay(attempt, config)
+            except requests.exceptions.RequestException:
+                breaker.record_success()
+                raise
+            else:
+                if response.status_code not in retry_statuses:
+                    breaker.record_success()
+                    return response
+
+                record_failure(upstream, breaker)
+                retry_after = parse_retry_after(response)
+                if last_attempt or (retry_after is not None and retry_after > config['max_retry_after']):
+                    return response
+                delay = retry_after if retry_after is not None else backoff_delay(attempt, config)
+
+        _count(upstream, 'retries')
+        logger.info("retrying %s %s on %s in %.2fs (attempt %d)", method, url, upstream, delay, attempt + 1)
+        time.sleep(delay)
+
+
+def get_upstream_metrics():
+    """Snapshot of per-upstream attempt, retry and failure counts, breaker states and bulkhead usage"""
+    with _lock:
+        stats = {upstream: dict(counts) for upstream, counts in _stats.items()}
+        breakers = dict(_breakers)
+        bulkheads = dict(_bulkheads)
+
+    empty = {'attempts': 0, 'retries': 0, 'failures': 0, 'rejected': 0, 'saturated': 0}
+    for upstream, breaker in breakers.items():
+        entry = stats.setdefault(upstream, dict(empty))
+        entry['state'] = breaker.state
+        entry['consecutive_failures'] = breaker.consecutive_failures
+        entry['retry_after'] = breaker.retry_after()
+    for upstream, compartment in bulkheads.items():
+        entry = stats.setdefault(upstream, dict(empty))
+        with compartment.lock:
+            entry['in_flight'] = compartment.in_flight
+            entry['waiting'] = compartment.waiting
+        entry['max_concurrent'] = compartment.max_concurrent
+    return stats
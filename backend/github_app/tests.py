@@ -1,3 +1,1149 @@
-from django.test import TestCase
+import base64
+import io
+import json
+import os
+import tempfile
+import shutil
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
 
-# Create your tests here.
+from datetime import timedelta
+
+import groq
+import httpx
+from PIL import Image
+import requests
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import execution, execution_cache, images, jobs, model_router, resilience, utils, views
+from .ranking import bm25_scores, canonical_url, dedupe_search_items, extract_keywords, rerank_search_items
+from .documentation import RepositoryNotFound
+from .execution import outputs_match
+from .management.commands import warm_documentation
+from .models import DocumentationJob
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class QueryRepositoryBatchTests(TestCase):
+    url = '/api/query-repository/batch/'
+
+    def post(self, payload):
+        return self.client.post(self.url, payload, content_type='application/json')
+
+    def read_lines(self, response):
+        return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    def test_requires_questions(self):
+        response = self.post({'username': 'octo', 'repo_name': 'demo', 'questions': []})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(BATCH_QUERY_MAX_QUESTIONS=2)
+    def test_rejects_oversized_batch(self):
+        response = self.post({'username': 'octo', 'repo_name': 'demo', 'questions': ['a', 'b', 'c']})
+        self.assertEqual(response.status_code, 400)
+
+    @mock.patch.object(views, 'build_repository_context', return_value=None)
+    def test_unknown_repository(self, _):
+        response = self.post({'username': 'octo', 'repo_name': 'missing', 'questions': ['a']})
+        self.assertEqual(response.status_code, 404)
+
+    @mock.patch.object(views, 'build_repository_context', return_value='Repository: octo/demo')
+    def test_failed_question_does_not_abort_batch(self, _):
+        def answer(text_query, image_data=None, endpoint='query_repository'):
+            if 'break' in text_query:
+                raise Exception('model unavailable')
+            return 'answer'
+
+        with mock.patch.object(views, 'process_query_with_groq', side_effect=answer):
+            response = self.post({
+                'username': 'octo',
+                'repo_name': 'demo',
+                'questions': ['what is this?', {'id': 'q2', 'query': 'break please'}, 'and this?']
+            })
+            # Results are produced while the stream is consumed
+            lines = self.read_lines(response)
+
+        self.assertEqual(response.status_code, 200)
+        results = {line['index']: line for line in lines if line['type'] == 'result'}
+
+        self.assertEqual(results[0]['response'], 'answer')
+        self.assertEqual(results[1]['id'], 'q2')
+        self.assertEqual(results[1]['error'], 'model unavailable')
+        self.assertEqual(results[2]['response'], 'answer')
+        self.assertEqual(lines[-1], {'type': 'summary', 'total': 3, 'succeeded': 2, 'failed': 1})
+
+    @mock.patch.object(views, 'build_repository_context', return_value='Repository: octo/demo')
+    def test_file_fetched_once_per_path(self, _):
+        with mock.patch.object(views, 'fetch_repository_file', return_value='print(1)') as fetch, \
+                mock.patch.object(views, 'process_query_with_groq', return_value='ok') as process:
+            response = self.post({
+                'username': 'octo',
+                'repo_name': 'demo',
+                'questions': [
+                    {'query': 'explain', 'file_path': 'main.py'},
+                    {'query': 'optimize', 'file_path': 'main.py'}
+                ]
+            })
+            self.read_lines(response)
+
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual({call.kwargs['endpoint'] for call in process.call_args_list}, {'query_code'})
+
+
+def rate_limit_error():
+    request = httpx.Request('POST', 'https://api.groq.com/openai/v1/chat/completions')
+    return groq.RateLimitError('rate limited', response=httpx.Response(429, request=request), body=None)
+
+
+@override_settings(LLM_ROUTING={'probe_rate': 0})
+class ModelRouterTests(TestCase):
+    def setUp(self):
+        model_router._served.clear()
+        model_router._observed_latency.clear()
+        resilience._breakers.clear()
+
+    def models(self):
+        return model_router.DEFAULT_MODELS
+
+    def test_short_prompt_uses_small_model(self):
+        selected = model_router.select_models('query_repository', 'short question')
+        self.assertEqual(selected[0], self.models()['small'])
+
+    def test_long_prompt_uses_large_model_with_nearest_fallbacks(self):
+        selected = model_router.select_models('query_repository', 'x' * 40000)
+        self.assertEqual(selected, [self.models()['large'], self.models()['medium'], self.models()['small']])
+
+    def test_image_uses_vision_model(self):
+        self.assertEqual(model_router.select_models('query_code', 'hi', has_image=True), [self.models()['vision']])
+
+    def test_slow_tier_is_demoted_only_on_its_own_endpoint(self):
+        model_router.record_result('generate_documentation', self.models()['large'], 'success', 40.0)
+        self.assertEqual(model_router.select_models('query_repository', 'x' * 40000)[0], self.models()['large'])
+
+        model_router.record_result('query_repository', self.models()['large'], 'success', 40.0)
+        self.assertEqual(model_router.select_models('query_repository', 'x' * 40000)[0], self.models()['medium'])
+
+    def test_observed_latency_decays_back_to_seed(self):
+        model_router.record_result('query_repository', self.models()['large'], 'success', 40.0)
+        key = ('query_repository', self.models()['large'])
+        latency, observed_at = model_router._observed_latency[key]
+        model_router._observed_latency[key] = (latency, observed_at - 3600)
+
+        self.assertEqual(model_router.select_models('query_repository', 'x' * 40000)[0], self.models()['large'])
+
+    def test_falls_back_on_rate_limit(self):
+        calls = []
+
+        def call(model, timeout):
+            calls.append(model)
+            if len(calls) == 1:
+                raise rate_limit_error()
+            return 'answer'
+
+        result, model = model_router.call_with_fallback('query_repository', 'short question', call)
+
+        self.assertEqual(result, 'answer')
+        self.assertEqual(model, calls[1])
+        self.assertEqual(calls[0], self.models()['small'])
+        metrics = model_router.get_model_metrics()['endpoints']['query_repository']
+        self.assertEqual(metrics[calls[0]]['rate_limit'], 1)
+        self.assertEqual(metrics[calls[1]]['fallback_successes'], 1)
+
+    def test_falls_back_on_timeout(self):
+        def call(model, timeout):
+            if model == self.models()['small']:
+                raise httpx.ReadTimeout('timed out')
+            return model
+
+        result, model = model_router.call_with_fallback('query_repository', 'short question', call)
+        self.assertEqual(result, self.models()['medium'])
+
+    def test_other_errors_are_not_retried(self):
+        call = mock.Mock(side_effect=ValueError('bad prompt'))
+
+        with self.assertRaises(ValueError):
+            model_router.call_with_fallback('query_repository', 'short question', call)
+        self.assertEqual(call.call_count, 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, DOCUMENTATION_JOB_RETRY_BACKOFF=5)
+@mock.patch.object(jobs, 'start_workers')
+class DocumentationJobTests(TestCase):
+    def test_enqueue_reuses_active_job(self, _):
+        first = jobs.enqueue_documentation_job('octo', 'demo')
+        second = jobs.enqueue_documentation_job('octo', 'demo')
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(first.status, DocumentationJob.STATUS_QUEUED)
+
+    def test_cached_documentation_does_not_add_rows(self, _):
+        with mock.patch.object(jobs, 'get_cached_documentation', return_value='# Docs'):
+            first = jobs.enqueue_documentation_job('octo', 'demo')
+            second = jobs.enqueue_documentation_job('octo', 'demo')
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(second.status, DocumentationJob.STATUS_SUCCEEDED)
+        self.assertEqual(DocumentationJob.objects.count(), 1)
+
+    def test_claim_moves_oldest_runnable_job_to_running(self, _):
+        later = DocumentationJob.objects.create(username='octo', repo_name='later',
+                                                run_after=timezone.now() + timedelta(minutes=5))
+        job = DocumentationJob.objects.create(username='octo', repo_name='demo')
+
+        claimed = jobs.claim_next_job()
+
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.status, DocumentationJob.STATUS_RUNNING)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(jobs.claim_next_job())
+        later.refresh_from_db()
+        self.assertEqual(later.status, DocumentationJob.STATUS_QUEUED)
+
+    def test_failure_is_retried_with_exponential_backoff(self, _):
+        DocumentationJob.objects.create(username='octo', repo_name='demo', max_attempts=3)
+
+        with mock.patch.object(jobs, 'build_documentation', side_effect=Exception('groq down')):
+            for attempt, delay in [(1, 5), (2, 10)]:
+                job = jobs.claim_next_job()
+                self.assertEqual(job.attempts, attempt)
+                before = timezone.now()
+                jobs.run_job(job)
+                job.refresh_from_db()
+                self.assertEqual(job.status, DocumentationJob.STATUS_QUEUED)
+                self.assertAlmostEqual((job.run_after - before).total_seconds(), delay, delta=1)
+                DocumentationJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+
+            job = jobs.claim_next_job()
+            jobs.run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, DocumentationJob.STATUS_FAILED)
+        self.assertEqual(job.error, 'groq down')
+
+    def test_missing_repository_is_not_retried(self, _):
+        DocumentationJob.objects.create(username='octo', repo_name='missing')
+
+        with mock.patch.object(jobs, 'build_documentation', side_effect=RepositoryNotFound('not found')):
+            job = jobs.claim_next_job()
+            jobs.run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, DocumentationJob.STATUS_FAILED)
+
+    def test_success_stores_documentation(self, _):
+        DocumentationJob.objects.create(username='octo', repo_name='demo')
+
+        with mock.patch.object(jobs, 'build_documentation', return_value='# Docs'):
+            job = jobs.claim_next_job()
+            jobs.run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, DocumentationJob.STATUS_SUCCEEDED)
+        self.assertEqual(jobs.serialize_job(job)['documentation'], '# Docs')
+
+    def test_stale_jobs_are_requeued_until_attempts_run_out(self, _):
+        retry = DocumentationJob.objects.create(username='octo', repo_name='retry', status='running',
+                                                attempts=1, max_attempts=3)
+        exhausted = DocumentationJob.objects.create(username='octo', repo_name='crash', status='running',
+                                                    attempts=3, max_attempts=3)
+        DocumentationJob.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+
+        jobs.requeue_stale_jobs()
+
+        retry.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual(retry.status, DocumentationJob.STATUS_QUEUED)
+        self.assertEqual(exhausted.status, DocumentationJob.STATUS_FAILED)
+
+    def test_old_finished_jobs_are_pruned(self, _):
+        old = DocumentationJob.objects.create(username='octo', repo_name='old', status='succeeded',
+                                              finished_at=timezone.now() - timedelta(days=30))
+        recent = DocumentationJob.objects.create(username='octo', repo_name='recent', status='succeeded',
+                                                 finished_at=timezone.now())
+
+        jobs.prune_finished_jobs()
+
+        self.assertFalse(DocumentationJob.objects.filter(pk=old.pk).exists())
+        self.assertTrue(DocumentationJob.objects.filter(pk=recent.pk).exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SearchCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_normalization_ignores_case_punctuation_and_repeats(self):
+        self.assertEqual(
+            utils.normalize_search_query('React  Tutorial, react HOOKS react!'),
+            utils.normalize_search_query('react tutorial hooks')
+        )
+
+    def test_context_terms_are_order_independent(self):
+        context = ['viksit', 'Python']
+        self.assertEqual(
+            utils.normalize_search_query('tutorials for viksit python', context),
+            utils.normalize_search_query('Tutorials for Python viksit', context)
+        )
+
+    def test_different_queries_stay_distinct(self):
+        self.assertNotEqual(
+            utils.normalize_search_query('django tutorial'),
+            utils.normalize_search_query('flask tutorial')
+        )
+
+    def test_equivalent_queries_share_cached_result(self):
+        search_results = {'items': [{'title': 'Guide', 'link': 'https://example.com/guide', 'snippet': ''}]}
+
+        with mock.patch.object(utils, 'perform_paged_google_search', return_value=search_results) as search, \
+                mock.patch.object(utils, 'process_google_search_results', return_value='summary') as summarize:
+            first, first_hit = utils.cached_google_search('Django tutorial', 'key', 'cx')
+            second, second_hit = utils.cached_google_search('django  TUTORIAL!', 'key', 'cx')
+
+        self.assertFalse(first_hit)
+        self.assertTrue(second_hit)
+        self.assertEqual(second, first)
+        self.assertEqual(search.call_count, 1)
+        self.assertEqual(summarize.call_count, 1)
+
+    def test_failed_search_is_not_cached(self):
+        with mock.patch.object(utils, 'perform_paged_google_search', side_effect=Exception('quota')):
+            with self.assertRaises(Exception):
+                utils.cached_google_search('django tutorial', 'key', 'cx')
+
+        with mock.patch.object(utils, 'perform_paged_google_search', return_value={'items': []}), \
+                mock.patch.object(utils, 'process_google_search_results', return_value='summary'):
+            _, hit = utils.cached_google_search('django tutorial', 'key', 'cx')
+        self.assertFalse(hit)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+@mock.patch.object(views, 'build_search_context', return_value=(['demo', 'Python'], 'demo: a Python tool'))
+class ResourcePrefetchTests(TestCase):
+    url = '/api/google-search/prefetch/'
+
+    def post(self, payload):
+        return self.client.post(self.url, payload, content_type='application/json')
+
+    def read_lines(self, response):
+        return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    def fake_search(self, query, **kwargs):
+        return {'response': f'summary of {query}', 'raw_results': [{'title': query}]}, False
+
+    def test_results_are_streamed_then_summarized(self, _):
+        with mock.patch.object(views, 'cached_google_search', side_effect=self.fake_search):
+            response = self.post({'username': 'octo', 'repo_name': 'demo', 'language': 'Python'})
+            self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+            lines = self.read_lines(response)
+
+        results, summary = lines[:-1], lines[-1]
+        self.assertEqual({r['search_type'] for r in results}, {'Tutorials', 'Documentation', 'Examples'})
+        self.assertTrue(all(r['type'] == 'result' for r in results))
+        tutorials = next(r for r in results if r['search_type'] == 'Tutorials')
+        self.assertEqual(tutorials['query'], 'tutorials for demo Python')
+        self.assertEqual(tutorials['response'], 'summary of tutorials for demo Python')
+        self.assertFalse(tutorials['cached'])
+        self.assertEqual(summary['type'], 'summary')
+        self.assertEqual((summary['total'], summary['succeeded'], summary['failed']), (3, 3, 0))
+
+    def test_failed_search_type_does_not_abort_the_others(self, _):
+        def flaky(query, **kwargs):
+            if query.startswith('documentation'):
+                raise Exception('quota exceeded')
+            return self.fake_search(query)
+
+        with mock.patch.object(views, 'cached_google_search', side_effect=flaky):
+            lines = self.read_lines(self.post({'username': 'octo', 'repo_name': 'demo', 'language': 'Python'}))
+
+        by_type = {line['search_type']: line for line in lines[:-1]}
+        self.assertEqual(by_type['Documentation']['error'], 'quota exceeded')
+        self.assertIn('response', by_type['Tutorials'])
+        self.assertIn('response', by_type['Examples'])
+        self.assertEqual((lines[-1]['succeeded'], lines[-1]['failed']), (2, 1))
+
+    def test_language_is_looked_up_when_missing(self, _):
+        with mock.patch.object(views, 'get_repo_metadata', return_value=(200, {'language': 'Go'})), \
+                mock.patch.object(views, 'cached_google_search', side_effect=self.fake_search):
+            lines = self.read_lines(self.post({'username': 'octo', 'repo_name': 'demo'}))
+
+        self.assertEqual(lines[-1]['language'], 'Go')
+        self.assertEqual(lines[-1]['queries']['Examples'], 'example projects using demo Go')
+
+    def test_missing_repository_and_parameters(self, _):
+        self.assertEqual(self.post({'username': 'octo'}).status_code, 400)
+        with mock.patch.object(views, 'get_repo_metadata', return_value=(404, None)):
+            self.assertEqual(self.post({'username': 'octo', 'repo_name': 'missing'}).status_code, 404)
+
+
+class RateLimiterTests(TestCase):
+    def test_calls_are_spaced_by_the_rate(self):
+        clock = [100.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(round(seconds, 3))
+            clock[0] += seconds
+
+        with mock.patch.object(warm_documentation.time, 'monotonic', side_effect=lambda: clock[0]), \
+                mock.patch.object(warm_documentation.time, 'sleep', side_effect=sleep):
+            limiter = warm_documentation.RateLimiter(4)
+            for _ in range(3):
+                limiter.acquire()
+
+        self.assertEqual(sleeps, [0.25, 0.25])
+
+    def test_zero_rate_is_unlimited(self):
+        with mock.patch.object(warm_documentation.time, 'sleep') as sleep:
+            limiter = warm_documentation.RateLimiter(0)
+            for _ in range(3):
+                limiter.acquire()
+        sleep.assert_not_called()
+
+
+@mock.patch.object(warm_documentation, 'build_documentation')
+@mock.patch.object(warm_documentation, 'get_repo_readme')
+@mock.patch.object(warm_documentation, 'get_repo_tree')
+@mock.patch.object(warm_documentation, 'get_repo_contents')
+class WarmDocumentationTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.state_file = os.path.join(directory, 'state.json')
+
+    def warm(self, *repos, metadata=None, **options):
+        def repo_metadata(username, repo_name, refresh=False):
+            return (metadata or {}).get(f'{username}/{repo_name}', (200, {}))
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with mock.patch.object(warm_documentation, 'get_repo_metadata', side_effect=repo_metadata):
+            call_command('warm_documentation', *repos, state_file=self.state_file, github_rate=0, groq_rate=0,
+                         workers=1, stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_every_repository_is_warmed_and_the_state_file_removed(self, contents, tree, readme, documentation):
+        output, _ = self.warm('octo/one', 'octo/two')
+
+        self.assertIn('Warmed 2 repositories, 0 failed, 0 skipped', output)
+        self.assertEqual(tree.call_args_list, [mock.call('octo', 'one', refresh=True), mock.call('octo', 'two', refresh=True)])
+        self.assertEqual(documentation.call_count, 2)
+        self.assertFalse(os.path.exists(self.state_file))
+
+    def test_interrupted_run_resumes_after_completed_and_missing_repositories(self, contents, tree, readme,
+                                                                              documentation):
+        with open(self.state_file, 'w') as f:
+            json.dump({'completed': ['octo/one'], 'missing': ['octo/gone'], 'failed': {'octo/two': 'timeout'}}, f)
+
+        output, _ = self.warm('octo/one', 'octo/gone', 'octo/two')
+
+        self.assertIn('Resuming: 2 of 3 repositories already warmed', output)
+        self.assertEqual(tree.call_args_list, [mock.call('octo', 'two', refresh=True)])
+        self.assertFalse(os.path.exists(self.state_file))
+
+    def test_restart_ignores_the_state_file(self, contents, tree, readme, documentation):
+        with open(self.state_file, 'w') as f:
+            json.dump({'completed': ['octo/one']}, f)
+
+        self.warm('octo/one', restart=True, skip_documentation=True)
+
+        self.assertEqual(tree.call_count, 1)
+        documentation.assert_not_called()
+
+    def test_outcomes_are_saved_until_the_run_finishes(self, contents, tree, readme, documentation):
+        saved = []
+        remove = os.remove
+
+        def read_then_remove(path):
+            with open(path) as f:
+                saved.append(json.load(f))
+            remove(path)
+
+        with mock.patch.object(warm_documentation.os, 'remove', side_effect=read_then_remove):
+            _, errors = self.warm('octo/gone', 'octo/one', metadata={'octo/gone': (404, None)})
+
+        self.assertIn('octo/gone: not found', errors)
+        self.assertEqual(saved, [{'completed': ['octo/one'], 'missing': ['octo/gone'], 'failed': {}}])
+        self.assertFalse(os.path.exists(self.state_file))
+
+    def test_invalid_repository_names_are_rejected(self, *_):
+        with self.assertRaises(CommandError):
+            self.warm('not-a-repo')
+
+
+def encode_image(image, image_format, **options):
+    output = io.BytesIO()
+    image.save(output, format=image_format, **options)
+    return output.getvalue()
+
+
+def decode_image(data):
+    return Image.open(io.BytesIO(data))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ImagePreparationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_unsupported_format_is_rejected(self):
+        with self.assertRaisesMessage(images.ImageValidationError, 'Unsupported image format: TIFF'):
+            images.compress_image(encode_image(Image.new('RGB', (10, 10)), 'TIFF'))
+
+    @override_settings(IMAGE_MAX_PIXELS=100)
+    def test_too_many_pixels_are_rejected_before_decoding(self):
+        with self.assertRaisesMessage(images.ImageValidationError, 'Image dimensions are too large'):
+            images.compress_image(encode_image(Image.new('RGB', (20, 10)), 'PNG'))
+
+    @override_settings(IMAGE_MAX_UPLOAD_BYTES=10)
+    def test_oversized_upload_is_rejected(self):
+        with self.assertRaisesMessage(images.ImageValidationError, 'upload limit'):
+            images.compress_image(encode_image(Image.new('RGB', (10, 10)), 'PNG'))
+
+    def test_garbage_and_bad_base64_are_rejected(self):
+        with self.assertRaises(images.ImageValidationError):
+            images.compress_image(b'not an image')
+        with self.assertRaisesMessage(images.ImageValidationError, 'not valid base64'):
+            images.prepare_image('%%%')
+
+    def test_exif_orientation_is_applied_and_metadata_dropped(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Rotate 90 degrees clockwise when displayed
+        raw = encode_image(Image.new('RGB', (40, 20), 'blue'), 'JPEG', exif=exif.tobytes())
+
+        result = decode_image(images.compress_image(raw))
+
+        self.assertEqual(result.format, 'JPEG')
+        self.assertEqual(result.size, (20, 40))
+        self.assertEqual(dict(result.getexif()), {})
+
+    def test_transparency_is_flattened_onto_white(self):
+        image = Image.new('RGBA', (10, 10), (0, 0, 0, 0))
+        image.putpixel((0, 0), (0, 0, 0, 255))
+
+        result = decode_image(images.compress_image(encode_image(image, 'PNG')))
+
+        self.assertEqual(result.mode, 'RGB')
+        self.assertTrue(all(channel > 240 for channel in result.getpixel((9, 9))))
+        self.assertTrue(all(channel < 40 for channel in result.getpixel((0, 0))))
+
+    @override_settings(IMAGE_MAX_DIMENSION=64)
+    def test_large_images_are_thumbnailed_keeping_the_aspect_ratio(self):
+        result = decode_image(images.compress_image(encode_image(Image.new('RGB', (400, 200)), 'PNG')))
+        self.assertEqual(result.size, (64, 32))
+
+        small = decode_image(images.compress_image(encode_image(Image.new('RGB', (30, 20)), 'PNG')))
+        self.assertEqual(small.size, (30, 20))
+
+    def test_prepared_images_are_cached_by_content(self):
+        raw = encode_image(Image.new('RGB', (30, 20), 'green'), 'PNG')
+        other = encode_image(Image.new('RGB', (30, 20), 'red'), 'PNG')
+
+        with mock.patch.object(images, 'compress_image', wraps=images.compress_image) as compress:
+            first = images.prepare_image(base64.b64encode(raw).decode())
+            again = images.prepare_image('data:image/png;base64,' + base64.b64encode(raw).decode())
+            images.prepare_image(other)
+
+        self.assertEqual(first, again)
+        self.assertEqual(decode_image(base64.b64decode(first)).format, 'JPEG')
+        self.assertEqual(compress.call_count, 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RepoContentsRefTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def github_response(self, data):
+        response = mock.Mock(status_code=200)
+        response.json.return_value = data
+        return response
+
+    def test_ref_is_requested_and_cached_separately(self):
+        listing = [{'name': 'app.py', 'path': 'app.py', 'type': 'file'}]
+        with mock.patch.object(utils.resilience, 'request', return_value=self.github_response(listing)) as request:
+            utils.get_repo_contents('octo', 'demo', 'src')
+            utils.get_repo_contents('octo', 'demo', 'src', ref='feature/x')
+            utils.get_repo_contents('octo', 'demo', 'src', ref='feature/x')
+
+        urls = [call.args[2] for call in request.call_args_list]
+        self.assertEqual(urls, [
+            'https://api.github.com/repos/octo/demo/contents/src',
+            'https://api.github.com/repos/octo/demo/contents/src?ref=feature%2Fx',
+        ])
+
+    def test_view_passes_ref(self):
+        with mock.patch.object(views, 'get_repo_contents', return_value=(200, [])) as contents:
+            response = self.client.get('/api/repo-structure/octo/demo/', {'path': 'src', 'ref': 'v1.0'})
+
+        self.assertEqual(response.status_code, 200)
+        contents.assert_called_once_with('octo', 'demo', 'src', refresh=False, ref='v1.0')
+
+    def test_view_refresh_skips_cache(self):
+        with mock.patch.object(views, 'get_repo_contents', return_value=(200, [])) as contents:
+            self.client.get('/api/repo-structure/octo/demo/', {'refresh': '1'})
+
+        contents.assert_called_once_with('octo', 'demo', '', refresh=True, ref=None)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RepoTreeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def github_response(self, data):
+        response = mock.Mock(status_code=200)
+        response.json.return_value = data
+        return response
+
+    def test_tree_of_default_branch_is_compacted_and_cached(self):
+        git_tree = {
+            'sha': 'abc123',
+            'truncated': False,
+            'tree': [
+                {'path': 'src', 'type': 'tree', 'sha': '1', 'url': 'https://api.github.com/x'},
+                {'path': 'src/app.py', 'type': 'blob', 'size': 42, 'sha': '2', 'url': 'https://api.github.com/y'},
+                {'path': 'vendor/lib', 'type': 'commit', 'sha': '3'},
+            ]
+        }
+        with mock.patch.object(utils, 'get_repo_metadata', return_value=(200, {'default_branch': 'develop'})), \
+                mock.patch.object(utils.resilience, 'request', return_value=self.github_response(git_tree)) as request:
+            status_code, tree = utils.get_repo_tree('octo', 'demo')
+            utils.get_repo_tree('octo', 'demo')
+
+        self.assertEqual(status_code, 200)
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual(request.call_args.args[2], 'https://api.github.com/repos/octo/demo/git/trees/develop?recursive=1')
+        self.assertEqual(tree, {
+            'ref': 'develop',
+            'sha': 'abc123',
+            'truncated': False,
+            'entries': [['src', 'dir', None], ['src/app.py', 'file', 42]]
+        })
+
+    def test_missing_repository(self):
+        with mock.patch.object(utils, 'get_repo_metadata', return_value=(404, None)):
+            response = self.client.get('/api/repo-tree/octo/missing/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_view_passes_ref_and_refresh(self):
+        tree = {'ref': 'v1.0', 'sha': 'abc', 'truncated': False, 'entries': []}
+        with mock.patch.object(views, 'get_repo_tree', return_value=(200, tree)) as get_tree:
+            response = self.client.get('/api/repo-tree/octo/demo/', {'ref': 'v1.0', 'refresh': '1'})
+
+        self.assertEqual(response.json(), tree)
+        get_tree.assert_called_once_with('octo', 'demo', 'v1.0', refresh=True)
+
+
+class RepoStructurePagingTests(TestCase):
+    url = '/api/repo-structure/octo/demo/'
+
+    def setUp(self):
+        listing = [{'name': f'file{i:04d}.txt', 'path': f'data/file{i:04d}.txt', 'type': 'file'} for i in range(250)]
+        listing.append({'name': 'README.md', 'path': 'data/README.md', 'type': 'file'})
+        patcher = mock.patch.object(views, 'get_repo_contents', return_value=(200, listing))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_whole_listing_without_limit(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual(len(data['structure']), 251)
+        self.assertEqual(data['total'], 251)
+        self.assertFalse(data['has_more'])
+
+    def test_pages_are_sliced(self):
+        first = self.client.get(self.url, {'limit': 100}).json()
+        last = self.client.get(self.url, {'offset': 200, 'limit': 100}).json()
+
+        self.assertEqual([item['name'] for item in first['structure']][:2], ['file0000.txt', 'file0001.txt'])
+        self.assertEqual(len(first['structure']), 100)
+        self.assertTrue(first['has_more'])
+        self.assertEqual(len(last['structure']), 51)
+        self.assertFalse(last['has_more'])
+        self.assertEqual(last['total'], 251)
+
+    def test_filter_is_applied_before_slicing(self):
+        data = self.client.get(self.url, {'q': 'readme', 'limit': 10}).json()
+        self.assertEqual([item['name'] for item in data['structure']], ['README.md'])
+        self.assertEqual(data['total'], 1)
+
+    @override_settings(REPO_STRUCTURE_MAX_PAGE_SIZE=20)
+    def test_limit_is_capped(self):
+        data = self.client.get(self.url, {'limit': 1000}).json()
+        self.assertEqual(len(data['structure']), 20)
+
+    def test_invalid_paging(self):
+        self.assertEqual(self.client.get(self.url, {'limit': 'all'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'offset': -1}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'limit': 0}).status_code, 400)
+
+
+class SearchRankingTests(TestCase):
+    def test_canonical_url_ignores_presentation_differences(self):
+        self.assertEqual(
+            canonical_url('http://www.Example.com/docs/?utm_source=x&b=2&a=1#intro'),
+            canonical_url('https://example.com/docs?a=1&b=2')
+        )
+        self.assertNotEqual(canonical_url('https://example.com/a'), canonical_url('https://example.com/b'))
+
+    def test_dedupe_keeps_first_occurrence(self):
+        items = [
+            {'link': 'https://example.com/guide', 'title': 'first'},
+            {'link': 'https://www.example.com/guide/', 'title': 'duplicate'},
+            {'link': 'https://example.com/other', 'title': 'other'},
+        ]
+        self.assertEqual([item['title'] for item in dedupe_search_items(items)], ['first', 'other'])
+
+    def test_bm25_prefers_documents_with_query_terms(self):
+        scores = bm25_scores(['django', 'orm'], [['flask', 'routing'], ['django', 'orm', 'queries'], ['django']])
+        self.assertEqual(scores[0], 0)
+        self.assertGreater(scores[1], scores[2])
+        self.assertGreater(scores[2], scores[0])
+
+    def test_rerank_moves_relevant_results_up(self):
+        items = [
+            {'title': 'Cooking recipes', 'snippet': 'pasta', 'link': 'https://a.example/1'},
+            {'title': 'Django REST framework tutorial', 'snippet': 'serializers', 'link': 'https://b.example/2'},
+        ]
+        reranked = rerank_search_items(items, 'django rest api serializers')
+        self.assertEqual(reranked[0]['link'], 'https://b.example/2')
+
+    def test_rerank_without_context_keeps_order(self):
+        items = [{'title': 'a', 'link': 'https://a.example'}, {'title': 'b', 'link': 'https://b.example'}]
+        self.assertEqual(rerank_search_items(items, ''), items)
+
+    def test_extract_keywords_skips_code_and_stopwords(self):
+        readme = "# Viksit\nViksit explores repositories with Groq.\n```python\nimport secret\n```\nViksit uses Streamlit."
+        keywords = extract_keywords(readme)
+        self.assertEqual(keywords[0], 'viksit')
+        self.assertNotIn('secret', keywords)
+        self.assertNotIn('with', keywords)
+
+    def test_paged_search_tolerates_later_page_failure(self):
+        def page(query, api_key, cx_id, num_results=10, start=1):
+            if start > 1:
+                raise Exception('quota')
+            return {'items': [{'link': f'https://example.com/{i}'} for i in range(num_results)]}
+
+        with mock.patch.object(utils, 'perform_google_search', side_effect=page) as search:
+            results = utils.perform_paged_google_search('q', 'key', 'cx', num_results=30)
+
+        self.assertEqual(search.call_count, 3)
+        self.assertEqual(len(results['items']), 10)
+
+    def test_paged_search_fails_when_first_page_fails(self):
+        with mock.patch.object(utils, 'perform_google_search', side_effect=Exception('quota')):
+            with self.assertRaises(Exception):
+                utils.perform_paged_google_search('q', 'key', 'cx', num_results=20)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ExecutionCacheTests(TestCase):
+    url = '/api/execute-code/'
+
+    def setUp(self):
+        cache.clear()
+
+    def jdoodle_response(self, output='42\n'):
+        return mock.Mock(status_code=200, json=mock.Mock(return_value={
+            'output': output, 'statusCode': 200, 'memory': '1024', 'cpuTime': '0.01'
+        }))
+
+    def execute(self, script, **extra):
+        payload = {'script': script, 'language': 'python3', 'stdin': '6 7', **extra}
+        return self.client.post(self.url, payload, content_type='application/json')
+
+    def test_identical_deterministic_runs_hit_the_cache(self):
+        with mock.patch.object(views, 'execute_with_jdoodle', return_value=self.jdoodle_response()) as remote:
+            first = self.execute('a, b = map(int, input().split())\nprint(a * b)').json()
+            second = self.execute('a, b = map(int, input().split())\nprint(a * b)').json()
+            other_input = self.execute('a, b = map(int, input().split())\nprint(a * b)', stdin='1 2').json()
+
+        self.assertFalse(first['cached'])
+        self.assertTrue(second['cached'])
+        self.assertFalse(other_input['cached'])
+        self.assertEqual(second['output'], '42\n')
+        self.assertEqual(remote.call_count, 2)
+
+    def test_nondeterministic_programs_always_run(self):
+        with mock.patch.object(views, 'execute_with_jdoodle', return_value=self.jdoodle_response()) as remote:
+            self.execute('import random\nprint(random.random())')
+            response = self.execute('import random\nprint(random.random())').json()
+
+        self.assertFalse(response['cached'])
+        self.assertEqual(remote.call_count, 2)
+
+    def test_clients_can_opt_out(self):
+        with mock.patch.object(views, 'execute_with_jdoodle', return_value=self.jdoodle_response()) as remote:
+            self.execute('print(1)')
+            response = self.execute('print(1)', cache=False).json()
+
+        self.assertFalse(response['cached'])
+        self.assertEqual(remote.call_count, 2)
+
+    @override_settings(EXECUTION_CACHE_MAX_OUTPUT_BYTES=4)
+    def test_large_outputs_are_not_stored(self):
+        with mock.patch.object(views, 'execute_with_jdoodle', return_value=self.jdoodle_response('x' * 100)) as remote:
+            self.execute('print("x" * 100)')
+            self.execute('print("x" * 100)')
+
+        self.assertEqual(remote.call_count, 2)
+
+    def test_remote_errors_are_not_cached(self):
+        failure = mock.Mock(status_code=429)
+        with mock.patch.object(views, 'execute_with_jdoodle', return_value=failure):
+            response = self.execute('print(1)')
+        self.assertEqual(response.status_code, 429)
+
+        with mock.patch.object(views, 'execute_with_jdoodle', return_value=self.jdoodle_response()):
+            self.assertFalse(self.execute('print(1)').json()['cached'])
+
+    def test_metrics_count_hits(self):
+        before = execution_cache.get_execution_cache_metrics()['hits']
+        with mock.patch.object(views, 'execute_with_jdoodle', return_value=self.jdoodle_response()):
+            self.execute('print(2)')
+            self.execute('print(2)')
+
+        self.assertEqual(self.client.get('/api/metrics/execution/').json()['hits'], before + 1)
+
+    @override_settings(LOCAL_EXECUTION={'enabled': True})
+    def test_engines_are_cached_separately(self):
+        local_result = {'output': 'local\n', 'statusCode': 200, 'memory': '900', 'cpuTime': '0.01', 'engine': 'local'}
+        with mock.patch.object(views, 'execute_with_jdoodle', return_value=self.jdoodle_response()) as remote, \
+                mock.patch.object(views, 'execute_locally', return_value=local_result) as local:
+            self.execute('print(6 * 7)', engine='jdoodle')
+            response = self.execute('print(6 * 7)', engine='local').json()
+            again = self.execute('print(6 * 7)', engine='local').json()
+
+        self.assertFalse(response['cached'])
+        self.assertEqual(response['output'], 'local\n')
+        self.assertTrue(again['cached'])
+        self.assertEqual((remote.call_count, local.call_count), (1, 1))
+
+    def test_local_engine_is_refused_unless_enabled(self):
+        response = self.execute('print(1)', engine='local')
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, EXECUTION_BATCH_MAX_CASES=3)
+class ExecutionBatchTests(TestCase):
+    url = '/api/execute-code/'
+    script = 'a, b = map(int, input().split())\nprint(a + b)'
+
+    def setUp(self):
+        cache.clear()
+
+    def fake_jdoodle(self, script, language, stdin='', *args, **kwargs):
+        a, b = map(int, stdin.split())
+        return mock.Mock(status_code=200, json=mock.Mock(return_value={
+            'output': f'{a + b}\n', 'statusCode': 200, 'memory': '1024', 'cpuTime': '0.01'
+        }))
+
+    def execute(self, cases, **extra):
+        payload = {'script': self.script, 'language': 'python3', 'cases': cases, **extra}
+        return self.client.post(self.url, payload, content_type='application/json')
+
+    def test_cases_are_graded_against_expected_output(self):
+        cases = [
+            {'id': 'small', 'stdin': '1 2', 'expected_output': '3'},
+            {'stdin': '2 2', 'expected_output': '5\n'},
+            '4 5',
+        ]
+        with mock.patch.object(views, 'execute_with_jdoodle', side_effect=self.fake_jdoodle):
+            data = self.execute(cases).json()
+
+        self.assertEqual([r['id'] for r in data['results']], ['small', 1, 2])
+        self.assertTrue(data['results'][0]['passed'])
+        self.assertFalse(data['results'][1]['passed'])
+        self.assertNotIn('passed', data['results'][2])
+        self.assertEqual(data['results'][2]['output'], '9\n')
+        self.assertEqual(data['summary'], {'total': 3, 'graded': 2, 'passed': 1, 'failed': 1, 'errors': 0})
+
+    def test_failed_cases_are_reported_without_failing_the_batch(self):
+        def flaky(script, language, stdin='', *args, **kwargs):
+            if stdin == '0 0':
+                return mock.Mock(status_code=429)
+            return self.fake_jdoodle(script, language, stdin)
+
+        with mock.patch.object(views, 'execute_with_jdoodle', side_effect=flaky):
+            response = self.execute(['1 1', '0 0'])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['output'], '2\n')
+        self.assertIn('error', response.json()['results'][1])
+        self.assertEqual(response.json()['summary']['errors'], 1)
+
+    def test_cached_cases_are_not_run_again(self):
+        with mock.patch.object(views, 'execute_with_jdoodle', side_effect=self.fake_jdoodle) as remote:
+            self.execute(['1 2'])
+            data = self.execute(['1 2', '3 4']).json()
+
+        self.assertEqual(remote.call_count, 2)
+        self.assertEqual([r['cached'] for r in data['results']], [True, False])
+
+    def test_batch_limits_are_enforced(self):
+        self.assertEqual(self.execute(['1 1'] * 4).status_code, 400)
+        self.assertEqual(self.execute([]).status_code, 400)
+        self.assertEqual(self.execute(['1 1'], compileOnly=True).status_code, 400)
+
+    def test_output_comparison_ignores_trailing_whitespace(self):
+        self.assertTrue(outputs_match('1 \n2\n\n', '1\n2'))
+        self.assertTrue(outputs_match('1\r\n2\r\n', '1\n2\n'))
+        self.assertFalse(outputs_match('1\n\n2', '1\n2'))
+
+
+SANDBOX_LIMITS = {**execution.DEFAULT_LIMITS, 'enabled': True, 'time_limit': 5.0, 'pool_size': 1}
+
+
+@unittest.skipUnless(execution.resource is not None and sys.platform.startswith('linux'),
+                     "local execution needs POSIX rlimits and /proc")
+@override_settings(LOCAL_EXECUTION=SANDBOX_LIMITS)
+class LocalExecutionTests(TestCase):
+    @override_settings(LOCAL_EXECUTION={**SANDBOX_LIMITS, 'enabled': False})
+    def test_refused_unless_enabled(self):
+        self.assertEqual(execution.supported_languages(), [])
+        with self.assertRaises(execution.ExecutionUnavailable):
+            execution.execute_locally('print(1)', 'python3')
+
+    def test_cases_run_in_order_and_report_the_programs_own_memory(self):
+        results = execution.execute_locally_cases('print(input() * 2)', 'python3', ['a', 'b', 'c'], max_workers=2)
+
+        self.assertEqual([r['output'] for r in results], ['aa\n', 'bb\n', 'cc\n'])
+        self.assertTrue(all(r['isExecutionSuccess'] and r['engine'] == 'local' for r in results))
+        # Measured after exec, so the test process's own (larger) memory is not reported
+        server_peak = execution._read_peak_memory(os.getpid())
+        for result in results:
+            if result['memory'] is not None:
+                self.assertLess(int(result['memory']), server_peak)
+
+    @override_settings(LOCAL_EXECUTION={**SANDBOX_LIMITS, 'time_limit': 0.5})
+    def test_runaway_program_is_killed_at_the_time_limit(self):
+        started = time.monotonic()
+        result = execution.execute_locally('while True:\n    pass', 'python3')
+
+        self.assertTrue(result['timedOut'])
+        self.assertFalse(result['isExecutionSuccess'])
+        self.assertIn('[Execution timed out]', result['output'])
+        self.assertLess(time.monotonic() - started, 4)
+
+    @override_settings(LOCAL_EXECUTION={**SANDBOX_LIMITS, 'max_output_bytes': 100})
+    def test_output_is_capped(self):
+        result = execution.execute_locally('print("x" * 10000)', 'python3')
+
+        self.assertTrue(result['output'].startswith('x' * 100))
+        self.assertIn('[Output truncated]', result['output'])
+
+    @override_settings(LOCAL_EXECUTION={**SANDBOX_LIMITS, 'memory_mb': 64})
+    def test_address_space_limit_is_applied(self):
+        result = execution.execute_locally('data = bytearray(512 * 1024 * 1024)', 'python3')
+
+        self.assertNotEqual(result['exitCode'], 0)
+        self.assertIn('MemoryError', result['output'])
+
+    def test_compile_only_checks_syntax(self):
+        self.assertTrue(execution.execute_locally('print(1)', 'python3', compile_only=True)['isCompiled'])
+        self.assertFalse(execution.execute_locally('print(', 'python3', compile_only=True)['isCompiled'])
+
+    @unittest.skipUnless(shutil.which('gcc'), "gcc is not installed")
+    def test_compiled_language_is_built_once_and_run_per_case(self):
+        source = '#include <stdio.h>\nint main(void) { int a, b; scanf("%d %d", &a, &b); printf("%d\\n", a + b); }'
+        results = execution.execute_locally_cases(source, 'c', ['1 2', '3 4'])
+        self.assertEqual([r['output'] for r in results], ['3\n', '7\n'])
+
+        broken = execution.execute_locally_cases('int main(void) { return }', 'c', ['', ''])
+        self.assertEqual([r['isCompiled'] for r in broken], [False, False])
+        self.assertIn('error', broken[0]['output'])
+
+
+@unittest.skipUnless(execution.resource is not None and sys.platform.startswith('linux'),
+                     "local execution needs POSIX rlimits and /proc")
+class WarmPoolTests(TestCase):
+    def setUp(self):
+        self.pool = execution.WarmPool(execution.LANGUAGES['python3']['warm'], 2)
+        self.addCleanup(self.pool.close)
+
+    def wait_for_idle(self, count, timeout=10):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.pool.condition:
+                if len(self.pool.idle) >= count:
+                    return
+            time.sleep(0.05)
+        self.fail(f"pool did not refill to {count} processes")
+
+    def refill_workers(self):
+        return [thread for thread in threading.enumerate() if thread is self.pool.worker]
+
+    def test_one_worker_refills_the_pool(self):
+        processes = [self.pool.acquire(SANDBOX_LIMITS) for _ in range(3)]
+        for process in processes:
+            self.addCleanup(process.cleanup)
+
+        self.wait_for_idle(2)
+        self.assertEqual(len(self.refill_workers()), 1)
+        self.assertEqual(len(self.pool.idle), 2)
+
+    def test_processes_started_with_other_limits_are_discarded(self):
+        self.pool.fill(SANDBOX_LIMITS)
+        old = list(self.pool.idle)
+        limits = {**SANDBOX_LIMITS, 'memory_mb': 128}
+
+        process = self.pool.acquire(limits)
+        self.addCleanup(process.cleanup)
+
+        self.assertNotIn(process, old)
+        self.assertEqual(process.limits, limits)
+
+    def test_pooled_process_runs_one_program(self):
+        self.pool.fill(SANDBOX_LIMITS)
+        process = self.pool.acquire(SANDBOX_LIMITS)
+        self.addCleanup(process.cleanup)
+
+        script, stdin = b'print(input())', b'hello'
+        result = process.run(f"{len(script)} {len(stdin)}\n".encode() + script + stdin, 5)
+        self.assertEqual(result['output'], 'hello\n')
+        self.assertEqual(result['exit_code'], 0)
+
+
+@override_settings(UPSTREAM_RESILIENCE={'default': {'failure_threshold': 3, 'reset_timeout': 30}})
+@mock.patch.object(resilience.time, 'sleep')
+class ResilienceTests(TestCase):
+    def setUp(self):
+        resilience._breakers.clear()
+        resilience._bulkheads.clear()
+        resilience._stats.clear()
+
+    def response(self, status_code, headers=None):
+        return mock.Mock(status_code=status_code, headers=headers or {})
+
+    def test_transient_errors_are_retried_with_backoff(self, sleep):
+        responses = [self.response(503), requests.exceptions.ConnectionError('reset'), self.response(200)]
+        with mock.patch.object(resilience.requests, 'request', side_effect=responses) as send:
+            response = resilience.request('github', 'GET', 'https://api.github.com/x')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(send.call_count, 3)
+        self.assertEqual(send.call_args.kwargs['timeout'], resilience.DEFAULT_UPSTREAMS['github']['timeout'])
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(resilience.get_upstream_metrics()['github']['retries'], 2)
+
+    def test_retry_after_is_honoured_unless_too_long(self, sleep):
+        responses = [self.response(429, {'Retry-After': '2'}), self.response(200)]
+        with mock.patch.object(resilience.requests, 'request', side_effect=responses):
+            resilience.request('google_search', 'GET', 'https://example.com')
+        sleep.assert_called_once_with(2.0)
+
+        with mock.patch.object(resilience.requests, 'request', return_value=self.response(429, {'Retry-After': '3600'})) as send:
+            self.assertEqual(resilience.request('google_search', 'GET', 'https://example.com').status_code, 429)
+        self.assertEqual(send.call_count, 1)
+
+    def test_posts_are_not_retried_on_500_or_read_timeouts(self, sleep):
+        with mock.patch.object(resilience.requests, 'request', return_value=self.response(500)) as send:
+            self.assertEqual(resilience.request('jdoodle', 'POST', 'https://example.com').status_code, 500)
+        self.assertEqual(send.call_count, 1)
+
+        resilience._breakers.clear()
+        with mock.patch.object(resilience.requests, 'request', side_effect=requests.exceptions.ReadTimeout()) as send:
+            with self.assertRaises(resilience.UpstreamUnavailable):
+                resilience.request('jdoodle', 'POST', 'https://example.com')
+        self.assertEqual(send.call_count, 1)
+
+    def test_breaker_opens_fails_fast_and_recovers(self, sleep):
+        with mock.patch.object(resilience.requests, 'request', return_value=self.response(502)) as send:
+            resilience.request('jdoodle', 'POST', 'https://example.com')
+            self.assertEqual(send.call_count, 3)
+            with self.assertRaises(resilience.UpstreamUnavailable) as raised:
+                resilience.request('jdoodle', 'POST', 'https://example.com')
+            self.assertEqual(send.call_count, 3)
+
+        self.assertGreater(raised.exception.retry_after, 0)
+        metrics = resilience.get_upstream_metrics()['jdoodle']
+        self.assertEqual(metrics['state'], 'open')
+        self.assertEqual(metrics['rejected'], 1)
+
+        breaker = resilience.get_breaker('jdoodle')
+        breaker.opened_at -= 30
+        self.assertEqual(breaker.state, 'half_open')
+        with mock.patch.object(resilience.requests, 'request', return_value=self.response(200)):
+            resilience.request('jdoodle', 'POST', 'https://example.com')
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_open_breaker_returns_503_with_retry_after(self, sleep):
+        breaker = resilience.get_breaker('github')
+        for _ in range(3):
+            breaker.record_failure()
+
+        response = self.client.get('/api/repositories/octo/')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['upstream'], 'github')
+        self.assertIn('Retry-After', response)
+
+    def test_groq_outage_skips_the_fallback_models(self, sleep):
+        call = mock.Mock(side_effect=groq.APIConnectionError(request=httpx.Request('POST', 'https://api.groq.com')))
+        for _ in range(3):
+            with self.assertRaises(groq.APIConnectionError):
+                model_router.call_with_fallback('query_repository', 'short question', call)
+
+        attempts = call.call_count
+        with self.assertRaises(resilience.UpstreamUnavailable):
+            model_router.call_with_fallback('query_repository', 'short question', call)
+        self.assertEqual(call.call_count, attempts)
+
+
+@override_settings(UPSTREAM_RESILIENCE={
+    'github': {'max_concurrent': 1, 'max_queue': 1, 'queue_timeout': 0.05},
+    'groq': {'max_concurrent': 1, 'max_queue': 0},
+})
+class BulkheadTests(TestCase):
+    def setUp(self):
+        resilience._breakers.clear()
+        resilience._bulkheads.clear()
+        resilience._stats.clear()
+
+    def test_full_bulkhead_refuses_after_the_queue_timeout(self):
+        compartment = resilience.get_bulkhead('github')
+        self.assertTrue(compartment.acquire())
+        self.assertFalse(compartment.acquire())
+        compartment.release()
+        self.assertTrue(compartment.acquire())
+        compartment.release()
+
+    def test_full_queue_refuses_immediately(self):
+        compartment = resilience.get_bulkhead('groq')
+        self.assertTrue(compartment.acquire())
+        with self.assertRaises(resilience.UpstreamSaturated):
+            model_router.call_with_fallback('query_repository', 'short question', mock.Mock(return_value='ok'))
+        compartment.release()
+
+        self.assertEqual(model_router.call_with_fallback('query_repository', 'short question', mock.Mock(return_value='ok'))[0], 'ok')
+        self.assertEqual(resilience.get_upstream_metrics()['groq']['saturated'], 1)
+
+    def test_saturated_upstream_returns_503_with_retry_after(self):
+        compartment = resilience.get_bulkhead('github')
+        compartment.acquire()
+        try:
+            response = self.client.get('/api/repositories/octo/')
+        finally:
+            compartment.release()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '5')
+
+    def test_github_endpoints_stay_available_while_groq_is_saturated(self):
+        groq_compartment = resilience.get_bulkhead('groq')
+        groq_compartment.acquire()
+        repos = mock.Mock(status_code=200, headers={}, json=mock.Mock(return_value=[]))
+        try:
+            with mock.patch.object(resilience.requests, 'request', return_value=repos):
+                response = self.client.get('/api/repositories/octo/')
+        finally:
+            groq_compartment.release()
+
+        self.assertEqual(response.status_code, 200)
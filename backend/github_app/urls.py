@@ -4,11 +4,21 @@ from . import views
 urlpatterns = [
     path('repositories/<str:username>/', views.repositories, name='repositories'),
     path('repo-structure/<str:username>/<str:repo_name>/', views.repo_structure, name='repo_structure'),
+    path('repo-tree/<str:username>/<str:repo_name>/', views.repo_tree, name='repo_tree'),
     path('query-repository/', views.query_repository, name='query_repository'),
+    path('query-repository/batch/', views.query_repository_batch, name='query_repository_batch'),
     path('query-code/', views.query_code, name='query_code'),
     path('google-search/', views.google_search, name='google_search'),
+    path('google-search/prefetch/', views.prefetch_resource_searches, name='prefetch_resource_searches'),
     path('resources/', views.resources_page, name='resources_page'),
     path('repo-info/<str:username>/<str:repo_name>/', views.get_repo_info, name='get_repo_info'),
     path('generate-documentation/', views.generate_documentation, name='generate_documentation'),
+    path('documentation-jobs/', views.submit_documentation_job, name='submit_documentation_job'),
+    path('documentation-jobs/<uuid:job_id>/', views.documentation_job_status, name='documentation_job_status'),
+    path('documentation-jobs/<uuid:job_id>/stream/', views.documentation_job_stream, name='documentation_job_stream'),
     path('execute-code/', views.execute_code, name='execute_code'),
+    path('execute-code/engines/', views.execution_engines, name='execution_engines'),
+    path('metrics/llm/', views.llm_metrics, name='llm_metrics'),
+    path('metrics/execution/', views.execution_metrics, name='execution_metrics'),
+    path('metrics/upstreams/', views.upstream_metrics, name='upstream_metrics'),
 ]
\ No newline at end of file
@@ -2,14 +2,28 @@ from langchain_groq import ChatGroq
 from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
 import os
+import base64
+import hashlib
+import json
+import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
 from django.conf import settings
+from django.core.cache import cache
 import requests
+from .model_router import call_with_fallback
+from . import resilience
+from .ranking import dedupe_search_items, extract_keywords, rerank_search_items
+
+GOOGLE_SEARCH_PAGE_SIZE = 10
+GOOGLE_SEARCH_MAX_RESULTS = 100
 
 def get_github_token():
     """Helper function to get GitHub token from environment variable"""
     return os.environ.get('GITHUB_TOKEN')
 
-def get_groq_llm(model_name="openai/gpt-oss-120b"):
+def get_groq_llm(model_name="openai/gpt-oss-120b", timeout=None):
     """Initialize and return a Groq LLM instance"""
     api_key = getattr(settings, 'GROQ_API_KEY', os.environ.get('GROQ_API_KEY'))
     
@@ -18,11 +32,33 @@ def get_groq_llm(model_name="openai/gpt-oss-120b"):
     
     llm = ChatGroq(
         groq_api_key=api_key,
-        model_name=model_name
+        model_name=model_name,
+        timeout=timeout,
+        max_retries=0
     )
     
     return llm
 
+def run_routed_chain(endpoint, prompt, values):
+    """
+    Run a prompt chain on the model picked by the router for the endpoint
+    
+    Args:
+        endpoint (str): Name of the calling endpoint, used for model routing
+        prompt (PromptTemplate): Prompt template to run
+        values (dict): Values for the template variables
+        
+    Returns:
+        str: Response from Groq
+    """
+    def run_chain(model, timeout):
+        chain = LLMChain(llm=get_groq_llm(model, timeout), prompt=prompt)
+        return chain.run(**values)
+    
+    response, _ = call_with_fallback(endpoint, prompt.format(**values), run_chain)
+    
+    return response
+
 def process_repository_query(repository_details, query):
     """
     Process a query about a GitHub repository using Groq
@@ -34,9 +70,6 @@ def process_repository_query(repository_details, query):
     Returns:
         str: Response from Groq
     """
-    # Initialize LLM
-    llm = get_groq_llm()
-    
     # Create prompt template
     template = """
     You are an AI assistant specialized in analyzing GitHub repositories.
@@ -57,11 +90,7 @@ def process_repository_query(repository_details, query):
         template=template
     )
     
-    # Create chain
-    chain = LLMChain(llm=llm, prompt=prompt)
-    
-    # Run chain
-    response = chain.run(
+    values = dict(
         repo_name=repository_details.get('name', 'Unknown'),
         repo_owner=repository_details.get('owner', {}).get('login', 'Unknown'),
         repo_description=repository_details.get('description', 'No description available'),
@@ -69,7 +98,7 @@ def process_repository_query(repository_details, query):
         query=query
     )
     
-    return response
+    return run_routed_chain('query_repository', prompt, values)
 
 def fetch_repository_details(username, repo_name):
     """
@@ -90,13 +119,155 @@ def fetch_repository_details(username, repo_name):
         headers['Authorization'] = f'token {token}'
         
     url = f'https://api.github.com/repos/{username}/{repo_name}'
-    response = requests.get(url, headers=headers)
+    response = resilience.request('github', 'GET', url, headers=headers)
     
     if response.status_code == 200:
         return response.json()
     else:
         raise Exception(f"Error fetching repository details: {response.status_code}")
 
+def get_github_headers():
+    """Request headers for the GitHub API, authenticated when a token is configured"""
+    headers = {}
+    token = get_github_token()
+    if token:
+        headers['Authorization'] = f'token {token}'
+    return headers
+
+def github_cache_key(kind, username, repo_name, *parts):
+    """Build a cache key for GitHub data; repository names are case-insensitive on GitHub"""
+    raw = "/".join([username.lower(), repo_name.lower(), *parts])
+    return f"github:{kind}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+def cached_github_json(cache_key, url, cache_timeout, refresh=False):
+    """
+    Fetch JSON from the GitHub API through the shared cache
+    
+    Only successful responses are cached.
+    
+    Args:
+        cache_key (str): Cache key for the response
+        url (str): GitHub API URL
+        cache_timeout (int): Seconds to keep the response
+        refresh (bool): Skip the cache lookup and overwrite the cached value
+        
+    Returns:
+        tuple: (status_code, data) where data is None unless the status is 200
+    """
+    if not refresh:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return 200, cached
+    
+    response = resilience.request('github', 'GET', url, headers=get_github_headers())
+    
+    if response.status_code != 200:
+        return response.status_code, None
+    
+    data = response.json()
+    cache.set(cache_key, data, cache_timeout)
+    return 200, data
+
+def get_repo_metadata(username, repo_name, refresh=False):
+    """Repository metadata from the GitHub API, cached for GITHUB_METADATA_CACHE_TIMEOUT"""
+    return cached_github_json(
+        github_cache_key('repo', username, repo_name),
+        f"https://api.github.com/repos/{username}/{repo_name}",
+        getattr(settings, 'GITHUB_METADATA_CACHE_TIMEOUT', 60 * 60),
+        refresh
+    )
+
+def get_repo_contents(username, repo_name, path="", refresh=False, ref=None):
+    """
+    Directory listing (or single file entry) from the GitHub contents API, cached for GITHUB_TREE_CACHE_TIMEOUT
+    
+    `ref` is a branch, tag or commit SHA; the default branch is used when it is not given.
+    """
+    url = f"https://api.github.com/repos/{username}/{repo_name}/contents"
+    if path:
+        url += f"/{path}"
+    key_parts = [path]
+    if ref:
+        url += f"?ref={quote(ref, safe='')}"
+        key_parts.append(f"@{ref}")
+    
+    return cached_github_json(
+        github_cache_key('contents', username, repo_name, *key_parts),
+        url,
+        getattr(settings, 'GITHUB_TREE_CACHE_TIMEOUT', 60 * 60),
+        refresh
+    )
+
+# Git tree entry types kept in repository trees; submodules ("commit") are left out
+TREE_ENTRY_TYPES = {'blob': 'file', 'tree': 'dir'}
+
+def get_repo_tree(username, repo_name, ref=None, refresh=False):
+    """
+    Every file and directory of a repository from the recursive git trees API,
+    cached for GITHUB_TREE_CACHE_TIMEOUT
+    
+    Only paths, types and sizes are kept, so even large trees stay small in the cache.
+    
+    Args:
+        username (str): GitHub username
+        repo_name (str): Repository name
+        ref (str): Branch, tag or commit SHA; the default branch when not given
+        refresh (bool): Skip the cache lookup and overwrite the cached value
+        
+    Returns:
+        tuple: (status_code, tree) where the tree is None unless the status is 200. The
+        tree holds the resolved `ref`, the tree `sha`, `truncated` (GitHub cut a very
+        large listing short) and `entries` as [path, type, size] lists
+    """
+    if not ref:
+        status_code, metadata = get_repo_metadata(username, repo_name)
+        if status_code != 200:
+            return status_code, None
+        ref = metadata.get('default_branch') or 'HEAD'
+    
+    cache_key = github_cache_key('tree', username, repo_name, ref)
+    if not refresh:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return 200, cached
+    
+    url = f"https://api.github.com/repos/{username}/{repo_name}/git/trees/{quote(ref, safe='')}?recursive=1"
+    response = resilience.request('github', 'GET', url, headers=get_github_headers())
+    if response.status_code != 200:
+        return response.status_code, None
+    
+    data = response.json()
+    tree = {
+        'ref': ref,
+        'sha': data.get('sha'),
+        'truncated': bool(data.get('truncated')),
+        'entries': [
+            [item['path'], TREE_ENTRY_TYPES[item['type']], item.get('size')]
+            for item in data.get('tree', []) if item.get('type') in TREE_ENTRY_TYPES
+        ]
+    }
+    cache.set(cache_key, tree, getattr(settings, 'GITHUB_TREE_CACHE_TIMEOUT', 60 * 60))
+    return 200, tree
+
+def get_repo_readme(username, repo_name, refresh=False):
+    """
+    Decoded README of a repository, cached for GITHUB_METADATA_CACHE_TIMEOUT
+    
+    Returns:
+        tuple: (status_code, readme text) where the text is None unless the status is 200
+    """
+    status_code, readme_data = cached_github_json(
+        github_cache_key('readme', username, repo_name),
+        f"https://api.github.com/repos/{username}/{repo_name}/readme",
+        getattr(settings, 'GITHUB_METADATA_CACHE_TIMEOUT', 60 * 60),
+        refresh
+    )
+    
+    if status_code != 200:
+        return status_code, None
+    
+    return status_code, base64.b64decode(readme_data['content']).decode('utf-8')
+
 def fetch_file_content(file_url):
     """
     Fetch file content from URL with GitHub token if needed
@@ -115,7 +286,7 @@ def fetch_file_content(file_url):
         if token:
             headers['Authorization'] = f'token {token}'
     
-    response = requests.get(file_url, headers=headers)
+    response = resilience.request('github', 'GET', file_url, headers=headers)
     
     if response.status_code == 200:
         return response.text
@@ -133,9 +304,6 @@ def process_code_query(code_content, query):
     Returns:
         str: Response from Groq
     """
-    # Initialize LLM
-    llm = get_groq_llm()
-    
     # Create prompt template
     template = """
     You are an AI coding assistant specialized in analyzing code.
@@ -155,16 +323,12 @@ def process_code_query(code_content, query):
         template=template
     )
     
-    # Create chain
-    chain = LLMChain(llm=llm, prompt=prompt)
-    
-    # Run chain
-    response = chain.run(
+    values = dict(
         code_content=code_content,
         query=query
     )
     
-    return response
+    return run_routed_chain('query_code', prompt, values)
 
 def process_google_search_results(search_results, query):
     """
@@ -177,9 +341,6 @@ def process_google_search_results(search_results, query):
     Returns:
         str: Formatted and enhanced response from Groq
     """
-    # Initialize LLM
-    llm = get_groq_llm()
-    
     items = search_results.get('items', [])
     formatted_results = []
     
@@ -222,18 +383,14 @@ def process_google_search_results(search_results, query):
         template=template
     )
     
-    # Create chain
-    chain = LLMChain(llm=llm, prompt=prompt)
-    
-    # Run chain
-    response = chain.run(
+    values = dict(
         query=query,
         results=results_text
     )
     
-    return response
+    return run_routed_chain('google_search', prompt, values)
 
-def perform_google_search(query, api_key, cx_id, num_results=10):
+def perform_google_search(query, api_key, cx_id, num_results=10, start=1):
     """
     Perform a Google search using the Custom Search JSON API
     
@@ -241,7 +398,8 @@ def perform_google_search(query, api_key, cx_id, num_results=10):
         query (str): Search query
         api_key (str): Google API Key
         cx_id (str): Custom Search Engine ID
-        num_results (int): Number of results to return
+        num_results (int): Number of results to return (the API returns at most 10 per page)
+        start (int): 1-based index of the first result, for fetching later pages
         
     Returns:
         dict: Search results
@@ -252,12 +410,177 @@ def perform_google_search(query, api_key, cx_id, num_results=10):
         'q': query,
         'key': api_key,
         'cx': cx_id,
-        'num': num_results
+        'num': min(num_results, GOOGLE_SEARCH_PAGE_SIZE),
+        'start': start
     }
     
-    response = requests.get(base_url, params=params)
+    response = resilience.request('google_search', 'GET', base_url, params=params)
     
     if response.status_code == 200:
         return response.json()
     else:
-        raise Exception(f"Search API error: {response.status_code}, {response.text}")
\ No newline at end of file
+        raise Exception(f"Search API error: {response.status_code}, {response.text}")
+
+def normalize_search_query(query, context_terms=()):
+    """
+    Normalize a search query for use as a cache key
+    
+    Case, Unicode width, punctuation around words, repeated whitespace and
+    repeated words (after their first occurrence) are ignored. Words that come from the repository context (repository name,
+    language) are moved to the end in sorted order, so "tutorials for viksit python"
+    and "tutorials for Python  viksit" share a key.
+    
+    Args:
+        query (str): Search query as typed or pre-filled
+        context_terms (iterable): Repository context strings, e.g. repository name and language
+        
+    Returns:
+        str: Normalized query
+    """
+    def tokenize(text):
+        text = unicodedata.normalize('NFKC', text or '').casefold()
+        return [token for token in (t.strip('.,;:!?"\'()[]{}') for t in text.split()) if token]
+    
+    context = {token for term in context_terms for token in tokenize(term)}
+    
+    words = []
+    seen = set()
+    context_words = set()
+    for token in tokenize(query):
+        if token in context:
+            context_words.add(token)
+        elif token not in seen:
+            seen.add(token)
+            words.append(token)
+    
+    return " ".join(words + sorted(context_words))
+
+def cached_google_search(query, api_key, cx_id, num_results=10, context_terms=(), rerank_context=""):
+    """
+    Search, rerank and summarize through the persistent search cache
+    
+    A hit skips the Custom Search API calls, the reranking and the LLM summary.
+    
+    Args:
+        query (str): Search query
+        api_key (str): Google API Key
+        cx_id (str): Custom Search Engine ID
+        num_results (int): Number of results to fetch across pages
+        context_terms (iterable): Repository context strings used to normalize the query
+        rerank_context (str): Repository context the results are reranked against with BM25
+        
+    Returns:
+        tuple: (dict with "response" and "raw_results", whether it came from the cache)
+    """
+    normalized = normalize_search_query(query, context_terms)
+    key_source = json.dumps({"query": normalized, "num": num_results, "rerank": rerank_context})
+    cache_key = f"search:{hashlib.sha256(key_source.encode('utf-8')).hexdigest()}"
+    
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached, True
+    
+    search_results = perform_paged_google_search(
+        query=query,
+        api_key=api_key,
+        cx_id=cx_id,
+        num_results=num_results
+    )
+    search_results['items'] = rerank_search_items(search_results.get('items', []), rerank_context)
+    
+    result = {
+        "response": process_google_search_results(search_results, query),
+        "raw_results": search_results.get("items", [])
+    }
+    
+    cache.set(cache_key, result, getattr(settings, 'SEARCH_CACHE_TIMEOUT', 60 * 60 * 6))
+    return result, False
+
+def perform_paged_google_search(query, api_key, cx_id, num_results=30):
+    """
+    Fetch several Custom Search result pages concurrently and merge them
+    
+    Pages are requested in parallel via `start=`, merged in page order and
+    deduplicated by canonical URL. A failed later page only shortens the
+    result list; the search fails only if the first page fails.
+    
+    Args:
+        query (str): Search query
+        api_key (str): Google API Key
+        cx_id (str): Custom Search Engine ID
+        num_results (int): Total number of results wanted (the API serves at most 100)
+        
+    Returns:
+        dict: Search results in the Custom Search response shape, with merged "items"
+    """
+    num_results = max(1, min(num_results, GOOGLE_SEARCH_MAX_RESULTS))
+    starts = list(range(1, num_results + 1, GOOGLE_SEARCH_PAGE_SIZE))
+    
+    with ThreadPoolExecutor(max_workers=len(starts)) as executor:
+        futures = [
+            executor.submit(perform_google_search, query, api_key, cx_id, min(GOOGLE_SEARCH_PAGE_SIZE, num_results - start + 1), start)
+            for start in starts
+        ]
+        pages = []
+        for index, future in enumerate(futures):
+            try:
+                pages.append(future.result())
+            except Exception:
+                if index == 0:
+                    raise
+                pages.append({})
+    
+    merged = dict(pages[0])
+    items = [item for page in pages for item in page.get('items', [])]
+    merged['items'] = dedupe_search_items(items)
+    return merged
+
+def build_search_context(username, repo_name, language=""):
+    """
+    Repository context for normalizing and reranking searches
+    
+    Args:
+        username (str): GitHub username (may be empty)
+        repo_name (str): Repository name (may be empty)
+        language (str): Primary language, if the client already knows it
+        
+    Returns:
+        tuple: (context terms used in the cache key, text used for BM25 reranking)
+    """
+    context_terms = [repo_name, language]
+    rerank_parts = [repo_name, language]
+    
+    if username and repo_name:
+        try:
+            status_code, repo_data = get_repo_metadata(username, repo_name)
+            if status_code == 200:
+                rerank_parts += [repo_data.get('language') or '', repo_data.get('description') or '']
+                rerank_parts += repo_data.get('topics') or []
+            readme_status, readme_content = get_repo_readme(username, repo_name)
+            if readme_status == 200:
+                rerank_parts += extract_keywords(readme_content)
+        except Exception:
+            pass
+    
+    return context_terms, " ".join(part for part in rerank_parts if part)
+
+# Canned searches offered on the resources page, keyed by search type
+RESOURCE_SEARCH_TEMPLATES = {
+    'Tutorials': "tutorials for {base_query}",
+    'Documentation': "documentation for {base_query}",
+    'Examples': "example projects using {base_query}",
+}
+
+def resource_search_queries(repo_name, language=""):
+    """
+    The canned resource searches for a repository, matching the queries the resources page builds
+    
+    Args:
+        repo_name (str): Repository name
+        language (str): Primary language of the repository
+        
+    Returns:
+        dict: Search type to query string
+    """
+    base_query = f"{repo_name} {language or ''}"
+    return {search_type: template.format(base_query=base_query) for search_type, template in RESOURCE_SEARCH_TEMPLATES.items()}
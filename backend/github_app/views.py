@@ -1,8 +1,21 @@
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 import requests
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from .utils import process_repository_query, process_code_query, process_google_search_results, perform_google_search
+from .utils import get_repo_metadata, get_repo_contents, get_repo_tree, get_repo_readme, cached_google_search, build_search_context
+from .utils import resource_search_queries
+from .model_router import call_with_fallback, get_model_metrics
+from .images import prepare_image, ImageValidationError
+from .documentation import build_documentation, RepositoryNotFound
+from .jobs import enqueue_documentation_job, serialize_job, stream_job_events, start_workers
+from .models import DocumentationJob
+from .execution import execute_locally, execute_with_jdoodle, supported_languages, ExecutionUnavailable, ENGINES
+from .execution import local_execution_enabled, jdoodle_configured, RemoteExecutionError
+from .execution import execute_locally_cases, outputs_match
+from .execution_cache import cached_execution, get_execution_cache_metrics, lookup_execution, store_execution
+from .resilience import UpstreamUnavailable, get_upstream_metrics
+from . import resilience
 import requests
 import json
 import os
@@ -12,12 +25,23 @@ from langchain_groq import ChatGroq
 from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
 from django.shortcuts import render
+from django.urls import reverse
+from django.conf import settings
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
 
 
 def get_github_token():
     """Helper function to get GitHub token from environment variable"""
     return os.environ.get('GITHUB_TOKEN')
 
+def upstream_unavailable_response(error):
+    """503 response for an upstream that is down, telling the client when to retry"""
+    response = Response({"error": str(error), "upstream": error.upstream}, status=503)
+    if error.retry_after:
+        response['Retry-After'] = str(error.retry_after)
+    return response
+
 
 @api_view(['GET'])
 def repositories(request, username):
@@ -29,7 +53,7 @@ def repositories(request, username):
         if token:
             headers['Authorization'] = f'token {token}'
         
-        response = requests.get(f'https://api.github.com/users/{username}/repos', headers=headers)
+        response = resilience.request('github', 'GET', f'https://api.github.com/users/{username}/repos', headers=headers)
         
         if response.status_code == 200:
             repos = response.json()
@@ -38,30 +62,40 @@ def repositories(request, username):
         else:
             return JsonResponse({'error': f'Error fetching repositories: {response.status_code}'}, status=response.status_code)
             
+    except UpstreamUnavailable as e:
+        return upstream_unavailable_response(e)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 @api_view(['GET'])
 def repo_structure(request, username, repo_name):
-    """Get the structure of a specific repository with support for subpaths"""
+    """
+    Get the structure of a specific repository with support for subpaths and an optional ref
+    
+    Large directories can be read a page at a time: `q` keeps entries whose name
+    contains it (case-insensitive), then `offset` and `limit` slice the result.
+    Without `limit` the whole listing is returned.
+    """
     try:
-        token = get_github_token()
-        
-        headers = {}
-        if token:
-            headers['Authorization'] = f'token {token}'
-        
         path = request.GET.get('path', '')
+        ref = request.GET.get('ref') or None
+        refresh = request.GET.get('refresh') in ('1', 'true')
+        name_filter = request.GET.get('q', '').strip().lower()
         
-        url = f'https://api.github.com/repos/{username}/{repo_name}/contents'
-        if path:
-            url += f'/{path}'
-            
-        response = requests.get(url, headers=headers)
-        
-        if response.status_code == 200:
-            contents = response.json()
-            
+        try:
+            offset = int(request.GET.get('offset', 0))
+            limit = int(request.GET['limit']) if request.GET.get('limit') else None
+        except ValueError:
+            return JsonResponse({'error': 'offset and limit must be integers'}, status=400)
+        if offset < 0 or (limit is not None and limit < 1):
+            return JsonResponse({'error': 'offset must be at least 0 and limit at least 1'}, status=400)
+        max_page_size = getattr(settings, 'REPO_STRUCTURE_MAX_PAGE_SIZE', 500)
+        if limit is not None:
+            limit = min(limit, max_page_size)
+        
+        status_code, contents = get_repo_contents(username, repo_name, path, refresh=refresh, ref=ref)
+        
+        if status_code == 200:
             if not isinstance(contents, list):
                 contents = [contents]
                 
@@ -76,29 +110,56 @@ def repo_structure(request, username, repo_name):
                     'url': item.get('url'),
                     'git_url': item.get('git_url')
                 })
+            
+            if name_filter:
+                structure = [item for item in structure if name_filter in item['name'].lower()]
+            total = len(structure)
+            structure = structure[offset:offset + limit] if limit is not None else structure[offset:]
                 
-            return JsonResponse({'structure': structure})
+            return JsonResponse({
+                'structure': structure,
+                'total': total,
+                'offset': offset,
+                'has_more': offset + len(structure) < total
+            })
         else:
-            return JsonResponse({'error': f'Error fetching repository structure: {response.status_code}'}, status=response.status_code)
+            return JsonResponse({'error': f'Error fetching repository structure: {status_code}'}, status=status_code)
             
+    except UpstreamUnavailable as e:
+        return upstream_unavailable_response(e)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
     
 
-def encode_image(image_data):
-    """Encode image data to base64 string"""
-    if isinstance(image_data, str) and os.path.isfile(image_data):
-        with open(image_data, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
-    elif not isinstance(image_data, str):
-        return base64.b64encode(image_data).decode('utf-8')
-    else:
-        return image_data
-
+@api_view(['GET'])
+def repo_tree(request, username, repo_name):
+    """
+    Get every file and directory of a repository in one response
+    
+    Entries are [path, type, size] lists from the recursive git trees API, at `ref`
+    or the default branch. `truncated` is true when GitHub cut the listing of a very
+    large repository short; clients should then list directories with repo-structure.
+    """
+    try:
+        ref = request.GET.get('ref') or None
+        refresh = request.GET.get('refresh') in ('1', 'true')
+        
+        status_code, tree = get_repo_tree(username, repo_name, ref, refresh=refresh)
+        
+        if status_code == 200:
+            return JsonResponse(tree)
+        else:
+            return JsonResponse({'error': f'Error fetching repository tree: {status_code}'}, status=status_code)
+            
+    except UpstreamUnavailable as e:
+        return upstream_unavailable_response(e)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+    
 
-def process_query_with_groq(text_query, image_data=None):
-    """Process a query using Groq, with optional image data"""
-    client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+def process_query_with_groq(text_query, image_data=None, endpoint='query_repository'):
+    """Process a query using Groq, with an optional image already prepared by prepare_image, on the model routed for the endpoint"""
+    client = Groq(api_key=os.environ.get("GROQ_API_KEY"), max_retries=0)
     
     message_content = []
     
@@ -106,26 +167,79 @@ def process_query_with_groq(text_query, image_data=None):
         message_content.append({"type": "text", "text": text_query})
     
     if image_data:
-        base64_image = encode_image(image_data)
-        
         message_content.append({
             "type": "image_url",
             "image_url": {
-                "url": f"data:image/jpeg;base64,{base64_image}",
+                "url": f"data:image/jpeg;base64,{image_data}",
             },
         })
     
-    chat_completion = client.chat.completions.create(
-        messages=[
-            {
-                "role": "user",
-                "content": message_content,
-            }
-        ],
-        model="openai/gpt-oss-120b",
-    )
-    
-    return chat_completion.choices[0].message.content
+    def complete(model, timeout):
+        chat_completion = client.chat.completions.create(
+            messages=[
+                {
+                    "role": "user",
+                    "content": message_content,
+                }
+            ],
+            model=model,
+            timeout=timeout,
+        )
+        return chat_completion.choices[0].message.content
+    
+    response, _ = call_with_fallback(endpoint, text_query, complete, has_image=bool(image_data))
+    
+    return response
+
+def build_repository_context(username, repo_name):
+    """
+    Build the text context used for repository queries
+    
+    Args:
+        username (str): GitHub username
+        repo_name (str): Repository name
+        
+    Returns:
+        str: Repository metadata, top-level structure and README excerpt, or None if the repository is not found
+    """
+    status_code, repo_data = get_repo_metadata(username, repo_name)
+    
+    if status_code != 200:
+        return None
+    
+    contents_status, contents = get_repo_contents(username, repo_name)
+    
+    repo_context = f"Repository: {repo_data['full_name']}\nDescription: {repo_data['description'] or 'No description'}\n"
+    
+    if contents_status == 200:
+        repo_context += "\nRepository structure:\n"
+        for item in contents:
+            repo_context += f"- {item['name']} ({item['type']})\n"
+    
+    try:
+        readme_status, readme_content = get_repo_readme(username, repo_name)
+        if readme_status == 200:
+            repo_context += f"\nREADME content:\n{readme_content[:1000]}..."  
+    except Exception:
+        pass  
+    
+    return repo_context
+
+
+def fetch_repository_file(username, repo_name, path, headers):
+    """Fetch the decoded text content of a file in a repository through the GitHub contents API"""
+    file_url = f"https://api.github.com/repos/{username}/{repo_name}/contents/{path}"
+    file_response = resilience.request('github', 'GET', file_url, headers=headers)
+    
+    if file_response.status_code != 200:
+        raise Exception(f"Error fetching file {path}: {file_response.status_code}")
+    
+    content_data = file_response.json()
+    if isinstance(content_data, list) or content_data.get('encoding') != 'base64':
+        raise Exception(f"File {path} is not available in text format")
+    
+    return base64.b64decode(content_data['content']).decode('utf-8')
+
 
 @api_view(['POST'])
 def query_repository(request):
@@ -141,39 +255,16 @@ def query_repository(request):
                 "error": "Username, repository name, and at least one of text query or image are required"
             }, status=400)
         
-        token = get_github_token()
-        headers = {}
-        if token:
-            headers['Authorization'] = f'token {token}'
-            
-        repo_url = f"https://api.github.com/repos/{username}/{repo_name}"
-        repo_response = requests.get(repo_url, headers=headers)
-        
-        if repo_response.status_code != 200:
-            return Response({"error": "Repository not found"}, status=404)
-        
-        repo_data = repo_response.json()
-        
-        contents_url = f"https://api.github.com/repos/{username}/{repo_name}/contents"
-        contents_response = requests.get(contents_url, headers=headers)
-        
-        repo_context = f"Repository: {repo_data['full_name']}\nDescription: {repo_data['description'] or 'No description'}\n"
+        if image_data:
+            try:
+                image_data = prepare_image(image_data)
+            except ImageValidationError as e:
+                return Response({"error": str(e)}, status=400)
         
-        if contents_response.status_code == 200:
-            contents = contents_response.json()
-            repo_context += "\nRepository structure:\n"
-            for item in contents:
-                repo_context += f"- {item['name']} ({item['type']})\n"
+        repo_context = build_repository_context(username, repo_name)
         
-        readme_url = f"https://api.github.com/repos/{username}/{repo_name}/readme"
-        try:
-            readme_response = requests.get(readme_url, headers=headers)
-            if readme_response.status_code == 200:
-                readme_data = readme_response.json()
-                readme_content = base64.b64decode(readme_data['content']).decode('utf-8')
-                repo_context += f"\nREADME content:\n{readme_content[:1000]}..."  
-        except Exception:
-            pass  
+        if repo_context is None:
+            return Response({"error": "Repository not found"}, status=404)
 
         full_text_query = f"{repo_context}\n\nUser query: {text_query}" if text_query else repo_context
         
@@ -181,9 +272,128 @@ def query_repository(request):
         
         return Response({"response": response})
     
+    except UpstreamUnavailable as e:
+        return upstream_unavailable_response(e)
     except Exception as e:
         return Response({"error": str(e)}, status=500)    
 
+@api_view(['POST'])
+def query_repository_batch(request):
+    """
+    Answer a batch of questions about one repository, streaming results as they complete
+    
+    The repository context is built once and shared by every question. Each question
+    may be a plain string or an object with `query` and an optional `file_path`, in
+    which case it is answered against that file's content instead. Results are streamed
+    as newline-delimited JSON in completion order; a failed question produces a result
+    with an `error` field and does not abort the rest of the batch.
+    """
+    try:
+        data = request.data
+        username = data.get('username')
+        repo_name = data.get('repo_name')
+        questions = data.get('questions')
+        
+        if not all([username, repo_name]) or not isinstance(questions, list) or not questions:
+            return Response({
+                "error": "Username, repository name, and a non-empty list of questions are required"
+            }, status=400)
+        
+        max_questions = getattr(settings, 'BATCH_QUERY_MAX_QUESTIONS', 50)
+        if len(questions) > max_questions:
+            return Response({"error": f"At most {max_questions} questions are allowed per batch"}, status=400)
+        
+        normalized = []
+        for index, question in enumerate(questions):
+            if isinstance(question, str):
+                question = {"query": question}
+            if not isinstance(question, dict) or not str(question.get('query') or '').strip():
+                return Response({"error": f"Question {index} must be a string or an object with a query"}, status=400)
+            normalized.append({
+                "index": index,
+                "id": question.get('id', index),
+                "query": question['query'],
+                "file_path": question.get('file_path') or None
+            })
+        
+        token = get_github_token()
+        headers = {}
+        if token:
+            headers['Authorization'] = f'token {token}'
+        
+        repo_context = build_repository_context(username, repo_name)
+        
+        if repo_context is None:
+            return Response({"error": "Repository not found"}, status=404)
+        
+        max_concurrency = min(
+            getattr(settings, 'BATCH_QUERY_MAX_CONCURRENCY', 4),
+            len(normalized)
+        )
+        
+        file_contents = {}
+        file_locks = {path: threading.Lock() for path in {q['file_path'] for q in normalized if q['file_path']}}
+        
+        def get_file(path):
+            # Each distinct file is fetched once, however many questions refer to it
+            with file_locks[path]:
+                if path not in file_contents:
+                    try:
+                        file_contents[path] = (fetch_repository_file(username, repo_name, path, headers), None)
+                    except Exception as e:
+                        file_contents[path] = (None, str(e))
+            content, error = file_contents[path]
+            if error:
+                raise Exception(error)
+            return content
+        
+        def answer(question):
+            if question['file_path']:
+                code_context = f"Code file content:\n{get_file(question['file_path'])}\n"
+                full_text_query = f"{code_context}\n{question['query']}"
+            else:
+                full_text_query = f"{repo_context}\n\nUser query: {question['query']}"
+            return process_query_with_groq(full_text_query, endpoint='query_code' if question['file_path'] else 'query_repository')
+        
+        def stream_results():
+            succeeded = 0
+            failed = 0
+            executor = ThreadPoolExecutor(max_workers=max_concurrency)
+            try:
+                futures = {executor.submit(answer, question): question for question in normalized}
+                for future in as_completed(futures):
+                    question = futures[future]
+                    result = {
+                        "type": "result",
+                        "index": question['index'],
+                        "id": question['id'],
+                        "query": question['query'],
+                        "file_path": question['file_path']
+                    }
+                    try:
+                        result["response"] = future.result()
+                        succeeded += 1
+                    except Exception as e:
+                        result["error"] = str(e)
+                        failed += 1
+                    yield json.dumps(result) + "\n"
+                
+                yield json.dumps({
+                    "type": "summary",
+                    "total": len(normalized),
+                    "succeeded": succeeded,
+                    "failed": failed
+                }) + "\n"
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+        
+        return StreamingHttpResponse(stream_results(), content_type='application/x-ndjson')
+    
+    except UpstreamUnavailable as e:
+        return upstream_unavailable_response(e)
+    except Exception as e:
+        return Response({"error": str(e)}, status=500)
+
 @api_view(['POST'])
 def query_code(request):
     try:
@@ -196,6 +406,12 @@ def query_code(request):
         if (not text_query and not image_data):
             return Response({"error": "At least one of text query or image is required"}, status=400)
         
+        if image_data:
+            try:
+                image_data = prepare_image(image_data)
+            except ImageValidationError as e:
+                return Response({"error": str(e)}, status=400)
+        
         if not file_content:
             if not file_url:
                 return Response({"error": "Either file_content or file_url is required"}, status=400)
@@ -206,7 +422,7 @@ def query_code(request):
                 headers['Authorization'] = f'token {token}'
                 
             try:
-                file_response = requests.get(file_url, headers=headers)
+                file_response = resilience.request('github', 'GET', file_url, headers=headers)
                 
                 if file_response.status_code != 200:
                     return Response({"error": "File not found"}, status=404)
@@ -218,10 +434,12 @@ def query_code(request):
         code_context = f"Code file content:\n{file_content}\n"
         full_text_query = f"{code_context}\n{text_query}" if text_query else code_context
           
-        response = process_query_with_groq(full_text_query, image_data)
+        response = process_query_with_groq(full_text_query, image_data, endpoint='query_code')
         
         return Response({"response": response})
     
+    except UpstreamUnavailable as e:
+        return upstream_unavailable_response(e)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
@@ -232,6 +450,7 @@ def google_search(request):
         query = data.get('query')
         username = data.get('username', '')
         repo_name = data.get('repo_name', '')
+        language = data.get('language', '')
         search_type = data.get('search_type', 'Custom Search')
         
         if not query:
@@ -240,23 +459,115 @@ def google_search(request):
         api_key = os.environ.get('GOOGLE_API_KEY')
         cx_id = os.environ.get('GOOGLE_CSE_ID')
         
-        search_results = perform_google_search(
+        context_terms, rerank_context = build_search_context(username, repo_name, language)
+        
+        result, cached = cached_google_search(
             query=query,
             api_key=api_key,
             cx_id=cx_id,
-            num_results=10
+            num_results=getattr(settings, 'SEARCH_NUM_RESULTS', 30),
+            context_terms=context_terms,
+            rerank_context=rerank_context
         )
         
-        enhanced_results = process_google_search_results(search_results, query)
-        
         return Response({
-            "response": enhanced_results,
-            "raw_results": search_results.get("items", []),
+            "response": result["response"],
+            "raw_results": result["raw_results"],
             "query": query,
             "search_type": search_type,
+            "cached": cached,
             "timestamp": None
         })
     
+    except UpstreamUnavailable as e:
+        return upstream_unavailable_response(e)
+    except Exception as e:
+        return Response({"error": str(e)}, status=500)
+
+@api_view(['POST'])
+def prefetch_resource_searches(request):
+    """
+    Run every canned resource search for a repository concurrently, streaming each as it completes
+    
+    The searches go through the same persistent cache as `google_search`, so once
+    prefetched, a search-type click on the resources page is answered from the cache.
+    Results are streamed as newline-delimited JSON in completion order, followed by
+    a summary line; a failed search type does not abort the others.
+    """
+    try:
+        data = request.data
+        username = data.get('username', '')
+        repo_name = data.get('repo_name', '')
+        language = data.get('language', '')
+        
+        if not all([username, repo_name]):
+            return Response({"error": "Username and repository name are required"}, status=400)
+        
+        if not language:
+            status_code, repo_data = get_repo_metadata(username, repo_name)
+            if status_code == 404:
+                return Response({"error": "Repository not found"}, status=404)
+            if status_code == 200:
+                language = repo_data.get('language') or ''
+        
+        api_key = os.environ.get('GOOGLE_API_KEY')
+        cx_id = os.environ.get('GOOGLE_CSE_ID')
+        num_results = getattr(settings, 'SEARCH_NUM_RESULTS', 30)
+        
+        context_terms, rerank_context = build_search_context(username, repo_name, language)
+        queries = resource_search_queries(repo_name, language)
+        
+        def search(query):
+            return cached_google_search(
+                query=query,
+                api_key=api_key,
+                cx_id=cx_id,
+                num_results=num_results,
+                context_terms=context_terms,
+                rerank_context=rerank_context
+            )
+        
+        def stream_results():
+            succeeded = 0
+            failed = 0
+            executor = ThreadPoolExecutor(max_workers=len(queries))
+            try:
+                futures = {executor.submit(search, query): (search_type, query) for search_type, query in queries.items()}
+                for future in as_completed(futures):
+                    search_type, query = futures[future]
+                    result = {
+                        "type": "result",
+                        "search_type": search_type,
+                        "query": query
+                    }
+                    try:
+                        search_result, cached = future.result()
+                        result.update({
+                            "response": search_result["response"],
+                            "raw_results": search_result["raw_results"],
+                            "cached": cached
+                        })
+                        succeeded += 1
+                    except Exception as e:
+                        result["error"] = str(e)
+                        failed += 1
+                    yield json.dumps(result) + "\n"
+                
+                yield json.dumps({
+                    "type": "summary",
+                    "language": language,
+                    "queries": queries,
+                    "total": len(queries),
+                    "succeeded": succeeded,
+                    "failed": failed
+                }) + "\n"
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+        
+        return StreamingHttpResponse(stream_results(), content_type='application/x-ndjson')
+    
+    except UpstreamUnavailable as e:
+        return upstream_unavailable_response(e)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
     
@@ -272,16 +583,9 @@ def resources_page(request):
     
     if username and repo_name:
         try:
-            token = get_github_token()
-            headers = {}
-            if token:
-                headers['Authorization'] = f'token {token}'
-                
-            repo_url = f"https://api.github.com/repos/{username}/{repo_name}"
-            repo_response = requests.get(repo_url, headers=headers)
+            status_code, repo_data = get_repo_metadata(username, repo_name)
             
-            if repo_response.status_code == 200:
-                repo_data = repo_response.json()
+            if status_code == 200:
                 context.update({
                     'repo_description': repo_data.get('description', ''),
                     'repo_language': repo_data.get('language', ''),
@@ -298,16 +602,9 @@ def resources_page(request):
 def get_repo_info(request, username, repo_name):
     """Get repository information for the resources page"""
     try:
-        token = get_github_token()
-        headers = {}
-        if token:
-            headers['Authorization'] = f'token {token}'
-            
-        repo_url = f"https://api.github.com/repos/{username}/{repo_name}"
-        repo_response = requests.get(repo_url, headers=headers)
+        status_code, repo_data = get_repo_metadata(username, repo_name)
         
-        if repo_response.status_code == 200:
-            repo_data = repo_response.json()
+        if status_code == 200:
             return Response({
                 'description': repo_data.get('description', ''),
                 'language': repo_data.get('language', ''),
@@ -317,6 +614,8 @@ def get_repo_info(request, username, repo_name):
         else:
             return Response({"error": "Repository not found"}, status=404)
     
+    except UpstreamUnavailable as e:
+        return upstream_unavailable_response(e)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
@@ -331,137 +630,216 @@ def generate_documentation(request):
         if not all([username, repo_name]):
             return Response({"error": "Username and repository name are required"}, status=400)
         
-        token = get_github_token()
-        headers = {}
-        if token:
-            headers['Authorization'] = f'token {token}'
-            
-        repo_url = f"https://api.github.com/repos/{username}/{repo_name}"
-        repo_response = requests.get(repo_url, headers=headers)
-        
-        if repo_response.status_code != 200:
+        try:
+            documentation = build_documentation(username, repo_name)
+        except RepositoryNotFound:
             return Response({"error": "Repository not found"}, status=404)
         
-        repo_data = repo_response.json()
-        
-        readme_url = f"https://api.github.com/repos/{username}/{repo_name}/readme"
-        readme_response = requests.get(readme_url, headers=headers)
-        readme_content = ""
+        return Response({"documentation": documentation})
+    
+    except UpstreamUnavailable as e:
+        return upstream_unavailable_response(e)
+    except Exception as e:
+        return Response({"error": str(e)}, status=500)
+
+@api_view(['POST'])
+def submit_documentation_job(request):
+    """Queue documentation generation for a repository and return the job to poll"""
+    try:
+        data = request.data
+        username = data.get('username')
+        repo_name = data.get('repo_name')
         
-        if readme_response.status_code == 200:
-            readme_data = readme_response.json()
-            readme_content = base64.b64decode(readme_data['content']).decode('utf-8')
+        if not all([username, repo_name]):
+            return Response({"error": "Username and repository name are required"}, status=400)
         
-        structure_url = f"https://api.github.com/repos/{username}/{repo_name}/contents"
-        structure_response = requests.get(structure_url, headers=headers)
-        structure_info = ""
+        job = enqueue_documentation_job(username, repo_name)
         
-        if structure_response.status_code == 200:
-            structure_data = structure_response.json()
+        return Response({
+            **serialize_job(job),
+            "status_url": request.build_absolute_uri(reverse('documentation_job_status', args=[job.id])),
+            "stream_url": request.build_absolute_uri(reverse('documentation_job_stream', args=[job.id]))
+        }, status=202)
+    
+    except Exception as e:
+        return Response({"error": str(e)}, status=500)
 
-            structure_info = "\nRepository Structure:\n"
-            for item in structure_data:
-                structure_info += f"- {item['name']} ({item['type']})\n"
+@api_view(['GET'])
+def documentation_job_status(request, job_id):
+    """Return the progress of a documentation job, and the documentation once it has succeeded"""
+    try:
+        job = DocumentationJob.objects.filter(pk=job_id).first()
         
+        if job is None:
+            return Response({"error": "Job not found"}, status=404)
         
-        documentation = generate_repo_documentation(
-            repo_data, 
-            readme_content, 
-            structure_info
-        )
+        if not job.is_finished:
+            # Queued jobs survive restarts, so make sure this process is working on them
+            start_workers()
         
-        return Response({"documentation": documentation})
+        return Response(serialize_job(job))
     
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
-def get_groq_llm(model_name="openai/gpt-oss-120b"):
-    """Initialize and return a Groq LLM instance"""
-    api_key = os.environ.get('GROQ_API_KEY')
+def documentation_job_stream(request, job_id):
+    """Stream the progress of a documentation job as server-sent events until it finishes"""
+    job = DocumentationJob.objects.filter(pk=job_id).first()
     
-    if not api_key:
-        raise ValueError("Groq API key not found. Please set GROQ_API_KEY in environment variables.")
+    if job is None:
+        return JsonResponse({"error": "Job not found"}, status=404)
     
-    llm = ChatGroq(
-        groq_api_key=api_key,
-        model_name=model_name
-    )
+    if not job.is_finished:
+        # Queued jobs survive restarts, so make sure this process is working on them
+        start_workers()
     
-    return llm
+    response = StreamingHttpResponse(stream_job_events(job_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@api_view(['GET'])
+def llm_metrics(request):
+    """Report which models served each endpoint, with failure counts and latencies"""
+    return Response(get_model_metrics())
 
-def generate_repo_documentation(repo_data, readme_content, structure_info):
+def execute_code_cases(cases, script, language, version_index, engine, use_cache, client_id=None, client_secret=None):
     """
-    Generate comprehensive documentation for a repository using Groq
+    Run one program against a list of test cases and grade the outputs
     
-    Args:
-        repo_data (dict): Repository information from GitHub API
-        readme_content (str): Content of README file
-        structure_info (str): Information about repository structure
-        
-    Returns:
-        str: Comprehensive documentation in markdown format
-    """
-    llm = get_groq_llm()
-    
-    # prompt template
-    template = """
-    You are an AI documentation specialist for GitHub repositories.
-    
-    Repository Information:
-    Name: {repo_name}
-    Owner: {repo_owner}
-    Description: {repo_description}
-    Primary Language: {repo_language}
-    Stars: {stars}
-    Forks: {forks}
-    Open Issues: {issues}
-    Created: {created_date}
-    Last Updated: {updated_date}
-    
-    {structure_info}
-    
-    README Content:
-    {readme_content}
-    
-    Your task is to create comprehensive documentation for this repository that includes:
-    1. A clear and detailed overview of what the repository does within 900 characters
-    2. The main purpose and use cases
-    3. Key features or components
-    4. Technology stack (based on the language and files/structure)
-    5. Any installation or usage instructions that can be inferred
-    6. Project structure explanation
-    
-    Format the documentation in clean markdown with appropriate headings, lists, and emphasis.
-    Be concise but informative. Focus on providing valuable information for developers who want to understand and use this repository.
-    Do not generate fictional information - if certain details are not available, mention that they are not provided.
+    Each case is a stdin string or an object with `stdin`, an optional `expected_output`
+    and an optional `id`. On the local engine the program is compiled once and the
+    cases run in parallel; JDoodle compiles on every request, so there the cases are
+    sent as parallel requests. Cases are looked up in the execution result cache first.
     """
+    if not isinstance(cases, list) or not cases:
+        return Response({"error": "cases must be a non-empty list"}, status=400)
     
-    prompt = PromptTemplate(
-        input_variables=["repo_name", "repo_owner", "repo_description", "repo_language", 
-                         "stars", "forks", "issues", "created_date", "updated_date", 
-                         "structure_info", "readme_content"],
-        template=template
-    )
-    
-    # Create chain
-    chain = LLMChain(llm=llm, prompt=prompt)
-    
-    # Run chain
-    response = chain.run(
-        repo_name=repo_data.get('name', 'Unknown'),
-        repo_owner=repo_data.get('owner', {}).get('login', 'Unknown'),
-        repo_description=repo_data.get('description', 'No description available'),
-        repo_language=repo_data.get('language', 'Unknown'),
-        stars=repo_data.get('stargazers_count', 0),
-        forks=repo_data.get('forks_count', 0),
-        issues=repo_data.get('open_issues_count', 0),
-        created_date=repo_data.get('created_at', '').split('T')[0],
-        updated_date=repo_data.get('updated_at', '').split('T')[0],
-        structure_info=structure_info,
-        readme_content=readme_content if readme_content else "No README available"
-    )
+    max_cases = getattr(settings, 'EXECUTION_BATCH_MAX_CASES', 50)
+    if len(cases) > max_cases:
+        return Response({"error": f"At most {max_cases} cases are allowed per batch"}, status=400)
     
-    return response
+    normalized = []
+    for index, case in enumerate(cases):
+        if isinstance(case, str):
+            case = {"stdin": case}
+        if not isinstance(case, dict):
+            return Response({"error": f"Case {index} must be a string or an object with stdin"}, status=400)
+        normalized.append({
+            "index": index,
+            "id": case.get('id', index),
+            "stdin": str(case.get('stdin') or ''),
+            "expected_output": case.get('expected_output')
+        })
+    
+    max_concurrency = getattr(settings, 'EXECUTION_BATCH_MAX_CONCURRENCY', 4)
+    
+    results = {}
+    pending = []
+    for case in normalized:
+        cache_key, cached = lookup_execution(script, case['stdin'], language, version_index, False, engine, use_cache)
+        if cached is not None:
+            results[case['index']] = ({**cached, "cached": True}, None)
+        else:
+            pending.append((case, cache_key))
+    
+    if pending and engine == 'local':
+        try:
+            outcomes = execute_locally_cases(script, language, [case['stdin'] for case, _ in pending], max_concurrency)
+        except ExecutionUnavailable as e:
+            return Response({"error": str(e), "supported_languages": supported_languages()}, status=400)
+        for (case, cache_key), outcome in zip(pending, outcomes):
+            store_execution(cache_key, outcome)
+            results[case['index']] = ({**outcome, "cached": False}, None)
+    elif pending:
+        def run_remote(case):
+            response = execute_with_jdoodle(
+                script, language, case['stdin'], version_index, False,
+                client_id=client_id, client_secret=client_secret
+            )
+            if response.status_code != 200:
+                raise RemoteExecutionError("JDoodle API error", response.status_code)
+            return {**response.json(), "engine": 'jdoodle'}
+        
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(pending))) as executor:
+            futures = {executor.submit(run_remote, case): (case, cache_key) for case, cache_key in pending}
+            for future in as_completed(futures):
+                case, cache_key = futures[future]
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    results[case['index']] = (None, str(e))
+                    continue
+                store_execution(cache_key, outcome)
+                results[case['index']] = ({**outcome, "cached": False}, None)
+    
+    case_results = []
+    passed = failed = errors = 0
+    for case in normalized:
+        outcome, error = results[case['index']]
+        entry = {"index": case['index'], "id": case['id'], "stdin": case['stdin']}
+        
+        if error is not None:
+            entry["error"] = error
+            errors += 1
+        else:
+            entry.update({
+                "output": outcome.get('output', ''),
+                "statusCode": outcome.get('statusCode'),
+                "cpuTime": outcome.get('cpuTime'),
+                "memory": outcome.get('memory'),
+                "timedOut": outcome.get('timedOut', False),
+                "cached": outcome.get('cached', False)
+            })
+            if case['expected_output'] is not None:
+                entry["expected_output"] = case['expected_output']
+                entry["passed"] = not entry["timedOut"] and outputs_match(entry["output"], case['expected_output'])
+                if entry["passed"]:
+                    passed += 1
+                else:
+                    failed += 1
+        case_results.append(entry)
+    
+    return Response({
+        "engine": engine,
+        "results": case_results,
+        "summary": {
+            "total": len(case_results),
+            "graded": passed + failed,
+            "passed": passed,
+            "failed": failed,
+            "errors": errors
+        }
+    })
+
+@api_view(['GET'])
+def execution_metrics(request):
+    """Report execution result cache hits, misses and skipped runs"""
+    return Response(get_execution_cache_metrics())
+
+@api_view(['GET'])
+def upstream_metrics(request):
+    """Retry counts and circuit breaker states of the upstream services"""
+    return Response(get_upstream_metrics())
+
+@api_view(['GET'])
+def execution_engines(request):
+    """Engines this server accepts for execute-code, so the editor only offers usable ones"""
+    engines = []
+    if local_execution_enabled():
+        engines.append('local')
+    engines.append('jdoodle')
+    
+    default = getattr(settings, 'CODE_EXECUTION_ENGINE', 'jdoodle')
+    if default not in engines:
+        default = 'jdoodle'
+    
+    return Response({
+        "engines": engines,
+        "default": default,
+        "local_languages": supported_languages(),
+        "jdoodle_configured": jdoodle_configured()
+    })
 
 @api_view(['POST'])
 def execute_code(request):
@@ -472,6 +850,9 @@ def execute_code(request):
         stdin = data.get('stdin', '')
         version_index = data.get('versionIndex', '0')
         compile_only = data.get('compileOnly', False)
+        engine = data.get('engine') or getattr(settings, 'CODE_EXECUTION_ENGINE', 'jdoodle')
+        client_id = data.get('clientId')
+        client_secret = data.get('clientSecret')
         
         if not script:
             return Response({"error": "script is required"}, status=400)
@@ -479,41 +860,53 @@ def execute_code(request):
         if not language:
             return Response({"error": "language is required"}, status=400)
         
-        # Get JDoodle credentials from environment
-        client_id = os.getenv('JDOODLE_CLIENT_ID')
-        client_secret = os.getenv('JDOODLE_CLIENT_SECRET')
-        
-        if not client_id or not client_secret:
-            return Response({"error": "JDoodle credentials not configured"}, status=500)
-        
-        # Prepare payload for JDoodle API
-        payload = {
-            'clientId': client_id,
-            'clientSecret': client_secret,
-            'script': script,
-            'stdin': stdin,
-            'language': language,
-            'versionIndex': version_index,
-            'compileOnly': compile_only
-        }
+        if engine not in ENGINES:
+            return Response({"error": f"engine must be one of: {', '.join(ENGINES)}"}, status=400)
         
-        # Make request to JDoodle API
-        try:
-            response = requests.post(
-                'https://api.jdoodle.com/v1/execute',
-                json=payload,
-                headers={'Content-Type': 'application/json'},
-                timeout=30
+        if engine == 'local' and not local_execution_enabled():
+            return Response({"error": "Local execution is disabled on this server"}, status=403)
+        
+        # Clients opt out of the result cache with "cache": false
+        use_cache = str(data.get('cache', True)).lower() not in ('false', '0', 'no')
+        
+        if data.get('cases') is not None:
+            if compile_only:
+                return Response({"error": "compileOnly cannot be combined with cases"}, status=400)
+            return execute_code_cases(
+                data.get('cases'), script, language, version_index, engine, use_cache, client_id, client_secret
             )
+        
+        def run():
+            if engine == 'local':
+                return execute_locally(script, language, stdin, compile_only)
             
+            response = execute_with_jdoodle(
+                script, language, stdin, version_index, compile_only,
+                client_id=client_id, client_secret=client_secret
+            )
             if response.status_code != 200:
-                return Response({"error": "JDoodle API error"}, status=response.status_code)
+                raise RemoteExecutionError("JDoodle API error", response.status_code)
             
             result = response.json()
-            return Response(result)
-            
+            result['engine'] = 'jdoodle'
+            return result
+        
+        try:
+            result, cached = cached_execution(
+                script, stdin, language, version_index, compile_only, engine, run, use_cache
+            )
+        except ExecutionUnavailable as e:
+            if engine == 'local':
+                return Response({"error": str(e), "supported_languages": supported_languages()}, status=400)
+            return Response({"error": str(e)}, status=500)
+        except RemoteExecutionError as e:
+            return Response({"error": str(e)}, status=e.status_code)
+        except UpstreamUnavailable as e:
+            return upstream_unavailable_response(e)
         except Exception as e:
             return Response({"error": f"Failed to execute code: {str(e)}"}, status=500)
+        
+        return Response({**result, "cached": cached})
     
     except Exception as e:
-        return Response({"error": str(e)}, status=500) 
\ No newline at end of file
+        return Response({"error": str(e)}, status=500) 
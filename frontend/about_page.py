@@ -1,13 +1,14 @@
 import streamlit as st
+import i18n
 from streamlit_lottie import st_lottie
-import requests
+import resilience
 import json
 import time
 
 def load_lottie_url(url):
     """Load lottie animation from URL with proper error handling"""
     try:
-        r = requests.get(url)
+        r = resilience.request('assets', 'GET', url)
         if r.status_code != 200:
             return None
         return r.json()
@@ -617,6 +618,17 @@ def about_page():
     </div>
     """, unsafe_allow_html=True)
     
+    upstreams = resilience.get_upstream_metrics()
+    if upstreams:
+        lang = st.session_state.get("language", i18n.SOURCE_LANGUAGE)
+        with st.expander(i18n.ui_text("Service Status", lang)):
+            st.caption(i18n.ui_text("Requests made by this server to the services Viksit depends on", lang))
+            st.dataframe(
+                [{"Service": name, **stats} for name, stats in sorted(upstreams.items())],
+                use_container_width=True,
+                hide_index=True
+            )
+    
     
     st.markdown("""
     <script>
@@ -1,4 +1,5 @@
 import streamlit as st
+import i18n
 import firebase_admin
 from firebase_admin import auth, credentials, initialize_app
 import asyncio
@@ -10,6 +11,7 @@ from code_editor_page import code_editor_page
 from about_page import about_page
 from community_page import community_page
 import utils
+import build_catalog
 
 st.set_page_config(
     page_title="VIKSIT.AI",
@@ -821,34 +823,41 @@ def landing_page():
 
 # Navigation bar
 def render_navbar():
+    lang = st.session_state.get("language", i18n.SOURCE_LANGUAGE)
     col1, col2, col3, col4, col5, col6 = st.columns([2, 2, 2, 2, 2, 1])
     
     with col1:
-        if st.button("📊 Repository", key="nav_repo", use_container_width=True):
+        if st.button(f"📊 {i18n.ui_text('Repository', lang)}", key="nav_repo", use_container_width=True):
             st.session_state.page = "repo_structure"
             st.rerun()
     with col2:
-        if st.button("📚 Resources", key="nav_resources", use_container_width=True):
+        if st.button(f"📚 {i18n.ui_text('Resources', lang)}", key="nav_resources", use_container_width=True):
             st.session_state.page = "resources"
             st.rerun()
     with col3:
-        if st.button("💻 Code Editor", key="nav_code_editor", use_container_width=True):
+        if st.button(f"💻 {i18n.ui_text('Code Editor', lang)}", key="nav_code_editor", use_container_width=True):
             st.session_state.page = "code_editor"
             st.rerun()
     with col4:
-        if st.button("👥 Community", key="nav_community", use_container_width=True):
+        if st.button(f"👥 {i18n.ui_text('Community', lang)}", key="nav_community", use_container_width=True):
             st.session_state.page = "community"
             st.rerun()
     with col5:
-        if st.button("ℹ️ About", key="nav_about", use_container_width=True):
+        if st.button(f"ℹ️ {i18n.ui_text('About', lang)}", key="nav_about", use_container_width=True):
             st.session_state.page = "about"
             st.rerun()
     with col6:
-        if st.button("🚪 Exit", key="nav_signout", use_container_width=True):
+        if st.button(f"🚪 {i18n.ui_text('Exit', lang)}", key="nav_signout", use_container_width=True):
             sign_out()
 
+@st.cache_resource
+def start_catalog_build():
+    """Bring the UI string catalogs up to date in the background, once per server process"""
+    return build_catalog.start_background_build()
+
 # Main app logic - Routing between pages
 def main():
+    start_catalog_build()
     
     if st.sidebar.checkbox("Show state"):
         st.sidebar.write(st.session_state)
@@ -0,0 +1,164 @@
+"""
+Build the precompiled UI string catalogs in locales/
+
+Finds every string literal passed to ui_text() or ui_texts() in the Streamlit
+pages, translates the ones not yet in each language's catalog with Sarvam
+(through the persistent translation cache), and writes one gzipped JSON object
+per language. Strings no longer used by any page are dropped. The app also runs
+this build in the background at startup when a catalog is out of date and
+SARVAM_API_KEY is set.
+
+Usage:
+    SARVAM_API_KEY=... python build_catalog.py            # build all languages
+    python build_catalog.py --languages hi-IN ta-IN        # build some languages
+    python build_catalog.py --check                        # fail if a catalog is out of date
+"""
+import argparse
+import ast
+import glob
+import gzip
+import json
+import os
+import sys
+import threading
+
+import i18n
+import translation
+
+FRONTEND_DIR = os.path.dirname(os.path.abspath(__file__))
+CATALOG_FUNCTIONS = {"ui_text", "ui_texts"}
+
+
+def _function_name(node):
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def extract_ui_strings(source):
+    """Return the string literals passed to ui_text()/ui_texts() in a module's source"""
+    strings = []
+    for node in ast.walk(ast.parse(source)):
+        if not isinstance(node, ast.Call) or _function_name(node.func) not in CATALOG_FUNCTIONS or not node.args:
+            continue
+        first = node.args[0]
+        candidates = first.elts if isinstance(first, (ast.List, ast.Tuple)) else [first]
+        strings.extend(
+            candidate.value for candidate in candidates
+            if isinstance(candidate, ast.Constant) and isinstance(candidate.value, str) and candidate.value.strip()
+        )
+    return strings
+
+
+def collect_ui_strings(directory=FRONTEND_DIR):
+    """All catalog strings used by the modules in a directory, sorted"""
+    strings = set()
+    for path in glob.glob(os.path.join(directory, "*.py")):
+        with open(path, encoding="utf-8") as f:
+            strings.update(extract_ui_strings(f.read()))
+    return sorted(strings)
+
+
+def write_catalog(language_code, catalog):
+    os.makedirs(i18n.LOCALES_DIR, exist_ok=True)
+    path = i18n.catalog_path(language_code)
+    # mtime=0 keeps the artifact byte-identical when nothing changed
+    with open(path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+        f.write(json.dumps(catalog, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    return path
+
+
+def out_of_date_languages(strings, targets):
+    """Languages whose catalog is missing strings or still holds unused ones"""
+    return [
+        language_code for language_code in targets
+        if set(i18n.load_catalog(language_code)) != set(strings)
+    ]
+
+
+def build_catalogs(targets, strings, log=print):
+    """
+    Translate the strings missing from each language's catalog and write the catalogs
+
+    A translation identical to the English text (e.g. "GitHub") is kept; only
+    strings that could not be translated are left out, to be retried next build.
+
+    Returns:
+        bool: Whether every string of every catalog was translated
+    """
+    complete = True
+    for language_code in targets:
+        existing = i18n.load_catalog(language_code)
+        missing = [text for text in strings if text not in existing]
+
+        fresh = {}
+        if missing:
+            translation.translate_many(missing, language_code, i18n.SOURCE_LANGUAGE)
+            # Successful translations are in the cache; failed ones are not stored
+            fresh = translation.get_cached_translations(missing, language_code, i18n.SOURCE_LANGUAGE)
+        catalog = {text: existing[text] if text in existing else fresh.get(text) for text in strings}
+        catalog = {text: value for text, value in catalog.items() if value}
+
+        path = write_catalog(language_code, catalog)
+        i18n.load_catalog.cache_clear()
+        failed = len(strings) - len(catalog)
+        log(f"{language_code}: {len(catalog)} strings ({len(fresh)} new, {failed} failed) -> {os.path.relpath(path)}")
+        complete = complete and failed == 0
+    return complete
+
+
+def start_background_build():
+    """
+    Bring out-of-date catalogs up to date in a background thread
+
+    Called once when the app starts, so a deployment without prebuilt catalogs
+    fills them in on its own; pages meanwhile fall back to the translation cache.
+    Does nothing without SARVAM_API_KEY or when every catalog is current.
+
+    Returns:
+        threading.Thread: The build thread, or None if nothing needs building
+    """
+    if not os.environ.get("SARVAM_API_KEY"):
+        return None
+
+    targets = [code for code in i18n.SUPPORTED_LANGUAGES.values() if code != i18n.SOURCE_LANGUAGE]
+    strings = collect_ui_strings()
+    stale = out_of_date_languages(strings, targets)
+    if not stale:
+        return None
+
+    def build():
+        try:
+            build_catalogs(stale, strings, log=lambda message: None)
+        except Exception as e:
+            print(f"UI catalog build failed: {e}", file=sys.stderr)
+
+    thread = threading.Thread(target=build, name="catalog-build", daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the precompiled UI string catalogs")
+    parser.add_argument("--languages", nargs="+", help="Language codes to build (default: all supported)")
+    parser.add_argument("--check", action="store_true", help="Only report missing strings; exit 1 if any")
+    args = parser.parse_args()
+
+    targets = args.languages or [code for code in i18n.SUPPORTED_LANGUAGES.values() if code != i18n.SOURCE_LANGUAGE]
+    strings = collect_ui_strings()
+    print(f"{len(strings)} UI strings found")
+
+    if args.check:
+        stale = out_of_date_languages(strings, targets)
+        for language_code in stale:
+            existing = set(i18n.load_catalog(language_code))
+            print(f"{language_code}: {len(set(strings) - existing)} missing, {len(existing - set(strings))} unused")
+        return 1 if stale else 0
+
+    return 0 if build_catalogs(targets, strings) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,448 @@
 import streamlit as st
+import i18n
 import os
 import json
-import requests
+import resilience
 import time
 import base64 
 import utils
 from urllib.parse import urljoin
-from utils import get_file_content, get_repo_structure, get_file_icon, BACKEND_URL
+from utils import get_file_content, render_interactive_directory_structure, BACKEND_URL
 import pyperclip
 from dotenv import load_dotenv
 
 load_dotenv()
 
+@st.fragment
+def file_explorer_panel(username, repo_name):
+    """File explorer of the code editor; expanding folders only re-renders the explorer"""
+    lang = st.session_state.get("language", i18n.SOURCE_LANGUAGE)
+    st.markdown(f"### {i18n.ui_text('File Explorer', lang)}")
+
+    def open_in_editor(item_path):
+        st.session_state.file_path = item_path
+        st.session_state.current_file = item_path
+
+        if item_path in st.session_state.edited_files:
+            st.session_state.file_content = st.session_state.edited_files[item_path]
+        else:
+            content, _ = get_file_content(username, repo_name, item_path)
+            st.session_state.file_content = content
+            st.session_state.edited_files[item_path] = content
+
+        st.session_state.view_file = True
+        st.rerun()
+
+    if render_interactive_directory_structure(username, repo_name, on_file_open=open_in_editor) is None:
+        st.warning(i18n.ui_text("No repository structure available.", lang))
+
+@st.fragment
+def code_assistant_panel(username, repo_name):
+    """Groq assistant tab; queries and history only re-render this panel"""
+    lang = st.session_state.get("language", i18n.SOURCE_LANGUAGE)
+    st.markdown(f"### {i18n.ui_text('Groq AI Assistant', lang)}")
+    st.markdown(i18n.ui_text("Ask questions about this code file, upload images, or get AI-assisted suggestions.", lang))
+
+
+    query = st.text_area(
+        i18n.ui_text("What would you like to ask about this code?", lang),
+        height=100,
+        help=i18n.ui_text(
+            "Example: 'Explain what this code does', 'Suggest optimizations', or 'Generate a similar function'", lang
+        ),
+        key="code_assistant_query"
+    )
+
+
+    uploaded_image = st.file_uploader(i18n.ui_text("Upload an image (optional)", lang), type=['png', 'jpg', 'jpeg'],
+                                      key="code_assistant_image")
+
+
+    if st.button(i18n.ui_text("Submit Query", lang), key="submit_code_assistant_query"):
+        if not query.strip() and uploaded_image is None:
+            st.warning(i18n.ui_text("Please enter a query or upload an image before submitting.", lang))
+        else:
+            with st.spinner(i18n.ui_text("Processing your query with Groq...", lang)):
+                try:
+
+                    current_content = st.session_state.edited_files.get(
+                        st.session_state.current_file, 
+                        st.session_state.file_content
+                    )
+
+
+                    file_url = f"https://raw.githubusercontent.com/{username}/{repo_name}/main/{st.session_state.current_file}"
+
+
+                    payload = {
+                        "file_url": file_url,  
+                        "query": query,
+                        "file_content": current_content  
+                    }
+
+
+                    if uploaded_image is not None:
+
+                        image_bytes = utils.compress_image_for_upload(uploaded_image.getvalue())
+                        payload["image"] = base64.b64encode(image_bytes).decode('utf-8')
+
+
+                    response = resilience.request(
+                        'backend', 'POST', urljoin(BACKEND_URL, "query-code/"),
+                        json=payload,
+                        timeout=60  
+                    )
+
+                    if response.status_code == 200:
+                        result = response.json()
+
+
+                        history_entry = {
+                            "query": f"[File: {st.session_state.current_file}] {query}",
+                            "response": result["response"],
+                            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                            "has_image": uploaded_image is not None
+                        }
+
+                        if uploaded_image is not None:
+
+                            history_entry["image_name"] = uploaded_image.name
+
+                        st.session_state.groq_history.append(history_entry)
+
+
+                        st.rerun(scope="fragment")
+                    else:
+                        error_msg = response.text
+                        try:
+                            error_json = response.json()
+                            if "error" in error_json:
+                                error_msg = error_json["error"]
+                        except:
+                            pass
+
+                        st.error(f"Error: {error_msg}")
+                except resilience.UpstreamUnavailable as e:
+                    st.error(f"Connection error: {str(e)}")
+                    st.info("Check your internet connection or the backend service status.")
+                except Exception as e:
+                    st.error(f"Unexpected error: {str(e)}")
+                    st.write(f"Debug info: {type(e).__name__}")
+
+
+    if st.session_state.groq_history:
+        st.markdown(f"## {i18n.ui_text('Conversation History', lang)}")
+
+
+        st.markdown('<div class="conversation-container">', unsafe_allow_html=True)
+
+        for i, item in enumerate(st.session_state.groq_history):
+
+            query_text = item["query"]
+            if item.get("has_image", False):
+                query_text += f' [with image: {item.get("image_name", "uploaded")}]'
+
+            st.markdown(f'<div class="chat-message user">'
+                      f'<div><strong>You asked:</strong></div>'
+                      f'<div class="message">{query_text}</div>'
+                      f'</div>', unsafe_allow_html=True)
+
+
+            st.markdown(f'<div class="chat-message assistant">'
+                      f'<div><strong>AI response:</strong></div>'
+                      f'<div class="message">{item["response"]}</div>'
+                      f'</div>', unsafe_allow_html=True)
+
+
+            if "```" in item["response"]:
+                if st.button(f"Apply this code", key=f"apply_{i}"):
+
+                    code_blocks = []
+                    lines = item["response"].split('\n')
+                    in_code_block = False
+                    current_block = []
+
+                    for line in lines:
+                        if line.startswith('```'):
+                            if in_code_block:
+                                code_blocks.append('\n'.join(current_block))
+                                current_block = []
+                            in_code_block = not in_code_block
+                        elif in_code_block:
+                            current_block.append(line)
+
+                    if code_blocks:
+
+                        main_code = max(code_blocks, key=len)
+
+                        st.session_state.file_content = main_code
+                        st.session_state.edited_files[st.session_state.current_file] = main_code
+                        st.success("Applied AI-generated code to the editor!")
+                        st.rerun()
+
+
+        st.markdown('</div>', unsafe_allow_html=True)
+
+        if st.button(i18n.ui_text("Clear History", lang), key="clear_code_assistant_history"):
+            st.session_state.groq_history = []
+            st.rerun(scope="fragment")
+
+@st.fragment
+def execution_panel():
+    """Compile & Run tab; running code and editing test cases only re-render this panel"""
+    lang = st.session_state.get("language", i18n.SOURCE_LANGUAGE)
+    st.markdown(f"### {i18n.ui_text('Compile & Run Code', lang)}")
+
+
+    language_map = {
+        '.py': ('python3', '4'),
+        '.js': ('nodejs', '4'),
+        '.java': ('java', '4'),
+        '.c': ('c', '5'),
+        '.cpp': ('cpp', '5'),
+        '.cs': ('csharp', '4'),
+        '.php': ('php', '4'),
+        '.rb': ('ruby', '4'),
+        '.go': ('go', '4'),
+        '.rs': ('rust', '4'),
+        '.ts': ('typescript', '4'),
+        '.sh': ('bash', '4'),
+        '.pl': ('perl', '4'),
+        '.swift': ('swift', '4'),
+        '.kt': ('kotlin', '4'),
+        '.r': ('r', '4')
+    }
+
+    current_ext = os.path.splitext(st.session_state.current_file)[1].lower()
+    is_compilable = current_ext in language_map
+
+    if not is_compilable:
+        st.warning(f"The current file type ({current_ext}) is not supported for compilation. Supported file types: {', '.join(language_map.keys())}")
+    else:
+
+        jdoodle_lang, version_index = language_map[current_ext]
+
+
+        stdin = st.text_area(i18n.ui_text("Standard Input (optional)", lang), height=100,
+                             help=i18n.ui_text("Enter any input required by your program", lang), key="execution_stdin")
+
+
+        engines_info = utils.get_execution_engines()
+        engine_labels = {"local": i18n.ui_text("Local sandbox", lang), "jdoodle": "JDoodle"}
+        engines = engines_info["engines"]
+        engine = st.radio(
+            i18n.ui_text("Execution engine", lang),
+            engines,
+            index=engines.index(engines_info["default"]) if engines_info["default"] in engines else 0,
+            format_func=lambda name: engine_labels.get(name, name),
+            horizontal=True,
+            help=i18n.ui_text(
+                "The local sandbox runs on the Viksit server and avoids the JDoodle round trip and credit limits", lang
+            ),
+            key="execution_engine"
+        )
+
+        if engine == "local" and jdoodle_lang not in engines_info["local_languages"]:
+            st.info(f"{jdoodle_lang} is not available in the local sandbox; choose JDoodle to run this file.")
+            return
+
+        client_id = None
+        client_secret = None
+        if engine == "jdoodle" and not engines_info["jdoodle_configured"]:
+            client_id = os.getenv("JDOODLE_CLIENT_ID")
+            client_secret = os.getenv("JDOODLE_CLIENT_SECRET")
+
+            if not client_id or not client_secret:
+                st.error("JDoodle is not configured on the server. Enter your JDoodle API credentials, or add JDOODLE_CLIENT_ID and JDOODLE_CLIENT_SECRET to your .env file.")
+
+                col1, col2 = st.columns(2)
+                with col1:
+                    client_id = st.text_input("JDoodle Client ID", type="password")
+                with col2:
+                    client_secret = st.text_input("JDoodle Client Secret", type="password")
+
+                if not client_id or not client_secret:
+                    st.info(i18n.ui_text("Please enter your JDoodle API credentials to continue.", lang))
+                    return
+
+        use_cache = st.checkbox(
+            i18n.ui_text("Reuse results of identical runs", lang),
+            value=True,
+            key="execution_use_cache",
+            help="Programs that don't use randomness, time, files or the network are answered from a cache when the same code and input were run before"
+        )
+
+        if st.button(i18n.ui_text("Compile & Run", lang), key="compile_and_run"):
+            with st.spinner(i18n.ui_text("Compiling and running code...", lang)):
+                try:
+                    current_content = st.session_state.edited_files.get(
+                        st.session_state.current_file, 
+                        st.session_state.file_content
+                    )
+
+                    execute_payload = {
+                        "script": current_content,
+                        "stdin": stdin,
+                        "language": jdoodle_lang,
+                        "versionIndex": version_index,
+                        "compileOnly": False,
+                        "engine": engine,
+                        "cache": use_cache
+                    }
+                    if client_id and client_secret:
+                        execute_payload["clientId"] = client_id
+                        execute_payload["clientSecret"] = client_secret
+
+                    execute_response = resilience.request(
+                        'backend', 'POST', urljoin(BACKEND_URL, "execute-code/"),
+                        json=execute_payload,
+                        timeout=60  
+                    )
+
+
+                    if execute_response.status_code == 200:
+                        result = execute_response.json()
+                        st.session_state.compilation_result = result
+                        st.rerun(scope="fragment")
+                    else:
+                        st.error(f"Error executing code: {execute_response.text}")
+
+                except resilience.UpstreamUnavailable as e:
+                    st.error(f"Connection error with the execution service: {str(e)}")
+                except Exception as e:
+                    st.error(f"Unexpected error during compilation: {str(e)}")
+
+
+        if st.session_state.compilation_result:
+            result = st.session_state.compilation_result
+
+
+            with st.expander(i18n.ui_text("Execution Results", lang), expanded=True):
+                st.markdown(f"#### {i18n.ui_text('Program Output', lang)}")
+                if result.get("cached"):
+                    st.caption(i18n.ui_text("Served from the result cache", lang))
+
+
+                st.code(result.get("output", "No output"), language="text")
+
+
+                st.markdown(f"#### {i18n.ui_text('Execution Details', lang)}")
+                col1, col2, col3 = st.columns(3)
+
+                with col1:
+                    st.metric(i18n.ui_text("Status Code", lang), result.get("statusCode", "N/A"))
+                with col2:
+                    st.metric(i18n.ui_text("Memory Used", lang), f"{result.get('memory') or 'N/A'} KB")
+                with col3:
+                    st.metric(i18n.ui_text("CPU Time", lang), f"{result.get('cpuTime', 'N/A')} sec")
+
+
+                if st.button(i18n.ui_text("Copy Output to Clipboard", lang), key="copy_output"):
+                    try:
+                        pyperclip.copy(result.get("output", ""))
+                        st.success("Output copied to clipboard!")
+                    except Exception as e:
+                        st.error(f"Failed to copy to clipboard: {str(e)}")
+
+                if st.button(i18n.ui_text("Clear Results", lang), key="clear_results"):
+                    st.session_state.compilation_result = None
+                    st.rerun(scope="fragment")
+
+
+        with st.expander(i18n.ui_text("Test Cases", lang)):
+            st.caption(i18n.ui_text("Run the program once per input and compare each output with the expected output", lang))
+
+            cases = []
+            for i in range(st.session_state.test_case_count):
+                col1, col2 = st.columns(2)
+                with col1:
+                    case_stdin = st.text_area(f"Input {i + 1}", height=80, key=f"test_case_stdin_{i}")
+                with col2:
+                    case_expected = st.text_area(f"Expected output {i + 1} (optional)", height=80, key=f"test_case_expected_{i}")
+                case = {"id": i + 1, "stdin": case_stdin}
+                if case_expected.strip():
+                    case["expected_output"] = case_expected
+                cases.append(case)
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                if st.button(i18n.ui_text("Add Case", lang), key="add_test_case"):
+                    st.session_state.test_case_count += 1
+                    st.rerun(scope="fragment")
+            with col2:
+                if st.button(i18n.ui_text("Remove Case", lang), key="remove_test_case") and st.session_state.test_case_count > 1:
+                    st.session_state.test_case_count -= 1
+                    st.rerun(scope="fragment")
+            with col3:
+                run_cases = st.button(i18n.ui_text("Run All Cases", lang), key="run_test_cases")
+
+            if run_cases:
+                with st.spinner(f"Running {len(cases)} test cases..."):
+                    try:
+                        cases_payload = {
+                            "script": st.session_state.edited_files.get(
+                                st.session_state.current_file,
+                                st.session_state.file_content
+                            ),
+                            "language": jdoodle_lang,
+                            "versionIndex": version_index,
+                            "engine": engine,
+                            "cache": use_cache,
+                            "cases": cases
+                        }
+                        if client_id and client_secret:
+                            cases_payload["clientId"] = client_id
+                            cases_payload["clientSecret"] = client_secret
+
+                        cases_response = resilience.request(
+                            'backend', 'POST', urljoin(BACKEND_URL, "execute-code/"),
+                            json=cases_payload,
+                            timeout=120
+                        )
+
+                        if cases_response.status_code == 200:
+                            st.session_state.test_case_results = cases_response.json()
+                        else:
+                            st.error(f"Error running test cases: {cases_response.text}")
+
+                    except resilience.UpstreamUnavailable as e:
+                        st.error(f"Connection error with the execution service: {str(e)}")
+                    except Exception as e:
+                        st.error(f"Unexpected error while running test cases: {str(e)}")
+
+            if st.session_state.test_case_results:
+                summary = st.session_state.test_case_results["summary"]
+                if summary["graded"]:
+                    st.markdown(f"**{summary['passed']} / {summary['graded']} cases passed**")
+                if summary["errors"]:
+                    st.warning(f"{summary['errors']} cases could not be run")
+
+                rows = []
+                for case_result in st.session_state.test_case_results["results"]:
+                    if "error" in case_result:
+                        status = "Error"
+                    elif "passed" not in case_result:
+                        status = "Ran"
+                    else:
+                        status = "Passed" if case_result["passed"] else "Failed"
+                    rows.append({
+                        "Case": case_result["id"],
+                        "Status": status,
+                        "Output": case_result.get("output", case_result.get("error", "")),
+                        "CPU Time (s)": case_result.get("cpuTime"),
+                        "Memory (KB)": case_result.get("memory"),
+                        "Cached": case_result.get("cached", False)
+                    })
+                st.dataframe(rows, use_container_width=True, hide_index=True)
+
 def code_editor_page():
     """Interactive code editor page for viewing and editing repository files with Groq AI assistant integration"""
+    lang = st.session_state.get("language", i18n.SOURCE_LANGUAGE)
     
     
     if not st.session_state.get("username") or not st.session_state.get("repo_name"):
-        st.warning("No repository selected. Please select a repository from the main page first.")
-        if st.button("Go to Main Page"):
+        st.warning(i18n.ui_text("No repository selected. Please select a repository from the main page first.", lang))
+        if st.button(i18n.ui_text("Go to Main Page", lang), key="go_to_main_page"):
             st.session_state.page = "main"
             st.rerun()
         return
@@ -42,8 +466,6 @@ def code_editor_page():
         if 'view_file' in st.session_state:
             st.session_state.view_file = False
 
-        st.session_state.file_tree = get_repo_structure(username, repo_name)
-
         st.session_state.previous_repo = f"{username}/{repo_name}"
     
     st.markdown('<h1 style="text-align: center;">Code Editor</h1>', unsafe_allow_html=True)
@@ -65,13 +487,6 @@ def code_editor_page():
     if 'edited_files' not in st.session_state:
         
         st.session_state.edited_files = {}
-    if 'file_tree' not in st.session_state:
-        
-        if 'top_level_structure' in st.session_state:
-            st.session_state.file_tree = st.session_state.top_level_structure
-        else:
-            
-            st.session_state.file_tree = get_repo_structure(username, repo_name)
     
     if 'view_file' not in st.session_state:
         st.session_state.view_file = False
@@ -84,8 +499,14 @@ def code_editor_page():
     if 'compilation_result' not in st.session_state:
         st.session_state.compilation_result = None
     
+    if 'test_case_count' not in st.session_state:
+        st.session_state.test_case_count = 2
+    
+    if 'test_case_results' not in st.session_state:
+        st.session_state.test_case_results = None
+    
    
-    if st.button("⬅ Back to Repository Structure", key="back_to_repo"):
+    if st.button(f"⬅ {i18n.ui_text('Back to Repository Structure', lang)}", key="back_to_repo"):
         st.session_state.page = "repo_structure"
         st.rerun()
     
@@ -93,108 +514,7 @@ def code_editor_page():
     col1, col2 = st.columns([1, 3])
     
     with col1:
-        st.markdown("### File Explorer")
-        
-        
-        def render_interactive_directory_structure(structure, path_prefix=""):
-            """Render the repository structure with collapsible folders and file links"""
-            for item in structure:
-                item_path = f"{path_prefix}/{item['name']}" if path_prefix else item['name']
-                item_id = f"tree_{item_path.replace('/', '_')}"
-                
-                if item["type"] == "dir":
-                    
-                    folder_key = f"folder_{item_id}"
-                    
-                   
-                    if folder_key not in st.session_state:
-                        st.session_state[folder_key] = False
-                    
-                   
-                    col1, col2 = st.columns([0.05, 0.95])
-                    with col1:
-                        if st.button("➤", key=f"toggle_{folder_key}", help=f"Expand/Collapse {item['name']}"):
-                            st.session_state[folder_key] = not st.session_state[folder_key]
-                            st.rerun()
-                    
-                    with col2:
-                        st.markdown(
-                            f"""
-                            <div id="{item_id}" class="folder-toggle">
-                                <span class="item-bullet">{'•' if not path_prefix else '◦'}</span>
-                                <span class="tree-icon dir-icon">📁</span>
-                                <span class="item-text">{item['name']}</span>
-                            </div>
-                            """, 
-                            unsafe_allow_html=True
-                        )
-                    
-                    
-                    if st.session_state[folder_key]:
-                        
-                        with st.container():
-                            st.markdown('<div class="folder-contents">', unsafe_allow_html=True)
-                            
-                            if "children" in item and item["children"]:
-                                
-                                render_interactive_directory_structure(item["children"], item_path)
-                            else:
-                                
-                                children = get_repo_structure(
-                                    st.session_state.username, 
-                                    st.session_state.repo_name, 
-                                    item_path
-                                )
-                                render_interactive_directory_structure(children, item_path)
-                                
-                            st.markdown('</div>', unsafe_allow_html=True)
-                else:
-                    
-                    file_extension = item['name'].split('.')[-1].lower() if '.' in item['name'] else ''
-                    icon = get_file_icon(file_extension)
-                    
-                    
-                    col1, col2, col3 = st.columns([0.05, 0.05, 0.9])
-                    
-                    with col1:
-                        
-                        st.write("")
-                        
-                    with col2:
-                        
-                        st.markdown(f"<span class='file-icon'>{icon}</span>", unsafe_allow_html=True)
-                        
-                    with col3:
-                        
-                        if st.button(f"{item['name']}", key=f"file_{item_id}", help=f"View {item['name']}"):
-                            
-                            st.session_state.file_path = item_path
-                            st.session_state.current_file = item_path
-                            
-                            
-                            if item_path in st.session_state.edited_files:
-                                st.session_state.file_content = st.session_state.edited_files[item_path]
-                            else:
-                                
-                                content, _ = get_file_content(username, repo_name, item_path)
-                                st.session_state.file_content = content
-                                
-                                st.session_state.edited_files[item_path] = content
-                            
-                            st.session_state.view_file = True
-                            st.rerun()
-        
-        
-        if st.session_state.file_tree:
-            render_interactive_directory_structure(st.session_state.file_tree)
-        else:
-            st.warning("No repository structure available. Fetching now...")
-            
-            try:
-                st.session_state.file_tree = get_repo_structure(username, repo_name)
-                st.rerun()
-            except Exception as e:
-                st.error(f"Error fetching repository structure: {str(e)}")
+        file_explorer_panel(username, repo_name)
     
     with col2:
         if st.session_state.view_file and st.session_state.current_file:
@@ -204,7 +524,9 @@ def code_editor_page():
             file_ext = os.path.splitext(st.session_state.current_file)[1]
             
             # Tabs for Editor, Groq Assistant, and Code Compiler
-            editor_tab, groq_tab, compiler_tab = st.tabs(["Code Editor", "Groq Assistant", "Compile & Run"])
+            editor_tab, groq_tab, compiler_tab = st.tabs(
+                i18n.ui_texts(["Code Editor", "Groq Assistant", "Compile & Run"], lang)
+            )
             
             with editor_tab:
                 
@@ -221,7 +543,7 @@ def code_editor_page():
                 
                
                 new_content = st.text_area(
-                    "File Content",
+                    i18n.ui_text("File Content", lang),
                     value=st.session_state.file_content,
                     height=400,
                     key="code_editor"
@@ -230,290 +552,27 @@ def code_editor_page():
                 
                 col_a, col_b = st.columns([1, 4])
                 with col_a:
-                    if st.button("Save Changes"):
+                    if st.button(i18n.ui_text("Save Changes", lang), key="save_changes"):
                         
                         st.session_state.edited_files[st.session_state.current_file] = new_content
                         st.session_state.file_content = new_content
                         st.success(f"Changes to {st.session_state.current_file} saved locally!")
                 with col_b:
-                    if st.button("Discard Changes"):
+                    if st.button(i18n.ui_text("Discard Changes", lang), key="discard_changes"):
                         
                         if st.session_state.current_file in st.session_state.edited_files:
                             
                             content, _ = get_file_content(username, repo_name, st.session_state.current_file)
                             st.session_state.file_content = content
                             st.session_state.edited_files[st.session_state.current_file] = content
-                            st.success("Changes discarded. Reverted to original content.")
+                            st.success(i18n.ui_text("Changes discarded. Reverted to original content.", lang))
                         st.rerun()
             
             with groq_tab:
-                st.markdown("### Groq AI Assistant")
-                st.markdown("Ask questions about this code file, upload images, or get AI-assisted suggestions.")
-                
-                
-                query = st.text_area(
-                    "What would you like to ask about this code?",
-                    height=100,
-                    help="Example: 'Explain what this code does', 'Suggest optimizations', or 'Generate a similar function'"
-                )
-                
-                
-                uploaded_image = st.file_uploader("Upload an image (optional)", type=['png', 'jpg', 'jpeg'])
-                
-
-                if st.button("Submit Query"):
-                    if not query.strip() and uploaded_image is None:
-                        st.warning("Please enter a query or upload an image before submitting.")
-                    else:
-                        with st.spinner("Processing your query with Groq..."):
-                            try:
-                                
-                                current_content = st.session_state.edited_files.get(
-                                    st.session_state.current_file, 
-                                    st.session_state.file_content
-                                )
-                                
-                                
-                                file_url = f"https://raw.githubusercontent.com/{username}/{repo_name}/main/{st.session_state.current_file}"
-                                
-                                
-                                payload = {
-                                    "file_url": file_url,  
-                                    "query": query,
-                                    "file_content": current_content  
-                                }
-                                
-                                
-                                if uploaded_image is not None:
-                                
-                                    image_bytes = uploaded_image.getvalue()
-                                    payload["image"] = base64.b64encode(image_bytes).decode('utf-8')
-                                
-                                
-                                response = requests.post(
-                                    urljoin(BACKEND_URL, "query-code/"),
-                                    json=payload,
-                                    timeout=60  
-                                )
-                                
-                                if response.status_code == 200:
-                                    result = response.json()
-                                    
-                                    
-                                    history_entry = {
-                                        "query": f"[File: {st.session_state.current_file}] {query}",
-                                        "response": result["response"],
-                                        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-                                        "has_image": uploaded_image is not None
-                                    }
-                                    
-                                    if uploaded_image is not None:
-
-                                        history_entry["image_name"] = uploaded_image.name
-                                    
-                                    st.session_state.groq_history.append(history_entry)
-                                    
-
-                                    st.rerun()
-                                else:
-                                    error_msg = response.text
-                                    try:
-                                        error_json = response.json()
-                                        if "error" in error_json:
-                                            error_msg = error_json["error"]
-                                    except:
-                                        pass
-                                    
-                                    st.error(f"Error: {error_msg}")
-                            except requests.exceptions.RequestException as e:
-                                st.error(f"Connection error: {str(e)}")
-                                st.info("Check your internet connection or the backend service status.")
-                            except Exception as e:
-                                st.error(f"Unexpected error: {str(e)}")
-                                st.write(f"Debug info: {type(e).__name__}")
-                
-
-                if st.session_state.groq_history:
-                    st.markdown("## Conversation History")
-                    
-
-                    st.markdown('<div class="conversation-container">', unsafe_allow_html=True)
-                    
-                    for i, item in enumerate(st.session_state.groq_history):
-
-                        query_text = item["query"]
-                        if item.get("has_image", False):
-                            query_text += f' [with image: {item.get("image_name", "uploaded")}]'
-                        
-                        st.markdown(f'<div class="chat-message user">'
-                                  f'<div><strong>You asked:</strong></div>'
-                                  f'<div class="message">{query_text}</div>'
-                                  f'</div>', unsafe_allow_html=True)
-                        
-
-                        st.markdown(f'<div class="chat-message assistant">'
-                                  f'<div><strong>AI response:</strong></div>'
-                                  f'<div class="message">{item["response"]}</div>'
-                                  f'</div>', unsafe_allow_html=True)
-                        
-
-                        if "```" in item["response"]:
-                            if st.button(f"Apply this code", key=f"apply_{i}"):
-
-                                code_blocks = []
-                                lines = item["response"].split('\n')
-                                in_code_block = False
-                                current_block = []
-                                
-                                for line in lines:
-                                    if line.startswith('```'):
-                                        if in_code_block:
-                                            code_blocks.append('\n'.join(current_block))
-                                            current_block = []
-                                        in_code_block = not in_code_block
-                                    elif in_code_block:
-                                        current_block.append(line)
-                                
-                                if code_blocks:
-
-                                    main_code = max(code_blocks, key=len)
-
-                                    st.session_state.file_content = main_code
-                                    st.session_state.edited_files[st.session_state.current_file] = main_code
-                                    st.success("Applied AI-generated code to the editor!")
-                                    st.rerun()
-                    
-
-                    st.markdown('</div>', unsafe_allow_html=True)
-                    
-                    if st.button("Clear History"):
-                        st.session_state.groq_history = []
-                        st.rerun()
+                code_assistant_panel(username, repo_name)
             
 
             with compiler_tab:
-                st.markdown("### Compile & Run Code")
-                
-
-                language_map = {
-                    '.py': ('python3', '4'),
-                    '.js': ('nodejs', '4'),
-                    '.java': ('java', '4'),
-                    '.c': ('c', '5'),
-                    '.cpp': ('cpp', '5'),
-                    '.cs': ('csharp', '4'),
-                    '.php': ('php', '4'),
-                    '.rb': ('ruby', '4'),
-                    '.go': ('go', '4'),
-                    '.rs': ('rust', '4'),
-                    '.ts': ('typescript', '4'),
-                    '.sh': ('bash', '4'),
-                    '.pl': ('perl', '4'),
-                    '.swift': ('swift', '4'),
-                    '.kt': ('kotlin', '4'),
-                    '.r': ('r', '4')
-                }
-                
-                current_ext = os.path.splitext(st.session_state.current_file)[1].lower()
-                is_compilable = current_ext in language_map
-                
-                if not is_compilable:
-                    st.warning(f"The current file type ({current_ext}) is not supported for compilation. Supported file types: {', '.join(language_map.keys())}")
-                else:
-                  
-                    jdoodle_lang, version_index = language_map[current_ext]
-                    
-                    
-                    stdin = st.text_area("Standard Input (optional)", height=100, 
-                                         help="Enter any input required by your program")
-                    
-                    
-                    client_id = os.getenv("JDOODLE_CLIENT_ID")
-                    client_secret = os.getenv("JDOODLE_CLIENT_SECRET")
-                    
-                    if not client_id or not client_secret:
-                        st.error("JDoodle API credentials not found in environment variables. Please add JDOODLE_CLIENT_ID and JDOODLE_CLIENT_SECRET to your .env file.")
-                        
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            client_id = st.text_input("JDoodle Client ID", type="password")
-                        with col2:
-                            client_secret = st.text_input("JDoodle Client Secret", type="password")
-                        
-                        if not client_id or not client_secret:
-                            st.info("Please enter your JDoodle API credentials to continue.")
-                            return
-                    
-                    if st.button("Compile & Run"):
-                        with st.spinner("Compiling and running code..."):
-                            try:
-                                current_content = st.session_state.edited_files.get(
-                                    st.session_state.current_file, 
-                                    st.session_state.file_content
-                                )
-                                
-                                jdoodle_payload = {
-                                    "clientId": client_id,
-                                    "clientSecret": client_secret,
-                                    "script": current_content,
-                                    "stdin": stdin,
-                                    "language": jdoodle_lang,
-                                    "versionIndex": version_index,
-                                    "compileOnly": False
-                                }
-                                
-                               
-                                jdoodle_response = requests.post(
-                                    "https://api.jdoodle.com/v1/execute",
-                                    json=jdoodle_payload,
-                                    timeout=30  
-                                )
-                                
-                                
-                                if jdoodle_response.status_code == 200:
-                                    result = jdoodle_response.json()
-                                    st.session_state.compilation_result = result
-                                    st.rerun()
-                                else:
-                                    st.error(f"Error from JDoodle API: {jdoodle_response.text}")
-                                    
-                            except requests.exceptions.RequestException as e:
-                                st.error(f"Connection error with JDoodle: {str(e)}")
-                            except Exception as e:
-                                st.error(f"Unexpected error during compilation: {str(e)}")
-                    
-                    
-                    if st.session_state.compilation_result:
-                        result = st.session_state.compilation_result
-                        
-                        
-                        with st.expander("Execution Results", expanded=True):
-                            st.markdown("#### Program Output")
-                            
-                            
-                            st.code(result.get("output", "No output"), language="text")
-                            
-                           
-                            st.markdown("#### Execution Details")
-                            col1, col2, col3 = st.columns(3)
-                            
-                            with col1:
-                                st.metric("Status Code", result.get("statusCode", "N/A"))
-                            with col2:
-                                st.metric("Memory Used", f"{result.get('memory', 'N/A')} KB")
-                            with col3:
-                                st.metric("CPU Time", f"{result.get('cpuTime', 'N/A')} sec")
-                            
-                           
-                            if st.button("Copy Output to Clipboard"):
-                                try:
-                                    pyperclip.copy(result.get("output", ""))
-                                    st.success("Output copied to clipboard!")
-                                except Exception as e:
-                                    st.error(f"Failed to copy to clipboard: {str(e)}")
-                            
-                            if st.button("Clear Results"):
-                                st.session_state.compilation_result = None
-                                st.rerun()
+                execution_panel()
         else:
-            st.info("Select a file from the explorer to start editing")
\ No newline at end of file
+            st.info(i18n.ui_text("Select a file from the explorer to start editing", lang))
\ No newline at end of file
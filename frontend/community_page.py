@@ -5,7 +5,8 @@ import uuid
 import json
 import time
 import pandas as pd
-import requests
+import translation
+import i18n
 import os
 
 def generate_default_messages():
@@ -56,60 +57,32 @@ def generate_default_messages():
 
 def get_supported_languages():
     """Return a dictionary of supported languages and their codes"""
-    return {
-        "English": "en-IN",
-        "Hindi": "hi-IN",
-        "Bengali": "bn-IN",
-        "Telugu": "te-IN",
-        "Tamil": "ta-IN",
-        "Marathi": "mr-IN",
-        "Gujarati": "gu-IN",
-        "Kannada": "kn-IN",
-        "Malayalam": "ml-IN",
-        "Punjabi": "pa-IN"
-    }
+    return dict(i18n.SUPPORTED_LANGUAGES)
 
-def translate_text(text, target_language_code):
+def translate_texts(texts, target_language_code):
     """
-    Translate text to the specified language using Sarvam API
+    Translate a list of texts to the specified language using Sarvam API
+    
+    Translations are cached on disk, and texts not yet cached are translated
+    concurrently, so a page costs one parallel round of requests per language.
     
     Args:
-        text (str): Original text
+        texts (list): Original texts
         target_language_code (str): Target language code for translation
         
     Returns:
-        str: Translated text
+        list: Translated texts, in the same order (originals where translation failed)
     """
-    if target_language_code == "en-IN" or not text:
-        return text
-        
+    if target_language_code == "en-IN":
+        return list(texts)
+    
     try:
-        api_key = os.environ.get('SARVAM_API_KEY')
-        if not api_key:
-            st.warning("Sarvam API key not found. Please set SARVAM_API_KEY in environment variables.")
-            return text
-
-        url = "https://api.sarvam.ai/translate"
-        payload = {
-            "input": text,
-            "source_language_code": "en-IN",  
-            "target_language_code": target_language_code
-        }
-        
-        headers = {
-            "Content-Type": "application/json",
-            "api-subscription-key": api_key
-        }
-        
-        response = requests.post(url, json=payload, headers=headers)
-        
-        if response.status_code == 200:
-            result = response.json()
-            return result.get("translated_text", text)
-        else:
-            return text
-    except Exception as e:
-        return text
+        return translation.translate_many(texts, target_language_code)
+    except translation.TranslationUnavailable as e:
+        st.warning(str(e))
+        return list(texts)
+    except Exception:
+        return list(texts)
 
 def load_css():
     st.markdown("""
@@ -536,10 +509,17 @@ def load_css():
 
 def display_messages(messages, target_language_code):
     """Display messages with optimized styling and translation capability"""
+    # Translate every post and reply in one batch instead of one request each
+    originals = []
+    for msg in messages:
+        originals.append(msg['content'])
+        originals.extend(reply['content'] for reply in msg['replies'])
+    translated = dict(zip(originals, translate_texts(originals, target_language_code)))
+    
     for idx, msg in enumerate(messages):
         msg_id = f"msg_{msg['id']}"
         
-        translated_content = translate_text(msg['content'], target_language_code)
+        translated_content = translated[msg['content']]
         
         st.markdown(f"""
         <div class='message-card' id='{msg_id}'>
@@ -557,7 +537,7 @@ def display_messages(messages, target_language_code):
         if msg['replies']:
             for reply in msg['replies']:
 
-                translated_reply = translate_text(reply['content'], target_language_code)
+                translated_reply = translated[reply['content']]
                 
                 st.markdown(f"""
                 <div class='message-reply'>
@@ -591,21 +571,39 @@ def community_page():
     
     lang_code = st.session_state.language
     
-    stats_title = translate_text("Community Stats", lang_code)
-    members_label = translate_text("Members", lang_code)
-    online_label = translate_text("Online", lang_code)
-    tags_title = translate_text("Popular Tags", lang_code)
-    discussions_title = translate_text("Developer Discussions", lang_code)
-    join_button_text = translate_text("Join Community", lang_code)
-    welcome_text = translate_text("Welcome", lang_code)
-    language_selector_text = translate_text("Select Language", lang_code)
-    share_placeholder = translate_text("What's on your mind?", lang_code)
-    post_button_text = translate_text("Post", lang_code)
-    join_info_text = translate_text("Join the community to participate in discussions!", lang_code)
-    comment_header_text = translate_text("Add a comment to an existing discussion", lang_code)
-    select_post_text = translate_text("Select a discussion to comment on", lang_code)
-    comment_placeholder = translate_text("Add your thoughts here...", lang_code)
-    comment_button_text = translate_text("Comment", lang_code)
+    (
+        stats_title,
+        members_label,
+        online_label,
+        tags_title,
+        discussions_title,
+        join_button_text,
+        welcome_text,
+        language_selector_text,
+        share_placeholder,
+        post_button_text,
+        join_info_text,
+        comment_header_text,
+        select_post_text,
+        comment_placeholder,
+        comment_button_text,
+    ) = i18n.ui_texts([
+        "Community Stats",
+        "Members",
+        "Online",
+        "Popular Tags",
+        "Developer Discussions",
+        "Join Community",
+        "Welcome",
+        "Select Language",
+        "What's on your mind?",
+        "Post",
+        "Join the community to participate in discussions!",
+        "Add a comment to an existing discussion",
+        "Select a discussion to comment on",
+        "Add your thoughts here...",
+        "Comment",
+    ], lang_code)
     
     st.markdown(f'<div class="section-title">{stats_title}</div>', unsafe_allow_html=True)
     
@@ -670,7 +668,8 @@ def community_page():
         selected_language = st.selectbox(
             "",  
             options=list(languages.keys()),
-            index=list(languages.keys()).index("English" if "English" in languages else list(languages.keys())[0]),
+            # The language is app-wide, so the selector starts at the current one
+            index=list(languages.values()).index(lang_code) if lang_code in languages.values() else 0,
             key="language_dropdown",
             label_visibility="collapsed"  
         )
@@ -1,8 +1,8 @@
 import streamlit as st
-import requests
+import resilience
 import time
 from urllib.parse import urljoin
-from utils import get_repo_structure, BACKEND_URL
+from utils import get_repo_tree, BACKEND_URL
 
 def groq_assistant_page():
     """Page for Groq AI assistant to analyze repositories and code"""
@@ -54,8 +54,8 @@ def groq_assistant_page():
                 with st.spinner("Processing your query with Groq..."):
                     try:
                         # Send query to backend
-                        response = requests.post(
-                            urljoin(BACKEND_URL, "query-repository/"),
+                        response = resilience.request(
+                            'backend', 'POST', urljoin(BACKEND_URL, "query-repository/"),
                             json={
                                 "username": username,
                                 "repo_name": repo_name,
@@ -81,45 +81,15 @@ def groq_assistant_page():
                         st.error(f"Error: {str(e)}")
     
     else:  # Code File Analysis
-        # Fetch repository structure for file selection
+        # Files for selection come from the repository tree index shared with the explorers
         try:
-            if 'root_structure' not in st.session_state:
-                with st.spinner("Loading repository structure..."):
-                    response = requests.get(urljoin(BACKEND_URL, f"repo-structure/{username}/{repo_name}/"))
-                    if response.status_code == 200:
-                        st.session_state.root_structure = response.json()["structure"]
-            
-            # Extract file list for selection
-            if 'file_list' not in st.session_state:
-                st.session_state.file_list = []
-                
-                def extract_files(structure, path=""):
-                    files = []
-                    for item in structure:
-                        item_path = f"{path}/{item['name']}" if path else item['name']
-                        if item["type"] == "file" and item.get("download_url"):
-                            files.append({
-                                "path": item_path,
-                                "url": item["download_url"]
-                            })
-                        elif item["type"] == "dir":
-                            # Fetch directory contents if needed
-                            dir_structure = get_repo_structure(username, repo_name, item_path)
-                            if dir_structure:
-                                files.extend(extract_files(dir_structure, item_path))
-                    return files
-                
-                with st.spinner("Building file list..."):
-                    if 'root_structure' in st.session_state:
-                        st.session_state.file_list = extract_files(st.session_state.root_structure)
+            tree = get_repo_tree(username, repo_name)
+            file_paths = tree.files() if tree is not None else []
             
             # File selection dropdown
-            if st.session_state.file_list:
-                file_paths = [file["path"] for file in st.session_state.file_list]
+            if file_paths:
                 selected_file = st.selectbox("Select a file to analyze", file_paths)
-                
-                # Find the URL for the selected file
-                selected_file_url = next((file["url"] for file in st.session_state.file_list if file["path"] == selected_file), None)
+                selected_file_url = tree.raw_url(selected_file)
                 
                 if selected_file_url:
                     # Code analysis query
@@ -136,8 +106,8 @@ def groq_assistant_page():
                             with st.spinner("Processing your query with Groq..."):
                                 try:
                                     # Send query to backend
-                                    response = requests.post(
-                                        urljoin(BACKEND_URL, "query-code/"),
+                                    response = resilience.request(
+                                        'backend', 'POST', urljoin(BACKEND_URL, "query-code/"),
                                         json={
                                             "file_url": selected_file_url,
                                             "query": query
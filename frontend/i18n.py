@@ -0,0 +1,80 @@
+import functools
+import gzip
+import json
+import os
+
+import translation
+
+SOURCE_LANGUAGE = "en-IN"
+
+SUPPORTED_LANGUAGES = {
+    "English": "en-IN",
+    "Hindi": "hi-IN",
+    "Bengali": "bn-IN",
+    "Telugu": "te-IN",
+    "Tamil": "ta-IN",
+    "Marathi": "mr-IN",
+    "Gujarati": "gu-IN",
+    "Kannada": "kn-IN",
+    "Malayalam": "ml-IN",
+    "Punjabi": "pa-IN"
+}
+
+# Pre-translated UI strings, one gzipped JSON object per language, written by build_catalog.py
+LOCALES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales")
+
+
+def catalog_path(language_code):
+    return os.path.join(LOCALES_DIR, f"{language_code}.json.gz")
+
+
+@functools.lru_cache(maxsize=None)
+def load_catalog(language_code):
+    """
+    Load the UI string catalog of one language, once per process
+
+    Returns:
+        dict: English string -> translation; empty if the language has no catalog
+    """
+    try:
+        with gzip.open(catalog_path(language_code), "rt", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def ui_texts(texts, language_code):
+    """
+    Localize static UI strings from the precompiled catalog
+
+    Strings must be literals at the call site so build_catalog.py can find them.
+    A string missing from the catalog (added since the last build) is looked up in
+    the local translation cache, and shown in English if it is not there; pages
+    never wait on the translation API for their labels. The catalog build, run at
+    startup or with build_catalog.py, fills the gaps.
+
+    Args:
+        texts (list): English UI strings
+        language_code (str): Target language code
+
+    Returns:
+        list: Localized strings, in the same order
+    """
+    if language_code == SOURCE_LANGUAGE:
+        return list(texts)
+
+    catalog = load_catalog(language_code)
+    missing = [text for text in texts if text not in catalog]
+    fallback = {}
+    if missing:
+        try:
+            fallback = translation.get_cached_translations(missing, language_code, SOURCE_LANGUAGE)
+        except Exception:
+            pass
+
+    return [catalog.get(text) or fallback.get(text, text) for text in texts]
+
+
+def ui_text(text, language_code):
+    """Localize one static UI string; see ui_texts"""
+    return ui_texts([text], language_code)[0]
@@ -1,30 +1,34 @@
 import streamlit as st
+import i18n
 from utils import get_repositories
 
 def main_page():
     """Main page to enter GitHub username and select repository"""
-    st.markdown('<h1 style="text-align: center;">GitHub Repository Explorer</h1>', unsafe_allow_html=True)
+    lang = st.session_state.get("language", i18n.SOURCE_LANGUAGE)
+    st.markdown(f'<h1 style="text-align: center;">{i18n.ui_text("GitHub Repository Explorer", lang)}</h1>', unsafe_allow_html=True)
     
     with st.container():
         st.markdown('<div class="search-container">', unsafe_allow_html=True)
-        username = st.text_input("Enter GitHub Username", help="Type a GitHub username to see their repositories")
+        username = st.text_input(
+            i18n.ui_text("Enter GitHub Username", lang),
+            help=i18n.ui_text("Type a GitHub username to see their repositories", lang),
+            key="github_username"
+        )
         
         if username:
             repos = get_repositories(username)
             
             if repos:
                 repo_names = [repo["name"] for repo in repos]
-                selected_repo = st.selectbox("Select Repository", repo_names, help="Choose a repository to explore")
+                selected_repo = st.selectbox(
+                    i18n.ui_text("Select Repository", lang), repo_names,
+                    help=i18n.ui_text("Choose a repository to explore", lang), key="selected_repository"
+                )
                 
                 if selected_repo:
-                    if st.button("Explore Repository", help="View the repository's details and structure"):
+                    if st.button(i18n.ui_text("Explore Repository", lang),
+                                 help=i18n.ui_text("View the repository's details and structure", lang)):
                         # Reset all repository-related data when selecting a new repository
-                        # Clear structure data
-                        if 'top_level_structure' in st.session_state:
-                            del st.session_state['top_level_structure']
-                        if 'file_tree' in st.session_state:
-                            del st.session_state['file_tree']
-                        
                         # Clear edited files data
                         if 'edited_files' in st.session_state:
                             st.session_state.edited_files = {}
@@ -44,12 +48,14 @@ def main_page():
                             del st.session_state['repo_documentation']
                         if 'overview_text' in st.session_state:
                             del st.session_state['overview_text']
+                        if 'documentation_loader' in st.session_state:
+                            del st.session_state['documentation_loader']
                         if 'current_audio' in st.session_state:
                             del st.session_state['current_audio']
                         
-                        # Clear folder states
+                        # Clear folder states, tree pages and filters
                         for key in list(st.session_state.keys()):
-                            if key.startswith('folder_'):
+                            if key.startswith(('folder_', 'tree_pages_', 'tree_filter_')):
                                 del st.session_state[key]
                         
                         # Clear previous AI analysis history
@@ -58,10 +64,6 @@ def main_page():
                         if 'code_analysis_history' in st.session_state:
                             del st.session_state['code_analysis_history']
                         
-                        # Clear audio cache
-                        if 'audio_cache' in st.session_state:
-                            st.session_state.audio_cache = {}
-                        
                         # Store selection for structure page
                         st.session_state.username = username
                         st.session_state.repo_name = selected_repo
@@ -71,7 +73,7 @@ def main_page():
         
         # Feature cards for users without a username entered
         if not username:
-            st.markdown("<h2>Explore our features</h2>", unsafe_allow_html=True)
+            st.markdown(f"<h2>{i18n.ui_text('Explore our features', lang)}</h2>", unsafe_allow_html=True)
             
             st.markdown('<div class="feature-cards">', unsafe_allow_html=True)
             
@@ -114,7 +116,7 @@ def main_page():
             st.markdown('</div>', unsafe_allow_html=True)
         
         # Adding some information about the application
-        with st.expander("About this App"):
+        with st.expander(i18n.ui_text("About this App", lang)):
             st.markdown("""
             This GitHub Repository Explorer allows you to:
             - Browse any public GitHub repository
@@ -1,6 +1,10 @@
 import streamlit as st
-import requests
-from utils import get_repo_structure, render_interactive_directory_structure, get_file_content
+import resilience
+import translation
+import speech
+import i18n
+from utils import render_interactive_directory_structure, get_file_content
+from utils import get_repo_info, invalidate_repository_cache, prefetch_repository
 from urllib.parse import urljoin
 import time
 from utils import BACKEND_URL
@@ -8,15 +12,26 @@ import os
 from utils import get_documentation
 import json
 from dotenv import load_dotenv
-import base64
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 load_dotenv()
 
+# Documentation generations run here, in the background, for all sessions; each is
+# mostly waiting on the backend job, so threads are cheap
+DOCUMENTATION_LOADER = ThreadPoolExecutor(
+    max_workers=int(os.getenv("DOCUMENTATION_LOADER_WORKERS", "8")),
+    thread_name_prefix="documentation-loader"
+)
+
 def translate_documentation(documentation, target_language_code):
     """
     Translate documentation to the specified language using Sarvam API
     
+    The markdown is translated section by section in parallel, with code blocks,
+    inline code and URLs left as they are. Sections are cached, so only edited
+    sections are translated again.
+    
     Args:
         documentation (str): Original documentation text
         target_language_code (str): Target language code for translation
@@ -25,101 +40,42 @@ def translate_documentation(documentation, target_language_code):
         str: Translated documentation
     """
     try:
-        api_key = os.environ.get('SARVAM_API_KEY')
-        if not api_key:
-            st.warning("Sarvam API key not found. Please set SARVAM_API_KEY in environment variables.")
-            return documentation
-
-        url = "https://api.sarvam.ai/translate"
-        payload = {
-            "input": documentation,
-            "source_language_code": "en-IN",
-            "target_language_code": target_language_code
-        }
-        
-        headers = {
-            "Content-Type": "application/json",
-            "api-subscription-key": api_key
-        }
-        
-        response = requests.post(url, json=payload, headers=headers)
-        
-        if response.status_code == 200:
-            result = response.json()
-            return result.get("translated_text", documentation)
-        else:
-            st.error(f"Translation failed: {response.text}")
-            return f"[Translation to {target_language_code} failed - showing English version]\n\n{documentation}"
+        return translation.translate_markdown(documentation, target_language_code)
+    except translation.TranslationUnavailable as e:
+        st.warning(str(e))
+        return documentation
     except Exception as e:
-
         st.error(f"Translation error: {str(e)}")
-        return f"[Translation error: {str(e)}]\n\n{documentation}"
+        return f"[Translation to {target_language_code} failed - showing English version]\n\n{documentation}"
 
-def text_to_speech(text, language_code, speaker="meera"):
+def text_to_speech(text, language_code, speaker=speech.DEFAULT_SPEAKER, on_first_segment=None):
     """
     Convert text to speech using Sarvam API
     
+    The whole text is spoken: it is split at sentence ends, the chunks are
+    synthesized in parallel and their WAV audio is joined. Recordings are cached
+    on disk by content, so an overview is synthesized once for all users.
+    
     Args:
         text (str): Text to convert to speech
         language_code (str): Target language code
         speaker (str): Speaker voice to use
+        on_first_segment (callable): Called with the first chunk's WAV bytes as soon as
+            it is ready, so playback can start while the rest is synthesized
         
     Returns:
-        bytes: Audio data in base64 encoded format or None if error
+        str: Path of the WAV file in the speech cache, or None if error
     """
     try:
-        api_key = os.environ.get('SARVAM_API_KEY')
-        if not api_key:
-            st.warning("Sarvam API key not found. Please set SARVAM_API_KEY in environment variables.")
-            return None
-
-        if not text or text.strip() == "":
-            st.warning("No text to convert to speech")
-            return None
-
-        text_to_speak = text[:1000]
-
-        url = "https://api.sarvam.ai/text-to-speech"
-        payload = {
-            "inputs": [text_to_speak],  
-            "target_language_code": language_code,
-            "speaker": "meera",
-            "pitch": 1.0,
-            "pace": 1.0,
-            "loudness": 1.0,
-            "speech_sample_rate": 16000,
-            "enable_preprocessing": True,
-            "model": "bulbul:v1"
-        }
-        
-        headers = {
-            "Content-Type": "application/json",
-            "api-subscription-key": api_key
-        }
-        
-        response = requests.post(url, json=payload, headers=headers)
-        
-        if response.status_code == 200:
-            result = response.json()
-            return result.get("audios", [None])[0]
-        else:
-            st.error(f"Text-to-speech failed: {response.text}")
-            return None
+        return speech.text_to_speech(text, language_code, speaker, on_first_segment=on_first_segment)
+    except speech.SpeechUnavailable as e:
+        st.warning(str(e))
+        return None
     except Exception as e:
         st.error(f"Text-to-speech error: {str(e)}")
         return None
     
     
-def get_audio_player_html(audio_data):
-    """Generate HTML for audio player with base64 encoded audio data"""
-    audio_html = f"""
-        <audio controls autoplay="false">
-            <source src="data:audio/wav;base64,{audio_data}" type="audio/wav">
-            Your browser does not support the audio element.
-        </audio>
-    """
-    return audio_html
-
 def extract_overview_content(documentation_text):
     """
     Extract the content under the Overview heading, and only that content.
@@ -177,12 +133,13 @@ def repo_structure_page():
     """Page to display repository structure with integrated AI analysis"""
     username = st.session_state.username
     repo_name = st.session_state.repo_name
+    lang = st.session_state.get("language", i18n.SOURCE_LANGUAGE)
     
     if st.session_state.get('view_file', False):
         file_view_page()
         return
     
-    if st.button("⬅ Back to Search", key="back_button"):
+    if st.button(f"⬅ {i18n.ui_text('Back to Search', lang)}", key="back_button"):
         st.session_state.page = "main"
         st.rerun()
     
@@ -198,79 +155,41 @@ def repo_structure_page():
         st.session_state.repo_documentation = None
     if 'overview_text' not in st.session_state:
         st.session_state.overview_text = None
-    if 'audio_cache' not in st.session_state:
-        st.session_state.audio_cache = {}
 
-    st.markdown("## Repository Documentation")
-    
-    if st.session_state.repo_documentation is None:
-        with st.spinner("Generating documentation..."):
-            try:
-                english_documentation = get_documentation(username, repo_name)
-                st.session_state.repo_documentation = english_documentation
-                
-                st.session_state.overview_text = extract_overview_content(english_documentation)
-            except Exception as e:
-                st.error(f"Error generating documentation: {str(e)}")
-                st.session_state.repo_documentation = "Documentation unavailable due to an error."
-                st.session_state.overview_text = "Documentation unavailable due to an error."
+    st.markdown(f"## {i18n.ui_text('Repository Documentation', lang)}")
     
-    documentation_text = st.session_state.repo_documentation
-    overview_text = st.session_state.overview_text
+    # Documentation comes from an LLM and can take a while, so it is generated in the
+    # background while the repository info and tree, fetched concurrently, render
+    # below; until it is ready this container holds a polling progress fragment
+    documentation_container = st.container()
     
-    st.markdown(documentation_text)
+    if st.session_state.repo_documentation is None:
+        loader = st.session_state.get('documentation_loader')
+        if loader is None or loader["repo"] != f"{username}/{repo_name}":
+            st.session_state.documentation_loader = start_documentation_loader(username, repo_name)
     
-    cache_key = f"overview_{hash(overview_text[:500])}"
-    
-    col1, col2 = st.columns([1, 5])
-    with col1:
-        if st.button("🔊 Listen", key="tts_button"):
-            with st.spinner("Generating audio..."):
-                if cache_key in st.session_state.audio_cache:
-                    audio_data = st.session_state.audio_cache[cache_key]
-                else:
-                    audio_data = text_to_speech(
-                        overview_text,
-                        language_code="en-IN",
-                        speaker="sonia"
-                    )
-                    
-                    if audio_data:
-                        st.session_state.audio_cache[cache_key] = audio_data
-                
-                if audio_data:
-                    st.session_state.current_audio = audio_data
-                    st.rerun()
-    
-    if 'current_audio' in st.session_state and st.session_state.current_audio:
-        st.markdown("### Audio Overview")
-        st.markdown(get_audio_player_html(st.session_state.current_audio), unsafe_allow_html=True)
-        if st.button("❌ Close Audio"):
-            del st.session_state.current_audio
-            st.rerun()
+    prefetch_repository(username, repo_name)
     
     if 'groq_history' not in st.session_state:
         st.session_state.groq_history = []
     
-    st.markdown("## Repository Information")
-    with st.spinner("Loading repository info..."):
+    st.markdown(f"## {i18n.ui_text('Repository Information', lang)}")
+    with st.spinner(i18n.ui_text("Loading repository info...", lang)):
         try:
-            response = requests.get(f"https://api.github.com/repos/{username}/{repo_name}")
-            if response.status_code == 200:
-                repo_info = response.json()
-                
+            repo_info = get_repo_info(username, repo_name)
+            if repo_info:
                 col1, col2, col3 = st.columns(3)
                 with col1:
-                    st.metric("Stars", repo_info.get("stargazers_count", 0))
+                    st.metric(i18n.ui_text("Stars", lang), repo_info.get("stargazers_count", 0))
                 with col2:
-                    st.metric("Forks", repo_info.get("forks_count", 0))
+                    st.metric(i18n.ui_text("Forks", lang), repo_info.get("forks_count", 0))
                 with col3:
-                    st.metric("Watchers", repo_info.get("watchers_count", 0))
+                    st.metric(i18n.ui_text("Watchers", lang), repo_info.get("watchers_count", 0))
                 
-                st.markdown("#### Description")
+                st.markdown(f"#### {i18n.ui_text('Description', lang)}")
                 st.write(repo_info.get("description", "No description provided"))
                 
-                st.markdown("#### Repository Details")
+                st.markdown(f"#### {i18n.ui_text('Repository Details', lang)}")
                 st.write(f"*Language:* {repo_info.get('language', 'Not specified')}")
                 st.write(f"*Created:* {repo_info.get('created_at', '').split('T')[0]}")
                 st.write(f"*Last Updated:* {repo_info.get('updated_at', '').split('T')[0]}")
@@ -283,25 +202,149 @@ def repo_structure_page():
             st.error(f"Error: {str(e)}")
     
     
-    st.markdown("## Ask AI About This Repository")
+    repository_chat_panel(username, repo_name)
+    
+    directory_explorer_panel(username, repo_name)
+    
+    with documentation_container:
+        documentation_section(username, repo_name)
+
+def start_documentation_loader(username, repo_name):
+    """
+    Start generating a repository's documentation in the background
+    
+    Returns:
+        dict: The repository, the Future of the documentation and its latest progress
+    """
+    progress = {"stage": "Queued", "percent": 0}
+    
+    def on_progress(stage, percent):
+        progress.update(stage=stage or progress["stage"], percent=percent)
+    
+    future = DOCUMENTATION_LOADER.submit(get_documentation, username, repo_name, on_progress=on_progress)
+    return {"repo": f"{username}/{repo_name}", "future": future, "progress": progress}
+
+@st.fragment(run_every=1.0)
+def documentation_progress():
+    """
+    Progress of the background documentation generation
+
+    Polled as a fragment so the page's full run finishes without waiting for the
+    generation; once the documentation is ready the whole page is rerun to show it.
+    """
+    loader = st.session_state.documentation_loader
+    future = loader["future"]
+    
+    if not future.done():
+        progress = loader["progress"]
+        lang = st.session_state.get("language", i18n.SOURCE_LANGUAGE)
+        st.progress(min(int(progress["percent"]), 100),
+                    text=f"{i18n.ui_text('Generating documentation...', lang)} {progress['stage']}")
+        return
+    
+    try:
+        english_documentation = future.result()
+        st.session_state.repo_documentation = english_documentation
+        st.session_state.overview_text = extract_overview_content(english_documentation)
+    except Exception as e:
+        st.session_state.repo_documentation = f"Documentation unavailable due to an error: {str(e)}"
+        st.session_state.overview_text = "Documentation unavailable due to an error."
+    del st.session_state.documentation_loader
+    st.rerun()
+
+def documentation_section(username, repo_name):
+    """Documentation, its translations and audio overview, or the generation's progress while it runs"""
+    lang = st.session_state.get("language", i18n.SOURCE_LANGUAGE)
+    if st.session_state.repo_documentation is None:
+        documentation_progress()
+        return
+    
+    documentation_text = st.session_state.repo_documentation
+    overview_text = st.session_state.overview_text
+    
+    languages = i18n.SUPPORTED_LANGUAGES
+    documentation_language = st.selectbox(
+        i18n.ui_text("Documentation language", lang),
+        options=list(languages.keys()),
+        key="documentation_language"
+    )
+    language_code = languages[documentation_language]
+    
+    if language_code != i18n.SOURCE_LANGUAGE:
+        if 'translated_documentation' not in st.session_state:
+            st.session_state.translated_documentation = {}
+        translation_key = (language_code, hash(documentation_text))
+        if translation_key not in st.session_state.translated_documentation:
+            with st.spinner(f"Translating documentation to {documentation_language}..."):
+                st.session_state.translated_documentation[translation_key] = translate_documentation(
+                    documentation_text, language_code
+                )
+        st.markdown(st.session_state.translated_documentation[translation_key])
+    else:
+        st.markdown(documentation_text)
+    
+    col1, col2 = st.columns([1, 5])
+    with col1:
+        listen = st.button(f"🔊 {i18n.ui_text('Listen', lang)}", key="tts_button")
+    
+    if listen:
+        first_part = st.empty()
+        
+        def play_first_part(segment):
+            with first_part.container():
+                st.caption(i18n.ui_text("Beginning of the overview; the full recording appears below once it is ready", lang))
+                st.audio(segment, format="audio/wav", autoplay=True)
+        
+        with st.spinner(i18n.ui_text("Generating audio...", lang)):
+            audio_data = text_to_speech(
+                overview_text,
+                language_code="en-IN",
+                on_first_segment=play_first_part
+            )
+        
+        if audio_data:
+            st.session_state.current_audio = audio_data
+    
+    # The session keeps only the path of the cached recording. st.audio serves it from a
+    # content-addressed /media URL (with ETag and range support), so reruns send the URL,
+    # not the audio
+    if st.session_state.get('current_audio') and not os.path.exists(st.session_state.current_audio):
+        del st.session_state.current_audio
+    
+    if 'current_audio' in st.session_state and st.session_state.current_audio:
+        st.markdown(f"### {i18n.ui_text('Audio Overview', lang)}")
+        st.audio(st.session_state.current_audio, format="audio/wav")
+        if st.button(f"❌ {i18n.ui_text('Close Audio', lang)}", key="close_audio"):
+            del st.session_state.current_audio
+            st.rerun()
+    
+
+@st.fragment
+def repository_chat_panel(username, repo_name):
+    """AI questions about the repository; submitting one only re-renders this panel"""
+    lang = st.session_state.get("language", i18n.SOURCE_LANGUAGE)
+    st.markdown(f"## {i18n.ui_text('Ask AI About This Repository', lang)}")
     st.markdown('<div class="search-container">', unsafe_allow_html=True)
     
    
     query = st.text_area(
-        "Ask about the repository structure, purpose, or potential improvements",
+        i18n.ui_text("Ask about the repository structure, purpose, or potential improvements", lang),
         height=100,
-        help="Example: 'What is the main purpose of this repository?' or 'How could I improve the structure?'"
+        help=i18n.ui_text(
+            "Example: 'What is the main purpose of this repository?' or 'How could I improve the structure?'", lang
+        ),
+        key="repository_query"
     )
     
-    if st.button("Submit Repository Query"):
+    if st.button(i18n.ui_text("Submit Repository Query", lang), key="submit_repository_query"):
         if not query.strip():
-            st.warning("Please enter a query before submitting.")
+            st.warning(i18n.ui_text("Please enter a query before submitting.", lang))
         else:
-            with st.spinner("Processing your query with AI..."):
+            with st.spinner(i18n.ui_text("Processing your query with AI...", lang)):
                 try:
                     
-                    response = requests.post(
-                        urljoin(BACKEND_URL, "query-repository/"),
+                    response = resilience.request(
+                        'backend', 'POST', urljoin(BACKEND_URL, "query-repository/"),
                         json={
                             "username": username,
                             "repo_name": repo_name,
@@ -318,7 +361,7 @@ def repo_structure_page():
                             "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
                         })
                         
-                        st.rerun()
+                        st.rerun(scope="fragment")
                     else:
                         st.error(f"Error: {response.text}")
                 except Exception as e:
@@ -327,7 +370,7 @@ def repo_structure_page():
     st.markdown('</div>', unsafe_allow_html=True)
     
     if st.session_state.groq_history:
-        st.markdown("### AI Analysis Results")
+        st.markdown(f"### {i18n.ui_text('AI Analysis Results', lang)}")
         
         for i, item in enumerate(st.session_state.groq_history):
             st.markdown(f'<div class="chat-message user">'
@@ -340,24 +383,32 @@ def repo_structure_page():
                       f'<div class="message">{item["response"]}</div>'
                       f'</div>', unsafe_allow_html=True)
         
-        if st.button("Clear History"):
+        if st.button(i18n.ui_text("Clear History", lang), key="clear_repository_history"):
             st.session_state.groq_history = []
-            st.rerun()
-    
-    
-    st.markdown("## Repository Structure")
+            st.rerun(scope="fragment")
+
+@st.fragment
+def directory_explorer_panel(username, repo_name):
+    """Directory explorer; expanding folders only re-renders the explorer"""
+    lang = st.session_state.get("language", i18n.SOURCE_LANGUAGE)
+    st.markdown(f"## {i18n.ui_text('Repository Structure', lang)}")
+    
+    # Repository data is cached across sessions; this fetches it again from GitHub
+    if st.button(f"🔄 {i18n.ui_text('Refresh repository data', lang)}", key="refresh_repository",
+                 help=i18n.ui_text("Fetch the latest structure and files from GitHub", lang)):
+        invalidate_repository_cache(username, repo_name)
+        for key in list(st.session_state.keys()):
+            if key.startswith('folder_'):
+                del st.session_state[key]
+        st.rerun()
     
     st.markdown('<div class="directory-structure">', unsafe_allow_html=True)
-    st.markdown('<div class="structure-header">Directory Structure Explorer</div>', unsafe_allow_html=True)
-    
+    st.markdown(f'<div class="structure-header">{i18n.ui_text("Directory Structure Explorer", lang)}</div>',
+                unsafe_allow_html=True)
     
-    if 'top_level_structure' not in st.session_state:
-        st.session_state.top_level_structure = get_repo_structure(username, repo_name)
     
-    if st.session_state.top_level_structure:
-        render_interactive_directory_structure(st.session_state.top_level_structure)
-    else:
-        st.warning("No files found in this repository or access denied.")
+    if render_interactive_directory_structure(username, repo_name) is None:
+        st.warning(i18n.ui_text("No files found in this repository or access denied.", lang))
         
     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -366,9 +417,10 @@ def file_view_page():
     username = st.session_state.username
     repo_name = st.session_state.repo_name
     file_path = st.session_state.file_path
+    lang = st.session_state.get("language", i18n.SOURCE_LANGUAGE)
     
    
-    if st.button("⬅ Back to Repository Structure", key="back_to_structure"):
+    if st.button(f"⬅ {i18n.ui_text('Back to Repository Structure', lang)}", key="back_to_structure"):
         st.session_state.view_file = False
         st.rerun()
     
@@ -387,31 +439,38 @@ def file_view_page():
     
     file_extension = filename.split('.')[-1].lower() if '.' in filename else 'txt'
     st.download_button(
-        label="Download File",
+        label=i18n.ui_text("Download File", lang),
         data=content,
         file_name=filename,
         mime=f"text/{file_extension}"
     )
     
-    st.markdown("## Ask AI About This Code")
+    code_chat_panel(username, repo_name, file_path)
+
+@st.fragment
+def code_chat_panel(username, repo_name, file_path):
+    """AI questions about the open file; submitting one only re-renders this panel"""
+    lang = st.session_state.get("language", i18n.SOURCE_LANGUAGE)
+    st.markdown(f"## {i18n.ui_text('Ask AI About This Code', lang)}")
     st.markdown('<div class="search-container">', unsafe_allow_html=True)
     
     code_query = st.text_area(
-        "Ask about this code file",
+        i18n.ui_text("Ask about this code file", lang),
         height=100,
-        help="Example: 'Explain what this code does' or 'How can I optimize this code?'"
+        help=i18n.ui_text("Example: 'Explain what this code does' or 'How can I optimize this code?'", lang),
+        key="code_query"
     )
     
-    if st.button("Submit Code Query"):
+    if st.button(i18n.ui_text("Submit Code Query", lang), key="submit_code_query"):
         if not code_query.strip():
-            st.warning("Please enter a query before submitting.")
+            st.warning(i18n.ui_text("Please enter a query before submitting.", lang))
         else:
-            with st.spinner("Processing your query with AI..."):
+            with st.spinner(i18n.ui_text("Processing your query with AI...", lang)):
                 try:
                     file_url = f"https://raw.githubusercontent.com/{username}/{repo_name}/master/{file_path}"
                     
-                    response = requests.post(
-                        urljoin(BACKEND_URL, "query-code/"),
+                    response = resilience.request(
+                        'backend', 'POST', urljoin(BACKEND_URL, "query-code/"),
                         json={
                             "file_url": file_url,
                             "query": code_query
@@ -427,7 +486,7 @@ def file_view_page():
                             "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
                         })
                         
-                        st.rerun()
+                        st.rerun(scope="fragment")
                     else:
                         st.error(f"Error: {response.text}")
                 except Exception as e:
@@ -437,7 +496,7 @@ def file_view_page():
     
     # History
     if st.session_state.code_analysis_history:
-        st.markdown("### Code Analysis Results")
+        st.markdown(f"### {i18n.ui_text('Code Analysis Results', lang)}")
         
         for i, item in enumerate(st.session_state.code_analysis_history):
             # User query
@@ -452,6 +511,6 @@ def file_view_page():
                       f'<div class="message">{item["response"]}</div>'
                       f'</div>', unsafe_allow_html=True)
         
-        if st.button("Clear Code Analysis History"):
+        if st.button(i18n.ui_text("Clear Code Analysis History", lang), key="clear_code_history"):
             st.session_state.code_analysis_history = []
-            st.rerun()
\ No newline at end of file
+            st.rerun(scope="fragment")
@@ -0,0 +1,71 @@
+from urllib.parse import quote
+
+
+class RepoTree:
+    """
+    Index of every file and directory of a repository at one ref
+
+    Built once from the backend's recursive tree listing and shared, read-only,
+    by every page and session showing the repository. Directory listings, paging
+    and name filtering are answered from the index without further requests.
+    """
+
+    def __init__(self, username, repo_name, ref, entries, truncated=False):
+        self.username = username
+        self.repo_name = repo_name
+        self.ref = ref
+        self.truncated = truncated
+        # path -> (type, size), and directory path -> names of its entries in listing order
+        self.nodes = {}
+        self.children = {"": []}
+        for path, kind, size in entries:
+            self.nodes[path] = (kind, size)
+            parent, _, name = path.rpartition("/")
+            self.children.setdefault(parent, []).append(name)
+            if kind == "dir":
+                self.children.setdefault(path, [])
+
+    @classmethod
+    def from_response(cls, username, repo_name, data):
+        return cls(username, repo_name, data["ref"], data["entries"], data.get("truncated", False))
+
+    def __contains__(self, path):
+        return path in self.nodes
+
+    def is_dir(self, path):
+        return path == "" or self.nodes.get(path, (None,))[0] == "dir"
+
+    def list_directory(self, path="", offset=0, limit=None, query=""):
+        """
+        One page of a directory, in the shape the backend's repo-structure endpoint returns
+
+        Args:
+            path (str): Directory path, "" for the root
+            offset (int): Entries to skip
+            limit (int): Most entries to return; all when None
+            query (str): Keep only entries whose name contains it (case-insensitive)
+
+        Returns:
+            dict: `structure` (entries with name, path and type), `total` and `has_more`
+        """
+        names = self.children.get(path, [])
+        if query:
+            query = query.lower()
+            names = [name for name in names if query in name.lower()]
+        total = len(names)
+        page = names[offset:offset + limit] if limit is not None else names[offset:]
+
+        structure = []
+        for name in page:
+            item_path = f"{path}/{name}" if path else name
+            structure.append({"name": name, "path": item_path, "type": self.nodes[item_path][0]})
+        return {"structure": structure, "total": total, "offset": offset, "has_more": offset + len(page) < total}
+
+    def files(self):
+        """Paths of all files, in listing order"""
+        return [path for path, (kind, _) in self.nodes.items() if kind == "file"]
+
+    def raw_url(self, path):
+        """URL of a file's raw content at this tree's ref"""
+        return (f"https://raw.githubusercontent.com/{self.username}/{self.repo_name}/"
+                f"{quote(self.ref)}/{quote(path)}")
@@ -0,0 +1,351 @@
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Keep in sync with backend/github_app/resilience.py. The frontend and the backend are
+# deployed separately and share no package, so the Bulkhead and CircuitBreaker classes,
+# backoff_delay, parse_retry_after and the retry loop of request() exist in both; a fix
+# to one belongs in the other. They differ only in where the policies come from
+# (environment variables here, Django settings there), this module's pooled sessions,
+# and the exception base class (a requests ConnectionError here, so page handlers
+# catching requests exceptions keep working).
+
+# Per-upstream policies; timeout is a requests (connect, read) timeout in seconds.
+# The backend runs on a host that sleeps when idle, so its first requests may see 502/503.
+UPSTREAMS = {
+    'backend': {'timeout': (10, 120), 'retries': 2, 'max_concurrent': 16, 'max_queue': 32},
+    'github': {'timeout': (5, 20), 'retries': 3, 'max_concurrent': 8},
+    'sarvam': {'timeout': (5, 60), 'retries': 2, 'max_concurrent': int(os.getenv('SARVAM_MAX_CONCURRENCY', '4')),
+               'queue_timeout': 15.0},
+    'assets': {'timeout': (5, 10), 'retries': 1, 'max_concurrent': 4},
+}
+
+DEFAULT_POLICY = {
+    'timeout': (5, 30),
+    'retries': int(os.getenv('UPSTREAM_RETRIES', '2')),
+    'backoff_base': 0.5,
+    'backoff_max': float(os.getenv('UPSTREAM_BACKOFF_MAX', '8')),
+    # A Retry-After longer than this is not waited for; the response is returned as is
+    'max_retry_after': 10.0,
+    'failure_threshold': int(os.getenv('UPSTREAM_FAILURE_THRESHOLD', '5')),
+    'reset_timeout': float(os.getenv('UPSTREAM_RESET_TIMEOUT', '30')),
+    # Bulkhead: calls in flight at once, calls allowed to wait for a slot, and how long they wait
+    'max_concurrent': 8,
+    'max_queue': 16,
+    'queue_timeout': 5.0,
+}
+
+# A plain 500 can be a bug rather than a transient fault, so it is only retried for idempotent requests
+RETRY_STATUSES = {429, 502, 503, 504}
+IDEMPOTENT_RETRY_STATUSES = RETRY_STATUSES | {500}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+
+class UpstreamUnavailable(requests.exceptions.ConnectionError):
+    """Raised when an upstream cannot be reached or its circuit breaker is open"""
+
+    def __init__(self, upstream, message=None, retry_after=None):
+        super().__init__(message or f"{upstream} is temporarily unavailable, please try again shortly")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class UpstreamSaturated(UpstreamUnavailable):
+    """Raised when too many calls to an upstream are already in flight or waiting"""
+
+    def __init__(self, upstream):
+        super().__init__(upstream, f"{upstream} is busy with other requests, please try again shortly")
+
+
+class Bulkhead:
+    """
+    Bounds the number of concurrent calls to one upstream, across all sessions
+
+    Calls beyond `max_concurrent` wait up to `queue_timeout` seconds for a slot;
+    once `max_queue` calls are already waiting, further calls are refused at once.
+    """
+
+    def __init__(self, name, max_concurrent, max_queue, queue_timeout):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self.semaphore = threading.BoundedSemaphore(max_concurrent)
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        acquired = self.semaphore.acquire(blocking=False)
+        if not acquired:
+            with self.lock:
+                if self.waiting >= self.max_queue:
+                    return False
+                self.waiting += 1
+            try:
+                acquired = self.semaphore.acquire(timeout=self.queue_timeout)
+            finally:
+                with self.lock:
+                    self.waiting -= 1
+        if acquired:
+            with self.lock:
+                self.in_flight += 1
+        return acquired
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+        self.semaphore.release()
+
+
+class CircuitBreaker:
+    """
+    Fails fast while an upstream is down
+
+    Opens after `failure_threshold` consecutive failures, refuses calls for
+    `reset_timeout` seconds, then lets one trial call through to decide whether to close.
+    """
+
+    def __init__(self, name, failure_threshold, reset_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self.lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        with self.lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def retry_after(self):
+        with self.lock:
+            if self.opened_at is None:
+                return 0
+            return max(0, round(self.reset_timeout - (time.monotonic() - self.opened_at)))
+
+    def record_success(self):
+        with self.lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.consecutive_failures += 1
+            if self.trial_in_flight or self.consecutive_failures >= self.failure_threshold:
+                if self.opened_at is None or self._state() == 'half_open':
+                    logger.warning("circuit breaker for %s opened after %d failures",
+                                   self.name, self.consecutive_failures)
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+
+# Shared by every Streamlit session in this server process
+_lock = threading.Lock()
+_breakers = {}
+_bulkheads = {}
+_sessions = {}
+_stats = {}
+
+
+def get_upstream_config(upstream):
+    return {**DEFAULT_POLICY, **UPSTREAMS.get(upstream, {})}
+
+
+def get_breaker(upstream):
+    with _lock:
+        breaker = _breakers.get(upstream)
+        if breaker is None:
+            config = get_upstream_config(upstream)
+            breaker = CircuitBreaker(upstream, config['failure_threshold'], config['reset_timeout'])
+            _breakers[upstream] = breaker
+        return breaker
+
+
+def get_bulkhead(upstream):
+    with _lock:
+        compartment = _bulkheads.get(upstream)
+        if compartment is None:
+            config = get_upstream_config(upstream)
+            compartment = Bulkhead(upstream, config['max_concurrent'], config['max_queue'], config['queue_timeout'])
+            _bulkheads[upstream] = compartment
+        return compartment
+
+
+def get_session(upstream):
+    """
+    Pooled HTTP session of an upstream, kept for the life of the server process
+
+    Connections are kept alive and reused across requests and Streamlit sessions, so
+    only the first request to a host pays for the TCP and TLS handshakes. Each host
+    gets a pool as large as the upstream's bulkhead, which bounds how many requests
+    use it at once. Retries are left to request(), and cookies are never stored, as
+    the session is shared between users.
+    """
+    with _lock:
+        session = _sessions.get(upstream)
+        if session is None:
+            config = get_upstream_config(upstream)
+            session = requests.Session()
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            adapter = HTTPAdapter(pool_maxsize=config['max_concurrent'], max_retries=0)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sessions[upstream] = session
+        return session
+
+
+@contextmanager
+def bulkhead(upstream):
+    """Hold one of the upstream's concurrency slots, raising UpstreamSaturated if none frees up in time"""
+    compartment = get_bulkhead(upstream)
+    if not compartment.acquire():
+        _count(upstream, 'saturated')
+        raise UpstreamSaturated(upstream)
+    try:
+        yield
+    finally:
+        compartment.release()
+
+
+def _count(upstream, name):
+    with _lock:
+        stats = _stats.setdefault(upstream, {'attempts': 0, 'retries': 0, 'failures': 0, 'rejected': 0, 'saturated': 0})
+        stats[name] += 1
+
+
+def backoff_delay(attempt, config):
+    """Capped exponential backoff with full jitter"""
+    return random.uniform(0, min(config['backoff_max'], config['backoff_base'] * (2 ** attempt)))
+
+
+def parse_retry_after(response):
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def request(upstream, method, url, **kwargs):
+    """
+    Make an HTTP request with the upstream's pooled session, timeout, retries, circuit breaker and bulkhead
+
+    Connection errors, 429 and 502-504 responses (and 500 and read timeouts for
+    idempotent requests) are retried with capped exponential backoff and jitter,
+    honouring Retry-After. When retries run out the last response is returned.
+
+    Args:
+        upstream (str): One of UPSTREAMS
+        method (str): HTTP method
+        url (str): Request URL
+        **kwargs: Passed on to Session.request; `timeout` overrides the upstream's
+
+    Returns:
+        requests.Response: The final response
+
+    Raises:
+        UpstreamUnavailable: If the breaker is open, the upstream could not be reached or
+            its bulkhead is full (UpstreamSaturated). It is a requests ConnectionError,
+            so existing handlers keep working.
+    """
+    config = get_upstream_config(upstream)
+    kwargs.setdefault('timeout', config['timeout'])
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+    retry_statuses = IDEMPOTENT_RETRY_STATUSES if idempotent else RETRY_STATUSES
+    breaker = get_breaker(upstream)
+    session = get_session(upstream)
+
+    for attempt in range(config['retries'] + 1):
+        last_attempt = attempt == config['retries']
+
+        # The slot is only held while the request is in flight, not during backoff
+        with bulkhead(upstream):
+            _count(upstream, 'attempts')
+            if not breaker.allow():
+                _count(upstream, 'rejected')
+                raise UpstreamUnavailable(upstream, retry_after=breaker.retry_after())
+
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                _count(upstream, 'failures')
+                breaker.record_failure()
+                # A read timeout on a POST may mean the request was carried out
+                retryable = isinstance(e, requests.exceptions.ConnectionError) or idempotent
+                if last_attempt or not retryable:
+                    raise UpstreamUnavailable(upstream, f"{upstream} could not be reached: {e}") from e
+                delay = backoff_delay(attempt, config)
+            except requests.exceptions.RequestException:
+                breaker.record_success()
+                raise
+            else:
+                if response.status_code not in retry_statuses:
+                    breaker.record_success()
+                    return response
+
+                _count(upstream, 'failures')
+                breaker.record_failure()
+                retry_after = parse_retry_after(response)
+                if last_attempt or (retry_after is not None and retry_after > config['max_retry_after']):
+                    return response
+                delay = retry_after if retry_after is not None else backoff_delay(attempt, config)
+
+        _count(upstream, 'retries')
+        time.sleep(delay)
+
+
+def get_upstream_metrics():
+    """Per-upstream attempt, retry and failure counts, breaker states and bulkhead usage for this server process"""
+    with _lock:
+        stats = {upstream: dict(counts) for upstream, counts in _stats.items()}
+        breakers = dict(_breakers)
+        bulkheads = dict(_bulkheads)
+
+    empty = {'attempts': 0, 'retries': 0, 'failures': 0, 'rejected': 0, 'saturated': 0}
+    for upstream, breaker in breakers.items():
+        entry = stats.setdefault(upstream, dict(empty))
+        entry['state'] = breaker.state
+        entry['consecutive_failures'] = breaker.consecutive_failures
+    for upstream, compartment in bulkheads.items():
+        entry = stats.setdefault(upstream, dict(empty))
+        with compartment.lock:
+            entry['in_flight'] = compartment.in_flight
+            entry['waiting'] = compartment.waiting
+    return stats
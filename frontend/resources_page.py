@@ -1,15 +1,125 @@
 import streamlit as st
-import requests
+import i18n
+import resilience
+import json
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
-from utils import BACKEND_URL
+from utils import BACKEND_URL, get_repo_info
+
+# Canned searches prefetched for every repository (the backend's RESOURCE_SEARCH_TEMPLATES)
+PREFETCHED_SEARCH_TYPES = ["Tutorials", "Documentation", "Examples"]
+PREFETCH_MAX_ATTEMPTS = int(os.getenv("RESOURCE_PREFETCH_MAX_ATTEMPTS", "3"))
+
+# Prefetches run here, in the background, so the page renders without waiting on them
+PREFETCH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("RESOURCE_PREFETCH_WORKERS", "4")),
+    thread_name_prefix="resource-prefetch"
+)
+
+def render_search_result(container, result):
+    """Render a formatted search summary and its raw results into a container"""
+    lang = st.session_state.get("language", i18n.SOURCE_LANGUAGE)
+    with container.container():
+        st.markdown(result["response"])
+        
+        with st.expander(i18n.ui_text("View Raw Search Results", lang)):
+            for raw_result in result.get("raw_results", []):
+                st.markdown(
+                    f'''<div class="search-result">
+                        <div class="search-result-title">{raw_result.get("title", "No title")}</div>
+                        <div class="search-result-link">{raw_result.get("link", "#")}</div>
+                        <div class="search-result-snippet">{raw_result.get("snippet", "No description available")}</div>
+                    </div>''',
+                    unsafe_allow_html=True
+                )
+
+def prefetch_resource_searches(username, repo_name, language, on_result=None):
+    """
+    Run every canned search type for a repository on the backend in parallel
+    
+    Results are streamed back as each search completes, so `on_result` is called
+    with each result as soon as it is ready.
+    
+    Returns:
+        dict: Search type to result
+    """
+    results = {}
+    response = resilience.request(
+        'backend', 'POST', urljoin(BACKEND_URL, "google-search/prefetch/"),
+        json={"username": username, "repo_name": repo_name, "language": language},
+        stream=True,
+        timeout=120
+    )
+    if response.status_code != 200:
+        raise Exception(response.text)
+    
+    for line in response.iter_lines():
+        if not line:
+            continue
+        item = json.loads(line)
+        if item.get("type") != "result":
+            continue
+        results[item["search_type"]] = item
+        if on_result:
+            on_result(item)
+    return results
+
+def start_resource_prefetch(prefetch, username, repo_name, language):
+    """Run (or retry) the canned searches in the background, recording each result as it arrives"""
+    def record(item):
+        if "error" not in item:
+            prefetch["results"][item["search_type"]] = item
+    
+    prefetch["attempts"] += 1
+    prefetch["retry_at"] = None
+    prefetch["future"] = PREFETCH_EXECUTOR.submit(
+        prefetch_resource_searches, username, repo_name, language, on_result=record
+    )
+
+def resource_prefetch_pending(prefetch):
+    """Whether the prefetch is still running, or has failed search types left to retry"""
+    if not prefetch["future"].done():
+        return True
+    missing = [search_type for search_type in PREFETCHED_SEARCH_TYPES if search_type not in prefetch["results"]]
+    return bool(missing) and prefetch["attempts"] < PREFETCH_MAX_ATTEMPTS
+
+@st.fragment(run_every=1.0)
+def resource_prefetch_status(username, repo_name, language, waiting_for):
+    """
+    Progress of the background prefetch, polled without blocking the page
+    
+    The page is rerun when the result the user is looking at (`waiting_for`) comes in,
+    and once the prefetch is over. Failed search types are retried with exponential
+    backoff; results that succeeded are served from the backend's cache on a retry.
+    """
+    prefetch = st.session_state.resource_prefetch
+    if waiting_for and waiting_for in prefetch["results"]:
+        st.rerun()
+    
+    lang = st.session_state.get("language", i18n.SOURCE_LANGUAGE)
+    if not prefetch["future"].done():
+        st.caption(i18n.ui_text("Preparing tutorials, documentation and examples in the background...", lang))
+        return
+    
+    if not resource_prefetch_pending(prefetch):
+        st.rerun()
+    
+    if prefetch["retry_at"] is None:
+        prefetch["retry_at"] = time.time() + 2 ** prefetch["attempts"]
+    elif time.time() >= prefetch["retry_at"]:
+        start_resource_prefetch(prefetch, username, repo_name, language)
+    st.caption(i18n.ui_text("Some searches could not be prepared yet; retrying shortly...", lang))
 
 def resources_page():
     """Page for finding related resources using Google Custom Search API and Groq formatting"""
     username = st.session_state.username
     repo_name = st.session_state.repo_name
+    lang = st.session_state.get("language", i18n.SOURCE_LANGUAGE)
     
-    st.markdown('<h1 style="text-align: center;">Find Related Resources</h1>', unsafe_allow_html=True)
+    st.markdown(f'<h1 style="text-align: center;">{i18n.ui_text("Find Related Resources", lang)}</h1>',
+                unsafe_allow_html=True)
     
     # Repository header with user and repo info
     st.markdown(
@@ -30,12 +140,11 @@ def resources_page():
     # Get repository description to provide context
     try:
         if 'repo_description' not in st.session_state:
-            with st.spinner("Fetching repository information..."):
-                response = requests.get(f"https://api.github.com/repos/{username}/{repo_name}")
-                if response.status_code == 200:
-                    repo_info = response.json()
-                    st.session_state.repo_description = repo_info.get("description", "")
-                    st.session_state.repo_language = repo_info.get("language", "")
+            with st.spinner(i18n.ui_text("Fetching repository information...", lang)):
+                repo_info = get_repo_info(username, repo_name)
+                if repo_info:
+                    st.session_state.repo_description = repo_info.get("description") or ""
+                    st.session_state.repo_language = repo_info.get("language") or ""
                 else:
                     st.session_state.repo_description = ""
                     st.session_state.repo_language = ""
@@ -44,11 +153,34 @@ def resources_page():
         st.session_state.repo_description = ""
         st.session_state.repo_language = ""
     
+    # Prefetched canned searches for this repository, filled in in the background
+    repo_key = f"{username}/{repo_name}"
+    if st.session_state.get('resource_prefetch', {}).get('repo') != repo_key:
+        st.session_state.resource_prefetch = {'repo': repo_key, 'results': {}, 'future': None,
+                                              'attempts': 0, 'retry_at': None}
+        start_resource_prefetch(st.session_state.resource_prefetch, username, repo_name,
+                                st.session_state.repo_language)
+    prefetch = st.session_state.resource_prefetch
+    
+    # "prefetch" shows the selected type's prefetched result, "history" the latest button search
+    if 'resource_view' not in st.session_state:
+        st.session_state.resource_view = "prefetch"
+    
+    def show_prefetched_view():
+        st.session_state.resource_view = "prefetch"
+    
     # Search type selection
+    search_types = ["Tutorials", "Documentation", "Examples", "Custom Search"]
+    search_type_labels = dict(zip(search_types, i18n.ui_texts(
+        ["Tutorials", "Documentation", "Examples", "Custom Search"], lang
+    )))
     search_type = st.radio(
-        "Search Type",
-        ["Tutorials", "Documentation", "Examples", "Custom Search"],
-        horizontal=True
+        i18n.ui_text("Search Type", lang),
+        search_types,
+        format_func=search_type_labels.get,
+        horizontal=True,
+        on_change=show_prefetched_view,
+        key="resource_search_type"
     )
     
     # Base search query with repo context
@@ -67,21 +199,32 @@ def resources_page():
         search_context = base_query
         placeholder = "Enter your custom search query"
     
+    # The backend may have filled in details (e.g. the language) the page doesn't know,
+    # so prefer the query it actually ran
+    if search_type in prefetch["results"]:
+        search_context = prefetch["results"][search_type]["query"]
+    
     # Custom search input
-    custom_query = st.text_input(f"Search query", 
+    custom_query = st.text_input(i18n.ui_text("Search query", lang),
                                value=search_context,
                                placeholder=placeholder)
     
-    if st.button("Search for Resources"):
+    if st.button(i18n.ui_text("Search for Resources", lang), key="search_resources"):
         if not custom_query.strip():
-            st.warning("Please enter a search query before submitting.")
+            st.warning(i18n.ui_text("Please enter a search query before submitting.", lang))
         else:
-            with st.spinner("Searching for resources..."):
+            with st.spinner(i18n.ui_text("Searching for resources...", lang)):
                 try:
                     # Send query to backend
-                    response = requests.post(
-                        urljoin(BACKEND_URL, "google-search/"),
-                        json={"query": custom_query}
+                    response = resilience.request(
+                        'backend', 'POST', urljoin(BACKEND_URL, "google-search/"),
+                        json={
+                            "query": custom_query,
+                            "username": username,
+                            "repo_name": repo_name,
+                            "language": st.session_state.repo_language or "",
+                            "search_type": search_type
+                        }
                     )
                     
                     if response.status_code == 200:
@@ -94,6 +237,7 @@ def resources_page():
                             "raw_results": result.get("raw_results", []),
                             "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
                         })
+                        st.session_state.resource_view = "history"
                         
                         # Force a rerun to show the new response
                         st.rerun()
@@ -104,46 +248,54 @@ def resources_page():
     
     st.markdown('</div>', unsafe_allow_html=True)
     
-    # Display search results
-    if st.session_state.search_history:
-        st.markdown("## Search Results")
-        
-        # Show most recent search result
-        latest = st.session_state.search_history[-1]
+    results_heading = st.empty()
+    current_placeholder = st.empty()
+    
+    def prefetched_is_current():
+        return st.session_state.resource_view == "prefetch" and search_type in prefetch["results"]
+    
+    # Canned search types are shown from the prefetch once their result is in
+    if resource_prefetch_pending(prefetch):
+        waiting = st.session_state.resource_view == "prefetch" and search_type not in prefetch["results"]
+        resource_prefetch_status(username, repo_name, st.session_state.repo_language,
+                                 search_type if waiting else None)
+    
+    history = st.session_state.search_history
+    showing_prefetched = prefetched_is_current()
+    
+    # Display search results: the current result, then the searches made with the button
+    if showing_prefetched or history:
+        results_heading.markdown(f"## {i18n.ui_text('Search Results', lang)}")
         
-        # Main results - formatted by Groq
-        st.markdown(latest["response"])
+        if showing_prefetched:
+            current = prefetch["results"][search_type]
+        else:
+            current = history[-1]
         
-        # Raw results in expandable section
-        with st.expander("View Raw Search Results"):
-            for i, raw_result in enumerate(latest["raw_results"]):
-                st.markdown(
-                    f'''<div class="search-result">
-                        <div class="search-result-title">{raw_result.get("title", "No title")}</div>
-                        <div class="search-result-link">{raw_result.get("link", "#")}</div>
-                        <div class="search-result-snippet">{raw_result.get("snippet", "No description available")}</div>
-                    </div>''',
-                    unsafe_allow_html=True
-                )
+        # Main results - formatted by Groq, with the raw results in an expandable section
+        render_search_result(current_placeholder, current)
         
-        # Previous searches
-        if len(st.session_state.search_history) > 1:
-            with st.expander("Previous Searches"):
-                for i in range(len(st.session_state.search_history) - 2, -1, -1):
-                    item = st.session_state.search_history[i]
+        # Previous searches (everything but the search shown above)
+        previous = list(range(len(history))) if showing_prefetched else list(range(len(history) - 1))
+        if previous:
+            with st.expander(i18n.ui_text("Previous Searches", lang)):
+                for i in reversed(previous):
+                    item = history[i]
                     st.markdown(f"### Search: {item['query']}")
                     st.markdown(f"*{item['timestamp']}*")
-                    if st.button(f"Show Results", key=f"prev_search_{i}"):
+                    if st.button(i18n.ui_text("Show Results", lang), key=f"prev_search_{i}"):
                         # Move this item to the end of the list (make it current)
-                        st.session_state.search_history.append(st.session_state.search_history.pop(i))
+                        history.append(history.pop(i))
+                        st.session_state.resource_view = "history"
                         st.rerun()
         
-        if st.button("Clear Search History"):
+        if history and st.button(i18n.ui_text("Clear Search History", lang), key="clear_search_history"):
             st.session_state.search_history = []
+            st.session_state.resource_view = "prefetch"
             st.rerun()
     
     # About section
-    with st.expander("About Resource Search"):
+    with st.expander(i18n.ui_text("About Resource Search", lang)):
         st.markdown("""
         This feature helps you find valuable resources related to the repository by:
         
@@ -0,0 +1,294 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import resilience
+
+SARVAM_TTS_URL = "https://api.sarvam.ai/text-to-speech"
+
+# Longest text Sarvam synthesizes in one input
+MAX_CHUNK_CHARS = int(os.getenv("TTS_MAX_CHUNK_CHARS", "500"))
+MAX_WORKERS = int(os.getenv("TTS_MAX_WORKERS", "4"))
+
+SAMPLE_RATE = 16000
+DEFAULT_SPEAKER = "meera"
+MODEL = "bulbul:v1"
+
+# Synthesized audio is stored on disk by content, shared by all sessions and kept
+# across restarts; the least recently used files go once the cache outgrows its cap
+AUDIO_CACHE_DIR = os.getenv(
+    "TTS_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "tts")
+)
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+SENTENCE_END_RE = re.compile(r'(?<=[.!?।])\s+')
+MARKDOWN_LINK_RE = re.compile(r'!?\[([^\]]*)\]\([^)]*\)')
+MARKDOWN_MARKUP_RE = re.compile(r'`+|\*{1,3}|_{2,}|^#{1,6}\s+|^\s*[-*+]\s+|^\s*>\s?', re.MULTILINE)
+
+
+class SpeechUnavailable(Exception):
+    """Raised when speech cannot be synthesized"""
+
+
+_evict_lock = threading.Lock()
+
+
+def audio_cache_key(text, language_code, speaker=DEFAULT_SPEAKER, model=MODEL, sample_rate=SAMPLE_RATE):
+    """Content address of synthesized audio: a hash of everything that determines it"""
+    key_source = json.dumps({
+        "text": text,
+        "language": language_code,
+        "speaker": speaker,
+        "model": model,
+        "sample_rate": sample_rate,
+    }, sort_keys=True)
+    return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+
+def audio_cache_path(key):
+    return os.path.join(AUDIO_CACHE_DIR, f"{key}.wav")
+
+
+def get_cached_audio(key):
+    """
+    Path of cached audio, or None
+
+    A hit refreshes the file's modification time, which eviction uses as last access.
+    """
+    path = audio_cache_path(key)
+    try:
+        os.utime(path)
+    except OSError:
+        return None
+    return path
+
+
+def store_audio(key, audio):
+    """Write audio to the cache atomically and evict old files if over the size cap; returns its path"""
+    os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+    path = audio_cache_path(key)
+    fd, temp_path = tempfile.mkstemp(dir=AUDIO_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(audio)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    evict_audio_cache()
+    return path
+
+
+def evict_audio_cache(max_bytes=None):
+    """Delete the least recently used audio files until the cache is within 90% of its cap"""
+    max_bytes = AUDIO_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    with _evict_lock:
+        entries = []
+        total = 0
+        try:
+            names = os.listdir(AUDIO_CACHE_DIR)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(".wav"):
+                continue
+            try:
+                stat = os.stat(os.path.join(AUDIO_CACHE_DIR, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+
+        if total <= max_bytes:
+            return
+        for _, size, name in sorted(entries):
+            if total <= max_bytes * 0.9:
+                break
+            try:
+                os.remove(os.path.join(AUDIO_CACHE_DIR, name))
+                total -= size
+            except OSError:
+                pass
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def clean_for_speech(text):
+    """Strip markdown markup so it is not read out"""
+    text = MARKDOWN_LINK_RE.sub(r'\1', text)
+    text = MARKDOWN_MARKUP_RE.sub('', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def split_for_speech(text, max_chars=MAX_CHUNK_CHARS):
+    """
+    Split text into chunks of at most max_chars, at sentence ends where possible
+
+    A sentence longer than max_chars is split between words.
+    """
+    chunks = []
+    current = ""
+    for sentence in SENTENCE_END_RE.split(text):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+def synthesize_chunk(text, language_code, speaker=DEFAULT_SPEAKER):
+    """
+    Synthesize one chunk with the Sarvam API, through the disk cache
+
+    Returns:
+        bytes: WAV audio
+
+    Raises:
+        SpeechUnavailable: If the API key is missing or the request fails
+    """
+    key = audio_cache_key(text, language_code, speaker)
+    cached = get_cached_audio(key)
+    if cached:
+        try:
+            return _read(cached)
+        except OSError:
+            pass
+
+    api_key = os.environ.get('SARVAM_API_KEY')
+    if not api_key:
+        raise SpeechUnavailable("Sarvam API key not found. Please set SARVAM_API_KEY in environment variables.")
+
+    payload = {
+        "inputs": [text],
+        "target_language_code": language_code,
+        "speaker": speaker,
+        "pitch": 1.0,
+        "pace": 1.0,
+        "loudness": 1.0,
+        "speech_sample_rate": SAMPLE_RATE,
+        "enable_preprocessing": True,
+        "model": MODEL
+    }
+    headers = {
+        "Content-Type": "application/json",
+        "api-subscription-key": api_key
+    }
+
+    response = resilience.request('sarvam', 'POST', SARVAM_TTS_URL, json=payload, headers=headers)
+    if response.status_code != 200:
+        raise SpeechUnavailable(f"Text-to-speech failed: {response.text}")
+
+    audios = response.json().get("audios") or []
+    if not audios:
+        raise SpeechUnavailable("Text-to-speech returned no audio")
+    audio = base64.b64decode(audios[0])
+    try:
+        store_audio(key, audio)
+    except OSError:
+        pass
+    return audio
+
+
+def synthesize_stream(text, language_code, speaker=DEFAULT_SPEAKER, max_workers=MAX_WORKERS):
+    """
+    Synthesize text of any length, yielding WAV segments in order as they become ready
+
+    All chunks are submitted at once and synthesized concurrently; the first
+    segment is yielded as soon as it is done, so playback can start while the
+    rest are still being synthesized.
+
+    Yields:
+        bytes: WAV audio of each chunk, in text order
+
+    Raises:
+        SpeechUnavailable: If there is nothing to say or a chunk fails
+    """
+    chunks = split_for_speech(clean_for_speech(text))
+    if not chunks:
+        raise SpeechUnavailable("No text to convert to speech")
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+        futures = [executor.submit(synthesize_chunk, chunk, language_code, speaker) for chunk in chunks]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def concatenate_wav(segments):
+    """
+    Join WAV segments into one WAV file without re-encoding
+
+    The PCM frames are copied as they are, so every segment must share the same
+    channel count, sample width and sample rate.
+
+    Returns:
+        bytes: The combined WAV file
+    """
+    output = io.BytesIO()
+    params = None
+    with wave.open(output, 'wb') as combined:
+        for segment in segments:
+            with wave.open(io.BytesIO(segment), 'rb') as part:
+                segment_params = (part.getnchannels(), part.getsampwidth(), part.getframerate())
+                if params is None:
+                    params = segment_params
+                    combined.setnchannels(params[0])
+                    combined.setsampwidth(params[1])
+                    combined.setframerate(params[2])
+                elif segment_params != params:
+                    raise ValueError(f"Cannot join WAV segments with different formats: {params} and {segment_params}")
+                combined.writeframes(part.readframes(part.getnframes()))
+    return output.getvalue()
+
+
+def text_to_speech(text, language_code, speaker=DEFAULT_SPEAKER, on_first_segment=None):
+    """
+    Synthesize text of any length into a single WAV file, through the disk cache
+
+    Args:
+        text (str): Text to speak
+        language_code (str): Language code
+        speaker (str): Speaker voice
+        on_first_segment (callable): Called with the first segment's WAV bytes as soon
+            as it is ready, when the recording is not cached
+
+    Returns:
+        str: Path of the cached WAV file
+    """
+    key = audio_cache_key(text, language_code, speaker)
+    cached = get_cached_audio(key)
+    if cached:
+        return cached
+
+    segments = []
+    for segment in synthesize_stream(text, language_code, speaker):
+        if not segments and on_first_segment:
+            on_first_segment(segment)
+        segments.append(segment)
+    return store_audio(key, concatenate_wav(segments))
@@ -0,0 +1,317 @@
+"""
+Unit tests of the frontend modules that do not need a running Streamlit app
+
+Run from this directory with: python -m unittest tests
+"""
+import http.client
+import io
+import unittest
+import wave
+from unittest import mock
+
+import requests
+
+import repo_tree
+import resilience
+import speech
+import translation
+
+
+def fake_response(status_code, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    return response
+
+
+@mock.patch.object(resilience.time, 'sleep')
+class ResilienceTests(unittest.TestCase):
+    def setUp(self):
+        self.upstreams = mock.patch.dict(resilience.UPSTREAMS, {
+            'test': {'retries': 2, 'failure_threshold': 3, 'reset_timeout': 30, 'max_concurrent': 2}
+        })
+        self.upstreams.start()
+        self.addCleanup(self.upstreams.stop)
+        for registry in (resilience._breakers, resilience._bulkheads, resilience._sessions, resilience._stats):
+            registry.pop('test', None)
+
+    def send(self, *responses, method='GET'):
+        session = resilience.get_session('test')
+        with mock.patch.object(session, 'request', side_effect=list(responses)) as send:
+            try:
+                return resilience.request('test', method, 'https://example.com/'), send.call_count
+            except resilience.UpstreamUnavailable as e:
+                return e, send.call_count
+
+    def test_transient_errors_are_retried_with_backoff(self, sleep):
+        response, calls = self.send(fake_response(503), requests.exceptions.ConnectionError(), fake_response(200))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(calls, 3)
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(resilience.get_breaker('test').state, 'closed')
+
+    def test_retry_after_is_honoured_unless_too_long(self, sleep):
+        response, _ = self.send(fake_response(429, {'Retry-After': '3'}), fake_response(200))
+        self.assertEqual(response.status_code, 200)
+        sleep.assert_called_once_with(3.0)
+
+        response, calls = self.send(fake_response(429, {'Retry-After': '120'}))
+        self.assertEqual((response.status_code, calls), (429, 1))
+
+    def test_posts_are_not_retried_on_500_or_read_timeouts(self, sleep):
+        response, calls = self.send(fake_response(500), method='POST')
+        self.assertEqual((response.status_code, calls), (500, 1))
+
+        error, calls = self.send(requests.exceptions.ReadTimeout(), method='POST')
+        self.assertIsInstance(error, resilience.UpstreamUnavailable)
+        self.assertEqual(calls, 1)
+
+    def test_unavailable_is_a_requests_connection_error(self, sleep):
+        error, _ = self.send(*[requests.exceptions.ConnectionError()] * 3)
+        self.assertIsInstance(error, requests.exceptions.ConnectionError)
+
+    def test_breaker_opens_fails_fast_and_recovers(self, sleep):
+        self.send(*[fake_response(503)] * 3)
+        breaker = resilience.get_breaker('test')
+        self.assertEqual(breaker.state, 'open')
+
+        error, calls = self.send(fake_response(200))
+        self.assertIsInstance(error, resilience.UpstreamUnavailable)
+        self.assertEqual(calls, 0)
+        self.assertGreater(error.retry_after, 0)
+
+        # After the reset timeout one trial call is let through, and its success closes the breaker
+        breaker.opened_at -= 31
+        self.assertEqual(breaker.state, 'half_open')
+        response, calls = self.send(fake_response(200))
+        self.assertEqual((response.status_code, calls), (200, 1))
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_failed_trial_reopens_the_breaker(self, sleep):
+        breaker = resilience.CircuitBreaker('trial', failure_threshold=1, reset_timeout=30)
+        breaker.record_failure()
+        breaker.opened_at -= 31
+
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, 'open')
+
+    def test_backoff_is_capped(self, sleep):
+        config = {**resilience.DEFAULT_POLICY, 'backoff_base': 1, 'backoff_max': 4}
+        with mock.patch.object(resilience.random, 'uniform', side_effect=lambda low, high: high):
+            self.assertEqual([resilience.backoff_delay(attempt, config) for attempt in range(4)], [1, 2, 4, 4])
+
+    def test_sessions_are_pooled_and_keep_no_cookies(self, sleep):
+        session = resilience.get_session('test')
+        self.assertIs(resilience.get_session('test'), session)
+        self.assertEqual(session.get_adapter('https://example.com/')._pool_maxsize, 2)
+
+        # A Set-Cookie header on a response is ignored rather than shared with the next user
+        headers = http.client.HTTPMessage()
+        headers['Set-Cookie'] = 'sid=secret; Domain=example.com; Path=/'
+        raw = mock.Mock(_original_response=mock.Mock(msg=headers))
+        request = requests.Request('GET', 'https://example.com/').prepare()
+        requests.cookies.extract_cookies_to_jar(session.cookies, request, raw)
+        self.assertEqual(len(session.cookies), 0)
+
+
+class BulkheadTests(unittest.TestCase):
+    def test_full_bulkhead_refuses_after_the_queue_timeout(self):
+        compartment = resilience.Bulkhead('test', max_concurrent=1, max_queue=1, queue_timeout=0.05)
+        self.assertTrue(compartment.acquire())
+        self.assertFalse(compartment.acquire())
+
+        compartment.release()
+        self.assertTrue(compartment.acquire())
+
+    def test_full_queue_refuses_immediately(self):
+        compartment = resilience.Bulkhead('test', max_concurrent=1, max_queue=0, queue_timeout=10)
+        self.assertTrue(compartment.acquire())
+        with mock.patch.object(compartment.semaphore, 'acquire', wraps=compartment.semaphore.acquire) as acquire:
+            self.assertFalse(compartment.acquire())
+        # Only the non-blocking attempt was made; the call never waited
+        acquire.assert_called_once_with(blocking=False)
+
+    def test_saturated_upstream_raises_and_is_counted(self):
+        with mock.patch.dict(resilience.UPSTREAMS, {
+            'busy': {'max_concurrent': 1, 'max_queue': 0, 'queue_timeout': 0.01}
+        }):
+            resilience._bulkheads.pop('busy', None)
+            resilience._stats.pop('busy', None)
+            with resilience.bulkhead('busy'):
+                with self.assertRaises(resilience.UpstreamSaturated):
+                    with resilience.bulkhead('busy'):
+                        pass
+                metrics = resilience.get_upstream_metrics()['busy']
+                self.assertEqual((metrics['in_flight'], metrics['saturated']), (1, 1))
+
+            self.assertEqual(resilience.get_upstream_metrics()['busy']['in_flight'], 0)
+
+
+
+class MarkdownTranslationTests(unittest.TestCase):
+    def test_split_keeps_structure_and_joins_paragraphs(self):
+        markdown = "# Title\n\nFirst line\nsecond line\n- item\n| a | b |\n---"
+
+        self.assertEqual(translation.split_markdown(markdown), [
+            ("# ", "Title"),
+            "",
+            ("", "First line second line"),
+            ("- ", "item"),
+            "| a | b |",
+            "---",
+        ])
+
+    def test_fenced_code_is_kept_verbatim_until_its_closing_fence(self):
+        markdown = "Intro\n````python\n# comment\n```\nprint('hi')\n````\n~~~\n- not a list\n~~~\nOutro"
+
+        segments = translation.split_markdown(markdown)
+
+        self.assertEqual(segments[0], ("", "Intro"))
+        self.assertEqual(segments[1:9], markdown.split("\n")[1:9])
+        self.assertEqual(segments[9], ("", "Outro"))
+
+    def test_protected_spans_round_trip(self):
+        text = "Run `pip install x` and see [docs](https://example.com/a) or https://example.org"
+
+        protected, spans = translation.protect(text)
+
+        self.assertEqual(spans, ["`pip install x`", "](https://example.com/a)", "https://example.org"])
+        self.assertNotIn("pip", protected)
+        self.assertEqual(translation.restore(protected, spans), text)
+        self.assertIsNone(translation.restore(protected.replace(translation.PLACEHOLDER.format(1), ""), spans))
+
+    def test_long_text_is_split_at_sentence_ends(self):
+        text = "One two. Three four five. Six."
+
+        self.assertEqual(translation.split_long_text(text, max_chars=100), [text])
+        self.assertEqual(translation.split_long_text(text, max_chars=20), ["One two.", "Three four five.", "Six."])
+        self.assertEqual(translation.split_long_text("One two. Three four five.", max_chars=10),
+                         ["One two.", "Three four five."])
+
+    def test_units_that_lose_a_placeholder_stay_in_english(self):
+        markdown = "# Install\n\nRun `make` first.\n\n```\ncode\n```"
+
+        def translate_many(pieces, target, source, max_workers):
+            # The heading is translated; the paragraph comes back without its placeholder
+            return [piece.upper() if "\u27e6" not in piece else "RUN FIRST." for piece in pieces]
+
+        with mock.patch.object(translation, 'translate_many', side_effect=translate_many) as translate:
+            result = translation.translate_markdown(markdown, "hi-IN")
+
+        self.assertEqual(result, "# INSTALL\n\nRun `make` first.\n\n```\ncode\n```")
+        self.assertEqual(translate.call_args.args[0], ["Install", "Run \u27e60\u27e7 first."])
+
+    def test_long_units_are_translated_in_pieces_and_rejoined(self):
+        # translate_markdown relies on split_long_text's default chunk size
+        with mock.patch.object(translation.split_long_text, '__defaults__', (10,)), \
+                mock.patch.object(translation, 'translate_many',
+                                  side_effect=lambda pieces, *args: [f"<{piece}>" for piece in pieces]) as translate:
+            result = translation.translate_markdown("One two. Three four five.", "hi-IN")
+
+        self.assertEqual(translate.call_args.args[0], ["One two.", "Three four five."])
+        self.assertEqual(result, "<One two.> <Three four five.>")
+
+
+
+def make_wav(frames, channels=1, sample_width=2, frame_rate=16000):
+    output = io.BytesIO()
+    with wave.open(output, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(sample_width)
+        wav.setframerate(frame_rate)
+        wav.writeframes(frames)
+    return output.getvalue()
+
+
+class SpeechTests(unittest.TestCase):
+    def test_sentences_are_packed_into_chunks(self):
+        text = "One two. Three four five! Six?"
+
+        self.assertEqual(speech.split_for_speech(text, max_chars=100), [text])
+        self.assertEqual(speech.split_for_speech(text, max_chars=20), ["One two.", "Three four five!", "Six?"])
+        self.assertEqual(speech.split_for_speech("", max_chars=20), [])
+
+    def test_long_sentences_are_split_between_words(self):
+        chunks = speech.split_for_speech("Short. alpha beta gamma delta epsilon", max_chars=12)
+
+        self.assertEqual(chunks, ["Short.", "alpha beta", "gamma delta", "epsilon"])
+        self.assertTrue(all(len(chunk) <= 12 for chunk in chunks))
+
+    def test_words_longer_than_a_chunk_are_cut(self):
+        self.assertEqual(speech.split_for_speech("abcdefghij", max_chars=4), ["abcd", "efgh", "ij"])
+
+    def test_wav_segments_are_joined_frame_for_frame(self):
+        combined = speech.concatenate_wav([make_wav(b"\x01\x00" * 3), make_wav(b"\x02\x00" * 2)])
+
+        with wave.open(io.BytesIO(combined), 'rb') as wav:
+            self.assertEqual((wav.getnchannels(), wav.getsampwidth(), wav.getframerate()), (1, 2, 16000))
+            self.assertEqual(wav.readframes(wav.getnframes()), b"\x01\x00" * 3 + b"\x02\x00" * 2)
+
+    def test_wav_segments_with_different_formats_are_refused(self):
+        for mismatched in (make_wav(b"\x00\x00", frame_rate=22050),
+                           make_wav(b"\x00\x00\x00\x00", channels=2),
+                           make_wav(b"\x00", sample_width=1)):
+            with self.assertRaises(ValueError):
+                speech.concatenate_wav([make_wav(b"\x00\x00"), mismatched])
+
+
+
+class RepoTreeTests(unittest.TestCase):
+    def setUp(self):
+        self.tree = repo_tree.RepoTree.from_response("octo", "demo", {
+            "ref": "feature/x",
+            "entries": [
+                ["README.md", "file", 10],
+                ["src", "dir", None],
+                ["src/app.py", "file", 20],
+                ["src/App.test.py", "file", 5],
+                ["src/lib", "dir", None],
+                ["docs", "dir", None],
+                ["setup.py", "file", 3],
+            ],
+        })
+
+    def test_directories_are_listed_in_order_with_full_paths(self):
+        listing = self.tree.list_directory("src")
+
+        self.assertEqual(listing["structure"], [
+            {"name": "app.py", "path": "src/app.py", "type": "file"},
+            {"name": "App.test.py", "path": "src/App.test.py", "type": "file"},
+            {"name": "lib", "path": "src/lib", "type": "dir"},
+        ])
+        self.assertEqual((listing["total"], listing["has_more"]), (3, False))
+        self.assertEqual(self.tree.list_directory("docs")["structure"], [])
+        self.assertEqual(self.tree.list_directory("missing")["total"], 0)
+
+    def test_listings_are_paged(self):
+        first = self.tree.list_directory("", offset=0, limit=2)
+        last = self.tree.list_directory("", offset=2, limit=2)
+
+        self.assertEqual([item["name"] for item in first["structure"]], ["README.md", "src"])
+        self.assertEqual((first["total"], first["has_more"]), (4, True))
+        self.assertEqual([item["name"] for item in last["structure"]], ["docs", "setup.py"])
+        self.assertFalse(last["has_more"])
+
+    def test_filtering_is_case_insensitive_and_paged_after_filtering(self):
+        listing = self.tree.list_directory("src", query="APP", limit=1)
+
+        self.assertEqual([item["name"] for item in listing["structure"]], ["app.py"])
+        self.assertEqual((listing["total"], listing["has_more"]), (2, True))
+        self.assertEqual(self.tree.list_directory("src", query="APP", offset=1)["structure"][0]["path"],
+                         "src/App.test.py")
+
+    def test_lookups_and_raw_urls(self):
+        self.assertTrue(self.tree.is_dir(""))
+        self.assertTrue(self.tree.is_dir("src/lib"))
+        self.assertFalse(self.tree.is_dir("setup.py"))
+        self.assertIn("src/app.py", self.tree)
+        self.assertEqual(self.tree.files(), ["README.md", "src/app.py", "src/App.test.py", "setup.py"])
+        self.assertEqual(self.tree.raw_url("src/my file.py"),
+                         "https://raw.githubusercontent.com/octo/demo/feature/x/src/my%20file.py")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,342 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import resilience
+
+SARVAM_TRANSLATE_URL = "https://api.sarvam.ai/translate"
+DEFAULT_SOURCE_LANGUAGE = "en-IN"
+
+CACHE_PATH = os.getenv(
+    "TRANSLATION_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "translations.sqlite3")
+)
+
+# Translations run at most this many at a time per call; the Sarvam bulkhead
+# bounds them across all sessions
+MAX_WORKERS = int(os.getenv("TRANSLATION_MAX_WORKERS", "4"))
+
+# SQLite lookups use at most this many parameters per query
+LOOKUP_BATCH_SIZE = 500
+
+# Longest text sent in one translate request; longer markdown units are split at sentence ends
+MAX_CHUNK_CHARS = int(os.getenv("TRANSLATION_MAX_CHUNK_CHARS", "900"))
+
+FENCE_RE = re.compile(r'^\s*(`{3,}|~{3,})')
+# Markdown line prefixes kept as they are: headings, list items (with task boxes) and quotes
+LINE_PREFIX_RE = re.compile(r'^(\s*(?:#{1,6}\s+|(?:[-*+]|\d+[.)])\s+(?:\[[ xX]\]\s+)?|>\s?))')
+# Lines kept whole: tables, horizontal rules, HTML and link reference definitions
+VERBATIM_LINE_RE = re.compile(r'^\s*(?:\||(?:[-*_]\s*){3,}$|<|\[[^\]]+\]:\s)')
+# Inline spans that must not be translated: code, link and image targets, URLs and HTML tags
+PROTECTED_RE = re.compile(r'`+[^`]*`+|\]\([^)]*\)|https?://[^\s)>\]]+|<[^>\n]+>')
+PLACEHOLDER = "\u27e6{}\u27e7"
+SENTENCE_END_RE = re.compile(r'(?<=[.!?\u0964])\s+')
+
+_lock = threading.Lock()
+_initialized = False
+
+
+class TranslationUnavailable(Exception):
+    """Raised when translations cannot be requested at all (no API key)"""
+
+
+def _connect():
+    global _initialized
+    if not _initialized:
+        with _lock:
+            if not _initialized:
+                os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+                connection = sqlite3.connect(CACHE_PATH, timeout=10)
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS translations ("
+                    "text_hash TEXT NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL, "
+                    "translated TEXT NOT NULL, created_at REAL NOT NULL, "
+                    "PRIMARY KEY (text_hash, source, target))"
+                )
+                connection.commit()
+                _initialized = True
+                return connection
+    return sqlite3.connect(CACHE_PATH, timeout=10)
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def get_cached_translations(texts, target, source=DEFAULT_SOURCE_LANGUAGE):
+    """
+    Look translations up in the persistent cache
+
+    Returns:
+        dict: Original text -> translation, for the texts found in the cache
+    """
+    hashes = {text_hash(text): text for text in texts}
+    found = {}
+    try:
+        connection = _connect()
+    except sqlite3.Error:
+        return found
+
+    try:
+        keys = list(hashes)
+        for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+            batch = keys[start:start + LOOKUP_BATCH_SIZE]
+            rows = connection.execute(
+                f"SELECT text_hash, translated FROM translations WHERE source = ? AND target = ? "
+                f"AND text_hash IN ({', '.join('?' * len(batch))})",
+                [source, target, *batch]
+            ).fetchall()
+            for digest, translated in rows:
+                found[hashes[digest]] = translated
+    except sqlite3.Error:
+        pass
+    finally:
+        connection.close()
+    return found
+
+
+def store_translations(translations, target, source=DEFAULT_SOURCE_LANGUAGE):
+    """Save original text -> translation pairs in the persistent cache"""
+    if not translations:
+        return
+    try:
+        connection = _connect()
+    except sqlite3.Error:
+        return
+
+    try:
+        now = time.time()
+        with _lock, connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO translations (text_hash, source, target, translated, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(text_hash(text), source, target, translated, now) for text, translated in translations.items()]
+            )
+    except sqlite3.Error:
+        pass
+    finally:
+        connection.close()
+
+
+def request_translation(text, target, source=DEFAULT_SOURCE_LANGUAGE):
+    """
+    Translate one text with the Sarvam API
+
+    Returns:
+        str: The translation, or None if the request failed
+
+    Raises:
+        TranslationUnavailable: If SARVAM_API_KEY is not set
+    """
+    api_key = os.environ.get('SARVAM_API_KEY')
+    if not api_key:
+        raise TranslationUnavailable("Sarvam API key not found. Please set SARVAM_API_KEY in environment variables.")
+
+    payload = {
+        "input": text,
+        "source_language_code": source,
+        "target_language_code": target
+    }
+    headers = {
+        "Content-Type": "application/json",
+        "api-subscription-key": api_key
+    }
+
+    try:
+        response = resilience.request('sarvam', 'POST', SARVAM_TRANSLATE_URL, json=payload, headers=headers)
+    except Exception:
+        return None
+
+    if response.status_code != 200:
+        return None
+    return response.json().get("translated_text")
+
+
+def translate_many(texts, target, source=DEFAULT_SOURCE_LANGUAGE, max_workers=MAX_WORKERS):
+    """
+    Translate a list of texts, serving repeats from the persistent cache
+
+    Texts missing from the cache are translated concurrently and stored, so a page
+    pays for one parallel round of requests the first time it is shown in a
+    language and none afterwards. A text that fails to translate is returned as is
+    and not cached, so it is retried on the next call.
+
+    Args:
+        texts (list): Texts to translate
+        target (str): Target language code, e.g. "hi-IN"
+        source (str): Source language code
+        max_workers (int): Maximum concurrent translation requests
+
+    Returns:
+        list: Translations in the same order as `texts`
+
+    Raises:
+        TranslationUnavailable: If translations are needed and SARVAM_API_KEY is not set
+    """
+    if target == source:
+        return list(texts)
+
+    unique = list(dict.fromkeys(text for text in texts if text and text.strip()))
+    translations = get_cached_translations(unique, target, source)
+    missing = [text for text in unique if text not in translations]
+
+    if missing:
+        if not os.environ.get('SARVAM_API_KEY'):
+            raise TranslationUnavailable("Sarvam API key not found. Please set SARVAM_API_KEY in environment variables.")
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as executor:
+            results = executor.map(lambda text: request_translation(text, target, source), missing)
+            fresh = {text: translated for text, translated in zip(missing, results) if translated is not None}
+
+        store_translations(fresh, target, source)
+        translations.update(fresh)
+
+    return [translations.get(text, text) for text in texts]
+
+
+def translate(text, target, source=DEFAULT_SOURCE_LANGUAGE):
+    """Translate a single text through the cache; see translate_many"""
+    return translate_many([text], target, source)[0]
+
+
+def split_markdown(markdown):
+    """
+    Split markdown into segments to keep and units to translate
+
+    Returns:
+        list: Each item is either a str kept verbatim or a (prefix, text) tuple
+        whose text is translated and put back after its prefix
+    """
+    segments = []
+    paragraph = []
+    fence = None
+
+    def flush():
+        if paragraph:
+            indent = paragraph[0][:len(paragraph[0]) - len(paragraph[0].lstrip())]
+            segments.append((indent, " ".join(line.strip() for line in paragraph)))
+            paragraph.clear()
+
+    for line in markdown.split("\n"):
+        if fence:
+            segments.append(line)
+            if line.strip().startswith(fence):
+                fence = None
+            continue
+
+        fence_match = FENCE_RE.match(line)
+        if fence_match:
+            flush()
+            fence = fence_match.group(1)
+            segments.append(line)
+        elif not line.strip() or VERBATIM_LINE_RE.match(line) or line.startswith("    ") and not paragraph:
+            flush()
+            segments.append(line)
+        elif LINE_PREFIX_RE.match(line):
+            flush()
+            prefix = LINE_PREFIX_RE.match(line).group(1)
+            segments.append((prefix, line[len(prefix):]))
+        else:
+            paragraph.append(line)
+    flush()
+    return segments
+
+
+def protect(text):
+    """Replace spans that must not be translated with numbered placeholders"""
+    spans = []
+
+    def substitute(match):
+        spans.append(match.group(0))
+        return PLACEHOLDER.format(len(spans) - 1)
+
+    return PROTECTED_RE.sub(substitute, text), spans
+
+
+def restore(text, spans):
+    """Put protected spans back; None if the translation lost any placeholder"""
+    for index, span in enumerate(spans):
+        placeholder = PLACEHOLDER.format(index)
+        if placeholder not in text:
+            return None
+        text = text.replace(placeholder, span)
+    return text
+
+
+def split_long_text(text, max_chars=MAX_CHUNK_CHARS):
+    """Split text at sentence ends into pieces of at most max_chars (a single longer sentence stays whole)"""
+    if len(text) <= max_chars:
+        return [text]
+
+    pieces = []
+    current = ""
+    for sentence in SENTENCE_END_RE.split(text):
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def translate_markdown(markdown, target, source=DEFAULT_SOURCE_LANGUAGE, max_workers=MAX_WORKERS):
+    """
+    Translate a markdown document, keeping its structure
+
+    The document is split at heading, list item and paragraph boundaries. Code
+    blocks, tables, inline code, URLs and link targets are left untranslated.
+    Units are translated concurrently through the persistent cache, so editing
+    one section only re-translates that section. A unit whose translation fails
+    or drops a protected span stays in the source language.
+
+    Args:
+        markdown (str): Markdown document
+        target (str): Target language code
+        source (str): Source language code
+        max_workers (int): Maximum concurrent translation requests
+
+    Returns:
+        str: The translated document
+
+    Raises:
+        TranslationUnavailable: If translations are needed and SARVAM_API_KEY is not set
+    """
+    if target == source or not markdown:
+        return markdown
+
+    segments = split_markdown(markdown)
+
+    # Each translatable unit becomes one or more protected pieces
+    units = []
+    for segment in segments:
+        if isinstance(segment, str):
+            continue
+        protected, spans = protect(segment[1])
+        # Nothing left to translate once code and URLs are taken out
+        if not re.search(r'[^\W\d_]', PROTECTED_RE.sub("", segment[1])):
+            continue
+        units.append((segment, spans, split_long_text(protected)))
+
+    pieces = [piece for _, _, unit_pieces in units for piece in unit_pieces]
+    translated_pieces = iter(translate_many(pieces, target, source, max_workers))
+
+    translations = {}
+    for segment, spans, unit_pieces in units:
+        translated = " ".join(next(translated_pieces) for _ in unit_pieces)
+        restored = restore(translated, spans)
+        translations[id(segment)] = restored if restored is not None else segment[1]
+
+    lines = []
+    for segment in segments:
+        if isinstance(segment, str):
+            lines.append(segment)
+        else:
+            prefix, text = segment
+            lines.append(prefix + translations.get(id(segment), text))
+    return "\n".join(lines)
@@ -1,9 +1,16 @@
 import streamlit as st
 import requests
+import resilience
+from repo_tree import RepoTree
 import base64
 from urllib.parse import urljoin
 import os
 import json
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
 
 BACKEND_URL = "https://viksit.onrender.com/api/"
 
@@ -18,46 +25,225 @@ def load_css(css_file):
         st.error(f"Error loading CSS file: {str(e)}")
         return ""
 
+# Fetched repository data is cached with st.cache_data, shared by every session on this
+# server, so reruns only render. Each TTL bounds how stale upstream data can get;
+# invalidate_repository_cache() makes the next fetch skip the cache at once.
+REPOSITORIES_CACHE_TTL = int(os.getenv("REPOSITORIES_CACHE_TTL", "300"))
+REPO_INFO_CACHE_TTL = int(os.getenv("REPO_INFO_CACHE_TTL", "600"))
+REPO_STRUCTURE_CACHE_TTL = int(os.getenv("REPO_STRUCTURE_CACHE_TTL", "1800"))
+FILE_CONTENT_CACHE_TTL = int(os.getenv("FILE_CONTENT_CACHE_TTL", "1800"))
+CACHE_MAX_ENTRIES = int(os.getenv("DATA_CACHE_MAX_ENTRIES", "2048"))
+
+# Entries shown per page of a directory in the tree view. A directory with more
+# gets a filter box and a "Show more" button, so rendering follows what is visible.
+TREE_PAGE_SIZE = int(os.getenv("TREE_PAGE_SIZE", "100"))
+
+# Whole-repository tree indexes are held once per repository and ref, not copied per session
+REPO_TREE_CACHE_MAX_ENTRIES = int(os.getenv("REPO_TREE_CACHE_MAX_ENTRIES", "64"))
+
+# Bumped by invalidate_repository_cache(); passed to the cached fetches so a bump
+# gives them new cache keys. Keyed by lowercased (username, repo_name or None).
+_cache_generations = {}
+_cache_generations_lock = threading.Lock()
+
+
+class FetchError(Exception):
+    """Raised inside cached fetches for an unsuccessful response, so it is not cached"""
+
+
+def _generation_key(username, repo_name=None):
+    return (username.lower(), repo_name.lower() if repo_name else None)
+
+
+def cache_generation(username, repo_name=None):
+    """Current cache generation of a user's repository list, or of one repository"""
+    with _cache_generations_lock:
+        return _cache_generations.get(_generation_key(username, repo_name), 0)
+
+
+def invalidate_repository_cache(username, repo_name=None):
+    """
+    Drop cached data for every session
+    
+    With a repo_name, its info, structure and file contents are fetched again;
+    without one, the user's repository list is.
+    """
+    with _cache_generations_lock:
+        key = _generation_key(username, repo_name)
+        _cache_generations[key] = _cache_generations.get(key, 0) + 1
+
+
+def clear_data_cache():
+    """Drop all cached repository data"""
+    for fetch in (fetch_repositories, fetch_repo_info, fetch_repo_structure, fetch_repo_structure_page,
+                  fetch_repo_tree, fetch_file_content):
+        fetch.clear()
+
+
+@st.cache_data(ttl=REPOSITORIES_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def fetch_repositories(username, generation=0):
+    response = resilience.request('backend', 'GET', urljoin(BACKEND_URL, f"repositories/{username}/"))
+    if response.status_code != 200:
+        raise FetchError(f"Error fetching repositories: {response.text}")
+    return response.json()["repos"]
+
+
+@st.cache_data(ttl=REPO_INFO_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def fetch_repo_info(username, repo_name, generation=0):
+    response = resilience.request('github', 'GET', f"https://api.github.com/repos/{username}/{repo_name}")
+    if response.status_code != 200:
+        raise FetchError(f"Error fetching repository information: {response.text}")
+    return response.json()
+
+
+def _request_repo_structure(username, repo_name, path, ref, generation, **params):
+    if path:
+        params["path"] = path
+    if ref:
+        params["ref"] = ref
+    # Once the repository has been invalidated, the backend's own cache is skipped too
+    if generation:
+        params["refresh"] = "1"
+    url = urljoin(BACKEND_URL, f"repo-structure/{username}/{repo_name}/")
+    response = resilience.request('backend', 'GET', url, params=params)
+    if response.status_code != 200:
+        raise FetchError(f"Error fetching repository structure: {response.text}")
+    return response.json()
+
+
+@st.cache_data(ttl=REPO_STRUCTURE_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def fetch_repo_structure(username, repo_name, path="", ref=None, generation=0):
+    return _request_repo_structure(username, repo_name, path, ref, generation)["structure"]
+
+
+@st.cache_data(ttl=REPO_STRUCTURE_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def fetch_repo_structure_page(username, repo_name, path="", offset=0, limit=TREE_PAGE_SIZE, query="", ref=None, generation=0):
+    params = {"offset": offset, "limit": limit}
+    if query:
+        params["q"] = query
+    return _request_repo_structure(username, repo_name, path, ref, generation, **params)
+
+
+@st.cache_resource(ttl=REPO_STRUCTURE_CACHE_TTL, max_entries=REPO_TREE_CACHE_MAX_ENTRIES, show_spinner=False)
+def fetch_repo_tree(username, repo_name, ref=None, generation=0):
+    # Shared by every session as is, so callers must not modify it
+    params = {"ref": ref} if ref else {}
+    if generation:
+        params["refresh"] = "1"
+    url = urljoin(BACKEND_URL, f"repo-tree/{username}/{repo_name}/")
+    response = resilience.request('backend', 'GET', url, params=params)
+    if response.status_code != 200:
+        raise FetchError(f"Error fetching repository tree: {response.text}")
+    return RepoTree.from_response(username, repo_name, response.json())
+
+
+@st.cache_data(ttl=FILE_CONTENT_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def fetch_file_content(username, repo_name, path, ref=None, generation=0):
+    url = f"https://api.github.com/repos/{username}/{repo_name}/contents/{path}"
+    response = resilience.request('github', 'GET', url, params={"ref": ref} if ref else None)
+    if response.status_code != 200:
+        raise FetchError(f"Error fetching file content: {response.text}")
+    content_data = response.json()
+    if content_data.get('encoding') == 'base64' and content_data.get('content'):
+        try:
+            content = base64.b64decode(content_data['content']).decode('utf-8')
+            return content, content_data.get('name')
+        except Exception as e:
+            return f"Error decoding content: {str(e)}", content_data.get('name')
+    else:
+        return "Content not available in text format.", content_data.get('name')
+
+
 def get_repositories(username):
     """Fetch repositories for the given username from the Django backend"""
     with st.spinner("Fetching repositories..."):
-        response = requests.get(urljoin(BACKEND_URL, f"repositories/{username}/"))
-        if response.status_code == 200:
-            return response.json()["repos"]
-        else:
-            st.error(f"Error fetching repositories: {response.text}")
+        try:
+            return fetch_repositories(username, cache_generation(username))
+        except FetchError as e:
+            st.error(str(e))
             return []
 
-def get_repo_structure(username, repo_name, path=""):
-    """Fetch repository structure from the Django backend"""
+def get_repo_info(username, repo_name):
+    """Repository metadata from the GitHub API, or None if it could not be fetched"""
+    try:
+        return fetch_repo_info(username, repo_name, cache_generation(username, repo_name))
+    except FetchError:
+        return None
+
+def get_repo_structure(username, repo_name, path="", ref=None):
+    """Fetch repository structure from the Django backend, at `ref` or the default branch"""
     with st.spinner("Loading repository structure..."):
-        url = urljoin(BACKEND_URL, f"repo-structure/{username}/{repo_name}/")
-        if path:
-            url += f"?path={path}"
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.json()["structure"]
-        else:
-            st.error(f"Error fetching repository structure: {response.text}")
+        try:
+            return fetch_repo_structure(username, repo_name, path, ref, cache_generation(username, repo_name))
+        except FetchError as e:
+            st.error(str(e))
             return []
 
-def get_file_content(username, repo_name, path):
-    """Fetch file content from GitHub API"""
+def get_repo_structure_page(username, repo_name, path="", offset=0, limit=TREE_PAGE_SIZE, query="", ref=None):
+    """
+    One page of a directory listing, sliced and filtered by the backend
+    
+    Returns:
+        dict: `structure` (the entries), `total` (entries matching the query) and
+        `has_more`; None if the listing could not be fetched
+    """
+    with st.spinner("Loading repository structure..."):
+        try:
+            return fetch_repo_structure_page(
+                username, repo_name, path, offset, limit, query, ref, cache_generation(username, repo_name)
+            )
+        except FetchError as e:
+            st.error(str(e))
+            return None
+
+def get_repo_tree(username, repo_name, ref=None):
+    """
+    Index of every file and directory of the repository, fetched once per repository and ref
+    
+    Returns:
+        RepoTree: The shared, read-only index, or None if it could not be fetched
+    """
+    with st.spinner("Loading repository tree..."):
+        try:
+            return fetch_repo_tree(username, repo_name, ref, cache_generation(username, repo_name))
+        except (FetchError, requests.exceptions.RequestException):
+            return None
+
+def prefetch_repository(username, repo_name):
+    """
+    Fetch a repository's info and tree concurrently into the shared caches
+    
+    The page sections that show them then read the caches instead of each waiting
+    on its own request in turn. Errors are left to those sections to report.
+    """
+    generation = cache_generation(username, repo_name)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(fetch_repo_info, username, repo_name, generation),
+            executor.submit(fetch_repo_tree, username, repo_name, None, generation),
+        ]
+    for future in futures:
+        future.exception()
+
+def list_directory_page(username, repo_name, path="", offset=0, limit=TREE_PAGE_SIZE, query=""):
+    """
+    One page of a directory listing, from the repository tree index when there is one
+    
+    A tree GitHub truncated may be missing entries, so its directories are listed
+    by the backend instead, as when the tree cannot be fetched.
+    """
+    tree = get_repo_tree(username, repo_name)
+    if tree is not None and not tree.truncated:
+        return tree.list_directory(path, offset, limit, query)
+    return get_repo_structure_page(username, repo_name, path, offset, limit, query)
+
+def get_file_content(username, repo_name, path, ref=None):
+    """Fetch file content from GitHub API, at `ref` or the default branch"""
     with st.spinner("Loading file content..."):
-        response = requests.get(f"https://api.github.com/repos/{username}/{repo_name}/contents/{path}")
-        
-        if response.status_code == 200:
-            content_data = response.json()
-            if content_data.get('encoding') == 'base64' and content_data.get('content'):
-                try:
-                    content = base64.b64decode(content_data['content']).decode('utf-8')
-                    return content, content_data.get('name')
-                except Exception as e:
-                    return f"Error decoding content: {str(e)}", content_data.get('name')
-            else:
-                return "Content not available in text format.", content_data.get('name')
-        else:
-            return f"Error fetching file content: {response.text}", path
+        try:
+            return fetch_file_content(username, repo_name, path, ref, cache_generation(username, repo_name))
+        except FetchError as e:
+            return str(e), path
 
 def get_file_icon(extension):
     """Return appropriate icon based on file extension"""
@@ -92,10 +278,82 @@ def get_file_icon(extension):
     }
     return icons.get(extension, '📄')
 
-def render_interactive_directory_structure(structure, path_prefix=""):
-    """Render the repository structure with collapsible folders and file links"""
-    for item in structure:
-        item_path = f"{path_prefix}/{item['name']}" if path_prefix else item['name']
+def toggle_folder(folder_key):
+    """Button callback expanding or collapsing a folder of a directory tree"""
+    st.session_state[folder_key] = not st.session_state.get(folder_key, False)
+
+def show_more_entries(pages_key):
+    """Button callback showing one more page of a directory"""
+    st.session_state[pages_key] = st.session_state.get(pages_key, 1) + 1
+
+def reset_directory_pages(pages_key):
+    """Filter callback going back to the first page of a directory"""
+    st.session_state[pages_key] = 1
+
+def open_file_view(item_path):
+    """Show a file on the repository structure page"""
+    st.session_state.file_path = item_path
+    st.session_state.view_file = True
+    st.rerun()
+
+def render_interactive_directory_structure(username, repo_name, path="", on_file_open=open_file_view):
+    """
+    Render one directory of the repository with collapsible folders and file links
+    
+    Entries come from the repository tree index (or, without one, from the backend
+    a directory at a time) TREE_PAGE_SIZE at a time, so the widgets rendered follow
+    what is on screen rather than the size of the repository. A directory larger
+    than one page gets a name filter and a "Show more" button.
+    
+    Folders toggle in a button callback, so inside a fragment expanding one only
+    re-renders the fragment.
+    
+    Args:
+        username (str): GitHub username
+        repo_name (str): Repository name
+        path (str): Directory to render, "" for the repository root
+        on_file_open (callable): Called with a file's path when it is clicked
+        
+    Returns:
+        int: Number of entries matching the filter, or None if the listing could not be fetched
+    """
+    directory_id = path.replace('/', '_') if path else "_root"
+    pages_key = f"tree_pages_{directory_id}"
+    filter_key = f"tree_filter_{directory_id}"
+    query = st.session_state.get(filter_key, "").strip()
+    
+    entries = []
+    total = None
+    has_more = False
+    for page in range(st.session_state.get(pages_key, 1)):
+        listing = list_directory_page(
+            username, repo_name, path, offset=page * TREE_PAGE_SIZE, limit=TREE_PAGE_SIZE, query=query
+        )
+        if listing is None:
+            break
+        entries.extend(listing["structure"])
+        total = listing["total"]
+        has_more = listing["has_more"]
+        if not has_more:
+            break
+    
+    if total is None:
+        return None
+    
+    if total > TREE_PAGE_SIZE or query:
+        st.text_input(
+            "Filter",
+            key=filter_key,
+            placeholder=f"Filter {total} entries by name" if not query else "Filter by name",
+            label_visibility="collapsed",
+            on_change=reset_directory_pages,
+            args=(pages_key,)
+        )
+        if query and not entries:
+            st.caption("No entries match the filter")
+    
+    for item in entries:
+        item_path = f"{path}/{item['name']}" if path else item['name']
         item_id = f"tree_{item_path.replace('/', '_')}"
         
         if item["type"] == "dir":
@@ -106,15 +364,14 @@ def render_interactive_directory_structure(structure, path_prefix=""):
             
             col1, col2 = st.columns([0.05, 0.95])
             with col1:
-                if st.button("➤", key=f"toggle_{folder_key}", help=f"Expand/Collapse {item['name']}"):
-                    st.session_state[folder_key] = not st.session_state[folder_key]
-                    st.rerun()
+                st.button("➤", key=f"toggle_{folder_key}", help=f"Expand/Collapse {item['name']}",
+                          on_click=toggle_folder, args=(folder_key,))
             
             with col2:
                 st.markdown(
                     f"""
                     <div id="{item_id}" class="folder-toggle">
-                        <span class="item-bullet">{'•' if not path_prefix else '◦'}</span>
+                        <span class="item-bullet">{'•' if not path else '◦'}</span>
                         <span class="tree-icon dir-icon">📁</span>
                         <span class="item-text">{item['name']}</span>
                     </div>
@@ -125,17 +382,7 @@ def render_interactive_directory_structure(structure, path_prefix=""):
             if st.session_state[folder_key]:
                 with st.container():
                     st.markdown('<div class="folder-contents">', unsafe_allow_html=True)
-                    
-                    if "children" in item and item["children"]:
-                        render_interactive_directory_structure(item["children"], item_path)
-                    else:
-                        children = get_repo_structure(
-                            st.session_state.username, 
-                            st.session_state.repo_name, 
-                            item_path
-                        )
-                        render_interactive_directory_structure(children, item_path)
-                        
+                    render_interactive_directory_structure(username, repo_name, item_path, on_file_open)
                     st.markdown('</div>', unsafe_allow_html=True)
         else:
             file_extension = item['name'].split('.')[-1].lower() if '.' in item['name'] else ''
@@ -151,10 +398,56 @@ def render_interactive_directory_structure(structure, path_prefix=""):
                 
             with col3:
                 if st.button(f"{item['name']}", key=f"file_{item_id}", help=f"View {item['name']}"):
+                    on_file_open(item_path)
+    
+    if has_more:
+        st.button(
+            f"Show more ({len(entries)} of {total})",
+            key=f"tree_more_{directory_id}",
+            on_click=show_more_entries,
+            args=(pages_key,)
+        )
+    
+    return total
 
-                    st.session_state.file_path = item_path
-                    st.session_state.view_file = True
-                    st.rerun()
+def compress_image_for_upload(image_bytes, max_dimension=1024):
+    """
+    Shrink an oversized image before sending it to the backend
+    
+    Only the size is reduced here, to keep uploads small; the backend normalizes
+    every image (orientation, transparency, metadata, JPEG encoding). The EXIF
+    data is kept so the backend can still correct the orientation, and images
+    that already fit, or that cannot be decoded, are sent unchanged.
+    """
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            image_format = image.format
+            if max(image.size) <= max_dimension or image_format not in ("JPEG", "PNG", "WEBP"):
+                return image_bytes
+            
+            exif = image.info.get("exif")
+            image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+            
+            output = io.BytesIO()
+            options = {"exif": exif} if exif else {}
+            if image_format == "JPEG":
+                # High quality, as the backend re-encodes the image once more
+                options["quality"] = 90
+            image.save(output, format=image_format, **options)
+            return output.getvalue()
+    except Exception:
+        # Let the backend reject anything that cannot be decoded here
+        return image_bytes
+
+def get_execution_engines():
+    """Code execution engines offered by the backend, falling back to JDoodle only if it can't be asked"""
+    try:
+        response = resilience.request('backend', 'GET', urljoin(BACKEND_URL, "execute-code/engines/"), timeout=10)
+        if response.status_code == 200:
+            return response.json()
+    except requests.exceptions.RequestException:
+        pass
+    return {"engines": ["jdoodle"], "default": "jdoodle", "local_languages": [], "jdoodle_configured": False}
 
 def get_sarvam_api_key():
     """Get the Sarvam API key from environment variables"""
@@ -163,31 +456,56 @@ def get_sarvam_api_key():
         raise ValueError("Sarvam API key not found. Please set SARVAM_API_KEY in environment variables.")
     return api_key
 
-def get_documentation(username, repo_name):
+def get_documentation(username, repo_name, on_progress=None, timeout=300, poll_interval=2):
     """
-    Generate comprehensive documentation for a repository using the backend API
+    Generate comprehensive documentation for a repository using the backend job API
+    
+    The generation is queued on the backend and polled until it finishes, so long
+    generations do not hit request timeouts. The GitHub-only fallback is used only
+    when the job fails or the backend cannot be reached.
     
     Args:
         username (str): GitHub username
         repo_name (str): Repository name
+        on_progress (callable): Optional callback taking (stage, percent)
+        timeout (int): Seconds to wait for the job before giving up
+        poll_interval (int): Seconds between status checks
         
     Returns:
         str: Markdown-formatted documentation
     """
     try:
-        response = requests.post(
-            urljoin(BACKEND_URL, "generate-documentation/"),
+        response = resilience.request(
+            'backend', 'POST', urljoin(BACKEND_URL, "documentation-jobs/"),
             json={
                 "username": username,
                 "repo_name": repo_name
-            }
+            },
+            timeout=30
         )
         
-        if response.status_code == 200:
-            result = response.json()
-            return result["documentation"]
-        else:
+        if response.status_code != 202:
             return generate_documentation_fallback(username, repo_name)
+        
+        job = response.json()
+        status_url = urljoin(BACKEND_URL, f"documentation-jobs/{job['job_id']}/")
+        deadline = time.monotonic() + timeout
+        
+        while time.monotonic() < deadline:
+            if on_progress:
+                on_progress(job.get("stage", ""), job.get("progress", 0))
+            
+            if job.get("status") == "succeeded":
+                return job["documentation"]
+            if job.get("status") == "failed":
+                return generate_documentation_fallback(username, repo_name)
+            
+            time.sleep(poll_interval)
+            status_response = resilience.request('backend', 'GET', status_url, timeout=30)
+            if status_response.status_code == 200:
+                job = status_response.json()
+        
+        return generate_documentation_fallback(username, repo_name)
     except Exception as e:
         return generate_documentation_fallback(username, repo_name)
 
@@ -204,7 +522,7 @@ def generate_documentation_fallback(username, repo_name):
     """
     try:
         repo_url = f"https://api.github.com/repos/{username}/{repo_name}"
-        repo_response = requests.get(repo_url)
+        repo_response = resilience.request('github', 'GET', repo_url)
         
         if repo_response.status_code != 200:
             return "Unable to fetch repository information."
@@ -212,7 +530,7 @@ def generate_documentation_fallback(username, repo_name):
         repo_data = repo_response.json()
         
         readme_url = f"https://api.github.com/repos/{username}/{repo_name}/readme"
-        readme_response = requests.get(readme_url)
+        readme_response = resilience.request('github', 'GET', readme_url)
         readme_content = ""
         
         if readme_response.status_code == 200: